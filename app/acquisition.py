@@ -0,0 +1,144 @@
+# app/acquisition.py
+import threading
+import time
+
+from app.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+class AcquisitionQueue:
+    """
+    Bounded, thread-safe hand-off between MethodBase.run and its consumers.
+
+    The run thread calls it like emit(x, y), or emit_record()/emit_many()
+    with full records (see MethodBase.record_fields); none of these block
+    on the GUI. Records go to the DataWriter in chunks (every chunk_size
+    points or chunk_interval seconds); the plotted (x, y) pairs are
+    buffered for the GUI, which collects them with drain(). If the GUI
+    falls more than maxsize points behind, the oldest plot points are
+    dropped (the file still gets everything); maxsize=0 keeps no plot
+    points at all (headless runs). Progress updates collapse to the
+    latest value.
+    """
+
+    def __init__(self, writer=None, dtype=None, xfield="x", yfield="y",
+                 maxsize=50000, chunk_size=256, chunk_interval=0.5):
+        self.writer = writer
+        self.dtype = dtype if dtype is not None else np.dtype([("x", "f8"), ("y", "f8")])
+        self.xfield = xfield
+        self.yfield = yfield
+        self.maxsize = maxsize
+        self.chunk_size = chunk_size
+        self.chunk_interval = chunk_interval
+
+        self.dropped = 0
+        self.closed = False
+
+        self._names = self.dtype.names
+        self._lock = threading.Lock()
+        self._gui_x = []
+        self._gui_y = []
+        self._progress = None
+
+        self._chunk = []            # record tuples and record arrays
+        self._chunk_size = 0
+        self._chunk_t = time.perf_counter()
+
+    # -------------------------------------------------
+    # Run thread
+    # -------------------------------------------------
+    def __call__(self, x, y):
+        self.emit_record(**{self.xfield: x, self.yfield: y})
+
+    emit = __call__
+
+    def emit_record(self, **fields):
+        """One record; fields not given are saved as 0."""
+        if self.maxsize:
+            with self._lock:
+                self._gui_x.append(fields[self.xfield])
+                self._gui_y.append(fields[self.yfield])
+                self._trim()
+
+        if self.writer is not None:
+            self._chunk.append(tuple(fields.get(name, 0) for name in self._names))
+            self._chunk_size += 1
+            self._chunk_due()
+
+    def emit_many(self, records):
+        """A block of records: structured array with this queue's dtype."""
+        records = np.asarray(records, dtype=self.dtype)
+        if records.size == 0:
+            return
+
+        if self.maxsize:
+            with self._lock:
+                self._gui_x.extend(records[self.xfield].tolist())
+                self._gui_y.extend(records[self.yfield].tolist())
+                self._trim()
+
+        if self.writer is not None:
+            self._chunk.append(records)
+            self._chunk_size += len(records)
+            self._chunk_due()
+
+    def progress(self, fraction):
+        self._progress = fraction
+
+    def close(self):
+        """End of run: hands the last chunk to the writer."""
+        if self.writer is not None:
+            self._flush_chunk()
+        self.closed = True
+
+    def _trim(self):
+        if len(self._gui_x) > self.maxsize:
+            excess = len(self._gui_x) - self.maxsize
+            del self._gui_x[:excess]
+            del self._gui_y[:excess]
+            self.dropped += excess
+
+    def _chunk_due(self):
+        if (self._chunk_size >= self.chunk_size
+                or time.perf_counter() - self._chunk_t >= self.chunk_interval):
+            self._flush_chunk()
+
+    def _flush_chunk(self):
+        if self._chunk:
+            self.writer.put_many(self._chunk_records())
+            self._chunk, self._chunk_size = [], 0
+        self._chunk_t = time.perf_counter()
+
+    def _chunk_records(self):
+        blocks, rows = [], []
+        for item in self._chunk:
+            if isinstance(item, tuple):
+                rows.append(item)
+                continue
+            if rows:
+                blocks.append(np.array(rows, dtype=self.dtype))
+                rows = []
+            blocks.append(item)
+        if rows:
+            blocks.append(np.array(rows, dtype=self.dtype))
+        return np.concatenate(blocks) if len(blocks) > 1 else blocks[0]
+
+    # -------------------------------------------------
+    # GUI thread
+    # -------------------------------------------------
+    def drain(self):
+        """
+        Returns (xs, ys, progress) accumulated since the last call;
+        progress is None if it did not change.
+        """
+        with self._lock:
+            xs, self._gui_x = self._gui_x, []
+            ys, self._gui_y = self._gui_y, []
+            progress, self._progress = self._progress, None
+
+        return np.asarray(xs, dtype=float), np.asarray(ys, dtype=float), progress
+
+    def finished(self):
+        """True once the run has ended and everything has been drained."""
+        return self.closed and not self._gui_x and self._progress is None
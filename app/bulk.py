@@ -0,0 +1,273 @@
+# app/bulk.py
+"""
+Bulk conversion / re-analysis of a data tree (<root>/<user>/<project>/<run>).
+
+    python -m app.bulk summary [--root app/Data] [--user Max] [--project Project1]
+    python -m app.bulk convert --to egr
+
+Files are processed in a process pool. Results are remembered per file
+(mtime, size, SHA-1 of the contents) in <root>/.bulk_state.json, so
+files whose contents did not change are skipped on the next run.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from app import runfile
+from app.data import find_runs, read_run
+
+DEFAULT_ROOT = "app/Data"
+STATE_FILE = ".bulk_state.json"
+
+
+# -------------------------------------------------
+# Tasks: fn(path, options) -> JSON-serializable result
+# -------------------------------------------------
+def convert(path, options):
+    """
+    CSV <-> .egr; the output goes next to the source file. Existing
+    files are never overwritten (the run is skipped instead).
+    """
+    target = options["to"]
+    base, ext = os.path.splitext(path)
+
+    if target == "egr":
+        if ext.lower() == runfile.EXTENSION:
+            return {"output": None}
+        output = base + runfile.EXTENSION
+    else:
+        if ext.lower() != runfile.EXTENSION:
+            return {"output": None}
+        output = base + ".csv"
+
+    if os.path.exists(output):
+        return {"output": None, "skipped": f"{os.path.basename(output)} exists"}
+
+    if target == "egr":
+        runfile.from_csv(path, output)
+    else:
+        runfile.to_csv(path, output)
+    return {"output": output}
+
+
+def summary(path, options):
+    """Header metadata, point count, ranges and peak currents of a run."""
+    run = read_run(path)
+    x = np.asarray(run.x, dtype=float)
+    y = np.asarray(run.y, dtype=float)
+
+    result = {
+        "method": run.method,
+        "timestamp": run.header.get("timestamp"),
+        "points": len(run),
+    }
+    ok = np.isfinite(x) & np.isfinite(y)
+    if ok.any():
+        x, y = x[ok], y[ok]
+        hi, lo = int(np.argmax(y)), int(np.argmin(y))
+        result.update({
+            "x_min": float(x.min()), "x_max": float(x.max()),
+            "y_min": float(y[lo]), "y_max": float(y[hi]), "y_mean": float(y.mean()),
+            # anodic / cathodic peak: extreme y and where it occurred
+            "peak_y": float(y[hi]), "peak_x": float(x[hi]),
+            "valley_y": float(y[lo]), "valley_x": float(x[lo]),
+        })
+    return result
+
+
+TASKS = {
+    "convert": convert,
+    "summary": summary,
+}
+
+
+# -------------------------------------------------
+# Worker
+# -------------------------------------------------
+def file_hash(path, block=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _outputs_exist(result):
+    result = result or {}
+    if result.get("skipped"):
+        return False    # retried: what blocked it may be gone
+    output = result.get("output")
+    return output is None or os.path.exists(output)
+
+
+def _process(job):
+    """
+    Runs one task on one file in a worker process.
+    Returns (path, status, entry): status "unchanged", "done" or "failed".
+    """
+    task, path, options, previous = job
+    try:
+        st = os.stat(path)
+        if previous and _outputs_exist(previous.get("result")):
+            if (previous["mtime"], previous["size"]) == (st.st_mtime, st.st_size):
+                return path, "unchanged", previous
+            digest = file_hash(path)
+            if previous["hash"] == digest:
+                return path, "unchanged", {**previous, "mtime": st.st_mtime, "size": st.st_size}
+        else:
+            digest = file_hash(path)
+
+        result = TASKS[task](path, options)
+        entry = {"mtime": st.st_mtime, "size": st.st_size, "hash": digest, "result": result}
+        return path, "done", entry
+
+    except Exception as e:
+        return path, "failed", f"{type(e).__name__}: {e}"
+
+
+# -------------------------------------------------
+# Driver
+# -------------------------------------------------
+def _load_state(root):
+    try:
+        with open(os.path.join(root, STATE_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(root, state):
+    path = os.path.join(root, STATE_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+
+
+def _report(done, total, counts, t0, final=False):
+    elapsed = time.perf_counter() - t0
+    rate = done / elapsed if elapsed > 0 else 0.0
+    eta = (total - done) / rate if rate > 0 else 0.0
+    line = (
+        f"\r[{done}/{total}] {done / max(total, 1):6.1%}  {rate:7.1f} files/s  "
+        f"eta {eta:5.0f}s  done {counts['done']}  unchanged {counts['unchanged']}  "
+        f"failed {counts['failed']}"
+    )
+    sys.stderr.write(line + ("\n" if final else ""))
+    sys.stderr.flush()
+
+
+def process_tree(task, root, options=None, user=None, project=None,
+                 workers=None, chunksize=None, progress=True):
+    """
+    Runs task on every run file under root. Returns
+    ({relative path: result}, {relative path: error}, counts).
+    """
+    options = options or {}
+    paths = find_runs(root, user, project)
+
+    state = _load_state(root)
+    key = f"{task}:{json.dumps(options, sort_keys=True)}"
+    entries = state.setdefault(key, {})
+
+    jobs = [
+        (task, path, options, entries.get(os.path.relpath(path, root)))
+        for path in paths
+    ]
+
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        # a few chunks per worker: low overhead, still balanced
+        chunksize = max(1, min(64, len(jobs) // (workers * 4)))
+
+    counts = {"done": 0, "unchanged": 0, "failed": 0}
+    errors = {}
+    t0 = time.perf_counter()
+
+    with multiprocessing.Pool(workers) as pool:
+        for i, (path, status, entry) in enumerate(
+            pool.imap_unordered(_process, jobs, chunksize), start=1
+        ):
+            rel = os.path.relpath(path, root)
+            counts[status] += 1
+            if status == "failed":
+                errors[rel] = entry
+                entries.pop(rel, None)
+            else:
+                entries[rel] = entry
+            if progress and i % 25 == 0:
+                _report(i, len(jobs), counts, t0)
+
+    if progress:
+        _report(len(jobs), len(jobs), counts, t0, final=True)
+
+    # Forget files that no longer exist (only within the walked subtree)
+    walked = {os.path.relpath(p, root) for p in paths}
+    for rel in list(entries):
+        if rel not in walked and _in_scope(rel, user, project):
+            del entries[rel]
+
+    _save_state(root, state)
+
+    results = {rel: entries[rel]["result"] for rel in sorted(walked) if rel in entries}
+    return results, errors, counts
+
+
+def _in_scope(rel, user, project):
+    parts = rel.split(os.sep)
+    return (user is None or parts[0] == user) and (project is None or parts[1] == project)
+
+
+def write_summary(results, filepath):
+    fields = ["path", "method", "timestamp", "points", "x_min", "x_max",
+              "y_min", "y_max", "y_mean", "peak_x", "peak_y", "valley_x", "valley_y"]
+    with open(filepath, "w", newline="") as f:
+        writer = csv.DictWriter(f, fields, extrasaction="ignore")
+        writer.writeheader()
+        for rel, result in results.items():
+            writer.writerow({"path": rel, **result})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.bulk", description=__doc__.split("\n\n")[0])
+    parser.add_argument("task", choices=sorted(TASKS))
+    parser.add_argument("--root", default=DEFAULT_ROOT, help="data tree (default: %(default)s)")
+    parser.add_argument("--user")
+    parser.add_argument("--project")
+    parser.add_argument("--to", choices=("egr", "csv"), default="egr", help="convert: target format")
+    parser.add_argument("--out", help="summary: output CSV (default: <root>/summary.csv)")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, help="files per scheduled chunk")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    options = {"to": args.to} if args.task == "convert" else {}
+    results, errors, counts = process_tree(
+        args.task, args.root, options, args.user, args.project,
+        args.jobs, args.chunksize, progress=not args.quiet
+    )
+
+    if args.task == "summary":
+        out = args.out or os.path.join(args.root, "summary.csv")
+        write_summary(results, out)
+        print(f"Summary of {len(results)} runs written to {out}")
+
+    if args.task == "convert":
+        skipped = {rel: r["skipped"] for rel, r in results.items() if r.get("skipped")}
+        for rel, reason in skipped.items():
+            print(f"[SKIP] {rel}: {reason}")
+
+    for rel, error in errors.items():
+        print(f"[WARN] {rel}: {error}")
+
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
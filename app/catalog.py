@@ -0,0 +1,338 @@
+# app/catalog.py
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from app import runfile
+from app.data import RUN_EXTENSIONS, derived_copies, read_run
+from app.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+DATA_EXTENSIONS = RUN_EXTENSIONS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    user    TEXT NOT NULL,
+    project TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (user, project)
+);
+CREATE TABLE IF NOT EXISTS runs (
+    path      TEXT PRIMARY KEY,
+    user      TEXT,
+    project   TEXT,
+    method    TEXT,
+    mode      TEXT,
+    timestamp TEXT,
+    mtime     REAL,
+    size      INTEGER,
+    format    TEXT,
+    columns   TEXT,
+    points    INTEGER,
+    x_min REAL, x_max REAL,
+    y_min REAL, y_max REAL, y_mean REAL
+);
+CREATE TABLE IF NOT EXISTS params (
+    path       TEXT NOT NULL REFERENCES runs(path) ON DELETE CASCADE,
+    name       TEXT NOT NULL,
+    value_num  REAL,
+    value_text TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_method ON runs(method, timestamp);
+CREATE INDEX IF NOT EXISTS runs_project ON runs(user, project, timestamp);
+CREATE INDEX IF NOT EXISTS runs_timestamp ON runs(timestamp);
+CREATE INDEX IF NOT EXISTS params_name ON params(name, value_num);
+CREATE INDEX IF NOT EXISTS params_path ON params(path, name);
+"""
+
+_OPERATORS = ("=", "!=", "<", "<=", ">", ">=")
+
+
+class Catalog:
+    """
+    SQLite index of every run under root (<root>/<user>/<project>/<file>).
+
+    Stores each run's header metadata, parameters and summary statistics
+    of the plotted columns. refresh() only re-reads files whose mtime or
+    size changed, so it stays cheap on large data trees.
+
+        catalog.find(method="Cyclic Voltammetry", project="Project1",
+                     since="2026-09-17", params=[("scan_rate", ">", 100)])
+    """
+
+    def __init__(self, root, db_path=None):
+        self.root = root
+        self.db_path = db_path or os.path.join(root, "catalog.sqlite")
+        self._lock = threading.Lock()
+
+        os.makedirs(root, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call: usable from any thread
+        db = sqlite3.connect(self.db_path, timeout=10)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA foreign_keys = ON")
+        try:
+            with db:    # commit / rollback
+                yield db
+        finally:
+            db.close()
+
+    # -------------------------------------------------
+    # Indexing
+    # -------------------------------------------------
+    def refresh(self, progress=None):
+        """
+        Brings the index up to date with the files on disk.
+        Returns {"added", "updated", "removed", "unchanged"}.
+        """
+        folders, files = self._scan()
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+
+        with self._lock, self._connect() as db:
+            known = {
+                row["path"]: (row["mtime"], row["size"])
+                for row in db.execute("SELECT path, mtime, size FROM runs")
+            }
+
+            for path in set(known) - set(files):
+                db.execute("DELETE FROM runs WHERE path = ?", (path,))
+                counts["removed"] += 1
+
+            for i, (path, stat) in enumerate(files.items()):
+                if known.get(path) == stat:
+                    counts["unchanged"] += 1
+                    continue
+                counts["updated" if path in known else "added"] += 1
+                self._index(db, path, stat)
+                if progress is not None:
+                    progress((i + 1) / len(files))
+
+            db.execute("DELETE FROM folders")
+            db.executemany("INSERT INTO folders VALUES (?, ?)", folders)
+
+            # Keep the planner's statistics current (picks params_path
+            # over params_name for the EXISTS lookups in find())
+            if counts["added"] or counts["updated"] or counts["removed"]:
+                db.execute("ANALYZE")
+
+        return counts
+
+    def index_file(self, filepath):
+        """(Re-)indexes one run file, e.g. right after it was written."""
+        path = os.path.relpath(filepath, self.root)
+        st = os.stat(filepath)
+        parts = path.split(os.sep)
+
+        with self._lock, self._connect() as db:
+            self._index(db, path, (st.st_mtime, st.st_size))
+            if len(parts) == 3:
+                db.execute("INSERT OR IGNORE INTO folders VALUES (?, ?)", (parts[0], ""))
+                db.execute("INSERT OR IGNORE INTO folders VALUES (?, ?)", (parts[0], parts[1]))
+
+    def add_folder(self, user, project=""):
+        with self._lock, self._connect() as db:
+            db.execute("INSERT OR IGNORE INTO folders VALUES (?, ?)", (user, ""))
+            if project:
+                db.execute("INSERT OR IGNORE INTO folders VALUES (?, ?)", (user, project))
+
+    def _scan(self):
+        """([(user, project)], {relative path: (mtime, size)})"""
+        folders, files = [], {}
+
+        for user in os.scandir(self.root):
+            if not user.is_dir():
+                continue
+            folders.append((user.name, ""))
+
+            for project in os.scandir(user.path):
+                if not project.is_dir():
+                    continue
+                folders.append((user.name, project.name))
+
+                entries = [
+                    entry for entry in os.scandir(project.path)
+                    if entry.is_file() and entry.name.lower().endswith(DATA_EXTENSIONS)
+                ]
+                # A run converted to the other format is indexed once
+                derived = derived_copies([entry.path for entry in entries])
+                for entry in entries:
+                    if entry.path in derived:
+                        continue
+                    st = entry.stat()
+                    path = os.path.join(user.name, project.name, entry.name)
+                    files[path] = (st.st_mtime, st.st_size)
+
+        return folders, files
+
+    def _index(self, db, path, stat):
+        parts = path.split(os.sep)
+        user = parts[0] if len(parts) > 1 else ""
+        project = parts[1] if len(parts) > 2 else ""
+        filepath = os.path.join(self.root, path)
+
+        try:
+            header, x, y = _read_summary(filepath)
+        except Exception as e:
+            print(f"[CATALOG] Cannot index {filepath}: {e}")
+            header, x, y = {}, np.empty(0), np.empty(0)
+
+        timestamp = _iso_timestamp(header.get("timestamp"), stat[0])
+        stats = _column_stats(x, y)
+
+        db.execute("DELETE FROM runs WHERE path = ?", (path,))
+        db.execute(
+            "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                path, header.get("user") or user, header.get("project") or project,
+                header.get("method"), header.get("mode"), timestamp,
+                stat[0], stat[1],
+                "egr" if path.lower().endswith(runfile.EXTENSION) else "csv",
+                json.dumps(header.get("columns", [])),
+                *stats,
+            )
+        )
+        db.executemany(
+            "INSERT INTO params VALUES (?, ?, ?, ?)",
+            [
+                (path, name, *_param_columns(value))
+                for name, value in header.get("params", {}).items()
+            ]
+        )
+
+    # -------------------------------------------------
+    # Queries
+    # -------------------------------------------------
+    def users(self):
+        with self._connect() as db:
+            rows = db.execute("SELECT DISTINCT user FROM folders ORDER BY user")
+            return [row["user"] for row in rows]
+
+    def projects(self, user):
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT project FROM folders WHERE user = ? AND project != '' ORDER BY project",
+                (user,)
+            )
+            return [row["project"] for row in rows]
+
+    def find(self, method=None, mode=None, user=None, project=None,
+             since=None, until=None, params=(), limit=None):
+        """
+        Runs matching every given filter, newest first, as dicts.
+
+        since/until: datetime or ISO string ("2026-09-17"), inclusive.
+        params: (name, operator, value) tuples, operator one of
+        = != < <= > >=; numbers compare numerically.
+        """
+        where, args = [], []
+
+        for column, value in (("method", method), ("mode", mode),
+                              ("user", user), ("project", project)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                args.append(value)
+
+        if since is not None:
+            where.append("timestamp >= ?")
+            args.append(_iso(since))
+        if until is not None:
+            where.append("timestamp <= ?")
+            args.append(_iso(until, end=True))
+
+        for name, op, value in params:
+            if op not in _OPERATORS:
+                raise ValueError(f"Unsupported operator: {op}")
+            number, text = _param_columns(value)
+            column = "value_num" if number is not None else "value_text"
+            where.append(
+                "EXISTS (SELECT 1 FROM params p WHERE p.path = runs.path "
+                f"AND p.name = ? AND p.{column} {op} ?)"
+            )
+            args.extend((name, number if number is not None else text))
+
+        sql = "SELECT * FROM runs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY timestamp DESC"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+
+        with self._connect() as db:
+            runs = {row["path"]: dict(row) for row in db.execute(sql, args)}
+            for run in runs.values():
+                run["columns"] = json.loads(run["columns"] or "[]")
+                run["params"] = {}
+
+            # Parameters of the matches, a few hundred paths per query
+            paths = list(runs)
+            for start in range(0, len(paths), 500):
+                chunk = paths[start:start + 500]
+                rows = db.execute(
+                    "SELECT path, name, value_num, value_text FROM params "
+                    f"WHERE path IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )
+                for row in rows:
+                    value = row["value_num"] if row["value_num"] is not None else row["value_text"]
+                    runs[row["path"]]["params"][row["name"]] = value
+
+        return list(runs.values())
+
+
+# -------------------------------------------------
+# Helpers
+# -------------------------------------------------
+def _read_summary(filepath):
+    """(header, x column, y column) of a .csv or .egr run"""
+    run = read_run(filepath)
+    return run.header, run.x, run.y
+
+
+def _column_stats(x, y):
+    """points, x_min, x_max, y_min, y_max, y_mean (None when empty)"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if x.size == 0:
+        return (0, None, None, None, None, None)
+    # All-NaN columns: None, without nanmin's RuntimeWarning
+    x_range = (None, None) if np.isnan(x).all() else (float(np.nanmin(x)), float(np.nanmax(x)))
+    if np.isnan(y).all():
+        y_stats = (None, None, None)
+    else:
+        y_stats = (float(np.nanmin(y)), float(np.nanmax(y)), float(np.nanmean(y)))
+    return (int(x.size), *x_range, *y_stats)
+
+
+def _param_columns(value):
+    """(value_num, value_text) of a parameter value"""
+    try:
+        return float(value), str(value)
+    except (TypeError, ValueError):
+        return None, str(value)
+
+
+def _iso_timestamp(stamp, mtime):
+    # run_method timestamps are "YYYYmmdd_HHMMSS"; legacy files use mtime
+    if stamp:
+        try:
+            return datetime.strptime(stamp, "%Y%m%d_%H%M%S").isoformat()
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(mtime).isoformat(timespec="seconds")
+
+
+def _iso(value, end=False):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    value = str(value)
+    if end and len(value) == 10:
+        # whole day: "2026-10-17" -> up to 2026-10-17T23:59:59
+        return value + "T99"
+    return value
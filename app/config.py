@@ -1,8 +1,31 @@
 import json
 import os
 
+DEFAULT_SIMULATOR = {
+    "enabled": False,
+    "resource": "SIM::273A::INSTR",
+    "latency": 0.002,       # s per bus write, or {"default": s, "READI": s, ...}
+    "jitter": 0.0005,       # s, uniform ± around latency
+    "error_rate": 0.0,      # probability a command fails
+    "cell_resistance": 100e3,
+    "seed": None
+}
+
+DEFAULT_DEVICE_SCAN = {
+    "backends": ["", "@py"],    # VISA backends to probe ("" = default, e.g. NI-VISA)
+    "timeout": 3.0,             # s per backend / interface listing
+    "identify": False,          # send ID to every device found (picks out 273As)
+    "id_timeout": 1.0,          # s, VISA timeout of the ID query
+    "ttl": 30.0,                # s a scan result is reused
+    "verbose": False            # log backends / interfaces that fail
+}
+
 DEFAULT_CONFIG = {
-    "DEBUGGING": False
+    "DEBUGGING": False,
+    "DATA_FSYNC": False,    # fsync data files on every flush
+    "DATA_FORMAT": "csv",   # "csv" or "egr" (binary, see app/runfile.py)
+    "SIMULATOR": DEFAULT_SIMULATOR,
+    "DEVICE_SCAN": DEFAULT_DEVICE_SCAN
 }
 
 def load_config():
@@ -14,7 +37,10 @@ def load_config():
     try:
         with open(path, "r") as f:
             data = json.load(f)
-        return {**DEFAULT_CONFIG, **data}
+        config = {**DEFAULT_CONFIG, **data}
+        config["SIMULATOR"] = {**DEFAULT_SIMULATOR, **data.get("SIMULATOR", {})}
+        config["DEVICE_SCAN"] = {**DEFAULT_DEVICE_SCAN, **data.get("DEVICE_SCAN", {})}
+        return config
     except Exception as e:
         print(f"[CONFIG ERROR] {e}")
         return DEFAULT_CONFIG
@@ -22,3 +48,7 @@ def load_config():
 
 CONFIG = load_config()
 DEBUGGING = CONFIG["DEBUGGING"]
+DATA_FSYNC = CONFIG["DATA_FSYNC"]
+DATA_FORMAT = CONFIG["DATA_FORMAT"]
+SIMULATOR = CONFIG["SIMULATOR"]
+DEVICE_SCAN = CONFIG["DEVICE_SCAN"]
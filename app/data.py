@@ -0,0 +1,332 @@
+# app/data.py
+"""
+Reads saved runs back: run_method CSV files, older two-column CSV files
+(label row + data, e.g. Experiment1_001.csv) and binary .egr runs.
+
+    run = read_run("app/Data/Max/Project1/Experiment1_001.csv")
+    run.x, run.y, run["t"], run.params
+
+    for block in iter_blocks(path):     # huge files, a block at a time
+        ...
+"""
+import csv
+import io
+import os
+from datetime import datetime
+
+from app import runfile
+from app.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# Bytes parsed per block of CSV data
+BLOCK_BYTES = 1 << 22
+
+RUN_EXTENSIONS = (".csv", runfile.EXTENSION)
+
+
+class Run:
+    """
+    One saved run: header metadata plus its records (a structured array
+    with one field per data column; np.memmap for .egr files).
+    """
+
+    def __init__(self, path, header, records):
+        self.path = path
+        self.header = header
+        self.records = records
+
+        self.method = header.get("method")
+        self.mode = header.get("mode")
+        self.user = header.get("user")
+        self.project = header.get("project")
+        self.params = header.get("params", {})
+        self.columns = header.get("columns", list(records.dtype.names))
+        self.xfield = header.get("xfield", records.dtype.names[0])
+        self.yfield = header.get("yfield", records.dtype.names[min(1, len(records.dtype.names) - 1)])
+
+        # Plain label + data files written before the metadata header
+        self.legacy = header.get("legacy", False)
+
+    @property
+    def timestamp(self):
+        """datetime of the run, None for legacy files."""
+        stamp = self.header.get("timestamp")
+        if not stamp:
+            return None
+        try:
+            return datetime.strptime(stamp, "%Y%m%d_%H%M%S")
+        except ValueError:
+            return None
+
+    @property
+    def x(self):
+        return self.records[self.xfield]
+
+    @property
+    def y(self):
+        return self.records[self.yfield]
+
+    @property
+    def fields(self):
+        return self.records.dtype.names
+
+    def __getitem__(self, name):
+        """Column by field name or by CSV label."""
+        if name not in self.records.dtype.names and name in self.columns:
+            name = self.records.dtype.names[self.columns.index(name)]
+        return self.records[name]
+
+    def __len__(self):
+        return len(self.records)
+
+    def __repr__(self):
+        return f"Run({self.path!r}, method={self.method!r}, points={len(self)})"
+
+
+def find_runs(root, user=None, project=None):
+    """
+    Paths of the run files under root, following the run_method layout
+    <root>/<user>/<project>/<file>; user/project restrict the walk.
+    Converted copies of a run (see derived_copies) are left out.
+    """
+    paths = []
+    for user_dir in sorted(os.scandir(root), key=lambda e: e.name):
+        if not user_dir.is_dir() or (user is not None and user_dir.name != user):
+            continue
+        for project_dir in sorted(os.scandir(user_dir.path), key=lambda e: e.name):
+            if not project_dir.is_dir() or (project is not None and project_dir.name != project):
+                continue
+            files = [
+                entry.path for entry in sorted(os.scandir(project_dir.path), key=lambda e: e.name)
+                if entry.is_file() and entry.name.lower().endswith(RUN_EXTENSIONS)
+            ]
+            derived = derived_copies(files)
+            paths.extend(path for path in files if path not in derived)
+    return paths
+
+
+def derived_copies(paths):
+    """
+    Paths that are the converted twin of another path in paths: the
+    same run as both name.csv and name.egr. The twin whose header names
+    the other as its "source" is the copy; failing that (files converted
+    before sources were recorded), the newer one.
+    """
+    by_stem = {}
+    for path in paths:
+        stem, ext = os.path.splitext(path)
+        if ext.lower() in RUN_EXTENSIONS:
+            by_stem.setdefault(stem, []).append(path)
+
+    derived = set()
+    for twins in by_stem.values():
+        if len(twins) != 2:
+            continue
+        sources = {}
+        for path in twins:
+            try:
+                sources[path] = read_header(path)[0].get("source")
+            except (OSError, ValueError):
+                sources[path] = None
+        a, b = twins
+        if sources[a] == os.path.basename(b) and sources[b] != os.path.basename(a):
+            derived.add(a)
+        elif sources[b] == os.path.basename(a) and sources[a] != os.path.basename(b):
+            derived.add(b)
+        else:
+            derived.add(max(twins, key=os.path.getmtime))
+    return derived
+
+
+# -------------------------------------------------
+# Headers
+# -------------------------------------------------
+def read_header(path):
+    """
+    Returns (header, byte offset of the first data row / record).
+
+    CSV header: method, mode, timestamp, user, project from the "# Key:"
+    lines, params from the PARAMETERS block, columns from the label row;
+    legacy is True when there is no metadata.
+    """
+    if _is_runfile(path):
+        return runfile.read_header(path)
+
+    header = {"params": {}}
+    section = None
+    metadata = False
+
+    with open(path, "rb") as f:
+        while True:
+            start = f.tell()
+            line = f.readline()
+            if not line:
+                raise ValueError(f"{path}: no data section")
+
+            row = next(csv.reader([line.decode("utf-8", "replace")]), [])
+            if not row or not row[0].strip():
+                continue
+            first = row[0].strip()
+
+            if first.startswith("#"):
+                metadata = True
+                text = first.lstrip("#").strip()
+                if text in ("PARAMETERS", "DATA"):
+                    section = text
+                elif ":" in text:
+                    key, value = text.split(":", 1)
+                    header[key.strip().lower()] = value.strip()
+                continue
+
+            if section == "PARAMETERS":
+                header["params"][first] = _param_value(row[1] if len(row) > 1 else "")
+                continue
+
+            labels = [label.strip() for label in row]
+            if _all_numbers(labels):
+                # No label row: data starts here
+                labels = [f"col{i}" for i in range(len(labels))]
+                offset = start
+            else:
+                offset = f.tell()
+            break
+
+    names = _field_names(labels)
+    header["columns"] = labels
+    header["xfield"] = names[0]
+    header["yfield"] = names[1] if len(names) > 1 else names[0]
+    header["legacy"] = not metadata
+    return header, offset
+
+
+def _is_runfile(path):
+    return str(path).lower().endswith(runfile.EXTENSION)
+
+
+def _field_names(labels):
+    # Labels as structured-array field names (unique, non-empty)
+    names = []
+    for i, label in enumerate(labels):
+        name = label or f"col{i}"
+        if name in names:
+            name = f"{name}_{i}"
+        names.append(name)
+    return names
+
+
+def _all_numbers(values):
+    try:
+        for v in values:
+            float(v)
+        return True
+    except ValueError:
+        return False
+
+
+def _param_value(text):
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+
+# -------------------------------------------------
+# Data
+# -------------------------------------------------
+def read_run(path, mmap=True):
+    """Reads a whole run. .egr records are memory-mapped unless mmap=False."""
+    if _is_runfile(path):
+        header, records = runfile.load(path, mmap=mmap)
+        return Run(path, header, records)
+
+    header, offset = read_header(path)
+    blocks = list(_csv_blocks(path, header, offset, BLOCK_BYTES))
+    if blocks:
+        records = np.concatenate(blocks) if len(blocks) > 1 else blocks[0]
+    else:
+        records = np.empty(0, dtype=_csv_dtype(header))
+    return Run(path, header, records)
+
+
+def iter_blocks(path, block_bytes=BLOCK_BYTES):
+    """
+    Yields the run's records a block at a time (structured arrays), so
+    files larger than memory can be processed.
+    """
+    if _is_runfile(path):
+        header, records = runfile.load(path)
+        rows = max(1, block_bytes // records.dtype.itemsize)
+        for start in range(0, len(records), rows):
+            yield records[start:start + rows]
+        return
+
+    header, offset = read_header(path)
+    yield from _csv_blocks(path, header, offset, block_bytes)
+
+
+def _csv_blocks(path, header, offset, block_bytes):
+    dtype = _csv_dtype(header)
+
+    with open(path, "rb") as f:
+        f.seek(offset)
+        rest = b""
+        while True:
+            chunk = f.read(block_bytes)
+            if not chunk:
+                break
+            chunk = rest + chunk
+            cut = chunk.rfind(b"\n") + 1
+            if cut == 0:
+                rest = chunk
+                continue
+            chunk, rest = chunk[:cut], chunk[cut:]
+            block = _parse_block(chunk, dtype)
+            if len(block):
+                yield block
+
+        if rest.strip():
+            # Last row without a line end (e.g. run cut short)
+            yield _parse_block(rest, dtype)
+
+
+def _csv_dtype(header):
+    return np.dtype([(name, "f8") for name in _field_names(header["columns"])])
+
+
+def _parse_block(chunk, dtype):
+    """CSV rows (bytes) -> structured array, NaN for unparsable fields."""
+    width = len(dtype.names)
+    if not chunk.strip():
+        return np.empty(0, dtype=dtype)
+    try:
+        # Fast path: one C-level parse of the whole block
+        data = np.loadtxt(io.BytesIO(chunk), delimiter=",", ndmin=2, dtype=float)
+        if data.shape[1] != width:
+            raise ValueError("column count")
+    except ValueError:
+        data = _parse_rows(chunk, width)
+
+    records = np.empty(len(data), dtype=dtype)
+    for i, name in enumerate(dtype.names):
+        records[name] = data[:, i]
+    return records
+
+
+def _parse_rows(chunk, width):
+    # Slow path: row by row, tolerating bad and short rows
+    rows = []
+    for line in chunk.splitlines():
+        if not line.strip():
+            continue
+        fields = line.split(b",")
+        row = []
+        for i in range(width):
+            try:
+                row.append(float(fields[i]))
+            except (IndexError, ValueError):
+                row.append(float("nan"))
+        rows.append(row)
+    return np.array(rows, dtype=float).reshape(-1, width)
@@ -0,0 +1,135 @@
+# app/data_writer.py
+import csv
+import itertools
+import os
+import queue
+import threading
+import time
+
+_STOP = object()
+
+
+class DataWriter:
+    """
+    Writes a run's CSV file from its own thread.
+
+    The acquisition thread calls put()/put_many() with rows of any width
+    (e.g. MethodBase records); rows are formatted a block at a time and
+    flushed every flush_rows rows or flush_interval seconds (optionally
+    fsync'ed).
+    Nothing here touches the GUI.
+    """
+
+    def __init__(self, filepath, header_rows=(), flush_rows=1000,
+                 flush_interval=1.0, fsync=False):
+        self.filepath = filepath
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+
+        self.rows_written = 0
+        self.error = None
+
+        self._queue = queue.Queue()
+        self._file = self._open(header_rows)
+
+        self._thread = threading.Thread(
+            target=self._loop,
+            name=f"writer-{os.path.basename(filepath)}",
+            daemon=True
+        )
+        self._thread.start()
+
+    # -------------------------------------------------
+    # Producer side (any thread)
+    # -------------------------------------------------
+    def put(self, *row):
+        # NumPy scalars -> Python numbers (their repr is not a plain number)
+        self._queue.put(tuple(v.item() if hasattr(v, "item") else v for v in row))
+
+    def put_many(self, records):
+        """records: structured array, (n, columns) array or list of rows."""
+        self._queue.put(records)
+
+    def close(self, timeout=None):
+        """Writes everything queued so far and closes the file."""
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    # -------------------------------------------------
+    # File format (overridden by RunFileWriter)
+    # -------------------------------------------------
+    def _open(self, header_rows):
+        f = open(self.filepath, "w", newline="")
+
+        # Header rows (metadata, parameters, column labels)
+        csv.writer(f).writerows(header_rows)
+        f.flush()
+        return f
+
+    def _write_items(self, items):
+        rows = []
+        for item in items:
+            if isinstance(item, tuple):
+                rows.append(item)
+            else:
+                # structured arrays -> tuples, 2-D arrays -> lists
+                rows.extend(item.tolist() if hasattr(item, "tolist") else item)
+        if not rows:
+            return
+
+        # One %-format for the whole block; %r keeps full float precision
+        # (and writes integer fields without a trailing .0)
+        width = len(rows[0])
+        line = ",".join(["%r"] * width) + "\r\n"
+        text = (line * len(rows)) % tuple(itertools.chain.from_iterable(rows))
+        self._file.write(text)
+        self._sync()
+
+        self.rows_written += len(rows)
+
+    def _sync(self):
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    # -------------------------------------------------
+    # Writer thread
+    # -------------------------------------------------
+    def _loop(self):
+        items = []          # row tuples and record blocks, in order
+        n_pending = 0
+        last_flush = time.perf_counter()
+
+        try:
+            while True:
+                timeout = max(0.0, last_flush + self.flush_interval - time.perf_counter())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                if item is _STOP:
+                    break
+
+                if item is not None:
+                    items.append(item)
+                    n_pending += 1 if isinstance(item, tuple) else len(item)
+
+                due = time.perf_counter() - last_flush >= self.flush_interval
+                if n_pending >= self.flush_rows or (due and n_pending):
+                    self._write_items(items)
+                    items, n_pending = [], 0
+                    last_flush = time.perf_counter()
+                elif due:
+                    last_flush = time.perf_counter()
+
+            if items:
+                self._write_items(items)
+
+        except Exception as e:
+            self.error = e
+            print(f"[WRITER ERROR] {self.filepath}: {e}")
+
+        finally:
+            self._file.close()
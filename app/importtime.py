@@ -0,0 +1,96 @@
+# app/importtime.py
+"""
+Import-time profiler: imports each module in a fresh interpreter with
+-X importtime and reports what it pulled in and what it cost.
+
+    python -m app.importtime                      # app's main modules
+    python -m app.importtime app.main --top 30
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+DEFAULT_MODULES = (
+    "app.methods.base",
+    "app.methods.loader",
+    "app.instruments.EGG273A",
+    "app.instruments.sessions",
+    "app.run_manager",
+    "app.data",
+    "app.catalog",
+)
+
+# Packages that must not load just to list methods or talk to the 273A
+HEAVY_MODULES = ("numpy", "matplotlib", "PySide6", "pyvisa", "customtkinter", "asyncio")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(code):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{code!r} failed:\n{proc.stderr.strip()[-2000:]}")
+
+    # "import time: self [us] | cumulative | imported package", nesting by indent
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        top_level = not name[1:].startswith(" ")
+        entries.append((int(cumulative), int(self_us), name.strip(), top_level))
+    return entries, proc.stdout
+
+
+_startup = None
+
+
+def _startup_modules():
+    # Imported by the interpreter itself (site, encodings, ...), not by us
+    global _startup
+    if _startup is None:
+        _startup = {name for _, _, name, _ in _run("pass")[0]}
+    return _startup
+
+
+def profile(module):
+    """
+    Cold-imports module in a subprocess (run from the repository root).
+    Returns (total_us, [(cumulative_us, self_us, name)], loaded heavy modules).
+    """
+    code = (
+        f"import {module}, sys; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    entries, stdout = _run(code)
+    startup = _startup_modules()
+
+    entries = [e for e in entries if e[2] not in startup]
+    total = sum(cumulative for cumulative, _, _, top_level in entries if top_level)
+    heavy = [m for m in stdout.strip().split(",") if m]
+    return total, [e[:3] for e in entries], heavy
+
+
+def cold_import_ms(module):
+    return profile(module)[0] / 1000.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.importtime", description=__doc__.split("\n\n")[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=10, help="most expensive imports to list per module")
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        total, entries, heavy = profile(module)
+        print(f"{module}: {total / 1000:.1f} ms, heavy: {', '.join(heavy) or 'none'}")
+        for cumulative, self_us, name in sorted(entries, reverse=True)[:args.top]:
+            print(f"    {cumulative / 1000:8.1f} ms  (self {self_us / 1000:6.1f})  {name.strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# app/instruments/AsyncEGG273A.py
+import asyncio
+import time
+from app.instruments.EGG273A import EGG273A
+from app.methods.base import ControlMode
+from app.config import DEBUGGING
+
+class AsyncEGG273A(EGG273A):
+    """
+    asyncio counterpart of EGG273A.
+
+    Same commands and reply parsing; every method that talks to the
+    device (set_mode, set_value, read_value, step_and_read, transaction,
+    the *_encoded and curve methods) is a coroutine. Blocking VISA calls run
+    in the default executor, serialized per instrument, so one event loop
+    can drive several instruments.
+    """
+
+    def __init__(self, device=None):
+        super().__init__(device)
+        self._lock = asyncio.Lock()
+
+    async def _write(self, command):
+        await asyncio.to_thread(self.device.write, command)
+
+    async def _read(self):
+        return await asyncio.to_thread(self.device.read)
+
+    async def _read_raw(self):
+        return await asyncio.to_thread(self.device.read_raw)
+
+    async def set_mode(self, mode):
+        self.mode = mode
+
+        if DEBUGGING and self.device is None:
+            super().set_mode(mode)
+            return
+
+        # Two writes, as EGG273A.set_mode: the mode settles before the cell
+        # is switched on
+        async with self._lock:
+            if self.mode == ControlMode.POTENTIOSTAT:
+                await self._write("MODE 2")
+            else:
+                await self._write("MODE 1")
+            await self._write("CELL 1")
+
+    async def set_value(self, value):
+        if DEBUGGING and self.device is None:
+            super().set_value(value)
+            return
+
+        async with self._lock:
+            await self._write(self._setpoint_command(value))
+
+    async def read_value(self):
+        if DEBUGGING and self.device is None:
+            return super().read_value()
+
+        async with self._lock:
+            await self._write(self._read_command())
+            return self._parse_reading(await self._read_raw())
+
+    async def transaction(self, commands):
+        commands = list(commands)
+
+        if DEBUGGING and self.device is None:
+            return super().transaction(commands)
+
+        n_replies = sum(
+            1 for cmd in commands
+            if cmd.split(" ", 1)[0].upper() in self.QUERY_COMMANDS
+        )
+
+        async with self._lock:
+            await self._write(self.COMMAND_SEPARATOR.join(commands))
+            return [await self._read() for _ in range(n_replies)]
+
+    async def step_and_read(self, value):
+        if DEBUGGING and self.device is None:
+            EGG273A.set_value(self, value)
+            return EGG273A.read_value(self)
+
+        reply, = await self.transaction([
+            self._setpoint_command(value),
+            self._read_command(),
+        ])
+        return self._parse_reading(reply)
+
+    # -------------------------------------------------
+    # Pre-encoded setpoints
+    # -------------------------------------------------
+    async def set_value_encoded(self, command):
+        if DEBUGGING and self.device is None:
+            super().set_value_encoded(command)
+            return
+
+        async with self._lock:
+            await asyncio.to_thread(self.device.write_raw, command)
+
+    async def step_and_read_encoded(self, command):
+        if DEBUGGING and self.device is None:
+            return super().step_and_read_encoded(command)
+
+        async with self._lock:
+            await asyncio.to_thread(self.device.write_raw, command)
+            return self._parse_reading(await self._read_raw())
+
+    # -------------------------------------------------
+    # Onboard curve acquisition (hardware timed)
+    # -------------------------------------------------
+    async def load_scan(self, E_start, E_vertex, step, dt, cycles=1):
+        commands = self._scan_commands(E_start, E_vertex, step, dt, cycles)
+
+        if DEBUGGING and self.device is None:
+            print(self.COMMAND_SEPARATOR.join(commands))
+            return self.curve_points
+
+        await self.transaction(commands)
+        return self.curve_points
+
+    async def arm_curve(self):
+        if DEBUGGING and self.device is None:
+            super().arm_curve()
+            return
+
+        self.curve_t0 = time.perf_counter()
+        async with self._lock:
+            await self._write(self.CURVE_START)
+
+    async def curve_done(self):
+        if DEBUGGING and self.device is None:
+            return super().curve_done()
+
+        reply, = await self.transaction([self.CURVE_STATUS])
+        return reply.strip() == "1"
+
+    async def wait_curve(self, stop_event, progress=None, poll_interval=0.25):
+        duration = self.curve_points * self.curve_dt
+
+        while not await self.curve_done():
+            if stop_event.is_set():
+                await self.abort_curve()
+                return False
+
+            if progress is not None:
+                elapsed = time.perf_counter() - self.curve_t0
+                progress(min(elapsed / duration, 1.0))
+
+            await asyncio.sleep(poll_interval)
+
+        return True
+
+    async def abort_curve(self):
+        if DEBUGGING and self.device is None:
+            super().abort_curve()
+            return
+
+        async with self._lock:
+            await self._write(self.CURVE_ABORT)
+
+    async def dump_curve(self):
+        if DEBUGGING and self.device is None:
+            return super().dump_curve()
+
+        async with self._lock:
+            await self._write(self.CURVE_DUMP)
+            replies = [await self._read_raw() for _ in range(self.curve_points)]
+        return self.parser.block(replies, self.mode)
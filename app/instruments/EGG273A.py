@@ -1,17 +1,47 @@
 # app/instruments/EEG273A.py
 import math
+import time
 from app.instruments.base import InstrumentBase
+from app.instruments.parsing import ReplyParser
+from app.lazy import lazy_import
 from app.methods.base import ControlMode
 from app.config import DEBUGGING
 
+np = lazy_import("numpy")
+
 class EGG273A(InstrumentBase):
 
+    # Commands that make the instrument send a reply line
+    QUERY_COMMANDS = ("READI", "READE", "ID", "VER", "ERR", "DONE")
+
+    # Separator used to pipeline several commands in one bus write
+    COMMAND_SEPARATOR = ";"
+
+    # Onboard curve acquisition (see Remote-Programming Command Handbook)
+    CURVE_STORE_CURRENT = "SIE 1"  # store current for every point
+    CURVE_TIME_BASE = "TMB"        # time per point in µs
+    CURVE_POINTS = "NP"            # number of points to acquire
+    CURVE_VERTEX = "VTX"           # vertex potential (mV)
+    CURVE_STEP = "STEP"            # staircase step (mV)
+    CURVE_CYCLES = "NC"            # number of cycles
+    CURVE_START = "TC"             # take curve
+    CURVE_STATUS = "DONE"          # 1 when the curve is complete
+    CURVE_ABORT = "HALT"
+    CURVE_DUMP = "DC"              # dump stored points
+
+    # Limits of the onboard time base (µs)
+    TMB_MIN_US = 50
+    TMB_MAX_US = 40000
+
     def __init__(self, device=None):
         """
         device: serial / GPIB object (None in DEBUGGING)
         """
         self.device = device
 
+        # Unparsable replies end up in self.parser.errors (as NaN readings)
+        self.parser = ReplyParser()
+
     def set_mode(self, mode):
         self.mode = mode
 
@@ -30,6 +60,60 @@ class EGG273A(InstrumentBase):
                 self.device.write("MODE 1")  # galvanostat mode
                 self.device.write("CELL 1")  # turn cell ON
 
+    # -------------------------------------------------
+    # Command encoding / reply decoding
+    # -------------------------------------------------
+    def _setpoint_command(self, value):
+        """
+        Builds the SETE / SETI command for the current mode.
+        """
+        if self.mode == ControlMode.POTENTIOSTAT:
+            return f"SETE {value}"
+
+        I = float(value)
+
+        # ---------------- ZERO CURRENT ----------------
+        if I == 0:
+            n1, n2 = 0, -6
+        else:
+            # Non-zero current
+            sign = -1 if I < 0 else 1
+            I_abs = abs(I)
+
+            # Find exponent so mantissa is within limits
+            n2 = int(math.floor(math.log10(I_abs)))
+            n2 = max(min(n2, -3), -10)
+
+            n1 = int(round(I_abs / (10 ** n2)))
+            n1 *= sign
+
+            # Clamp mantissa
+            if abs(n1) > 2000:
+                n1 = 2000 * sign
+
+        if DEBUGGING:
+            print(f"SETI {n1} {n2}  -> {n1 * 10**n2:.3e} A")
+
+        return f"SETI {n1} {n2}"
+
+    def _read_command(self):
+        """
+        READI in potentiostat mode, READE in galvanostat mode.
+        """
+        if self.mode == ControlMode.POTENTIOSTAT:
+            return "READI"
+        return "READE"
+
+    def _parse_reading(self, response):
+        """
+        Converts a READI ("mantissa,exponent") or READE reply to a float.
+        Bad replies give NaN and are recorded in self.parser.errors.
+        """
+        return self.parser.reading(response, self.mode)
+
+    # -------------------------------------------------
+    # Single commands
+    # -------------------------------------------------
     def set_value(self, value):
         if DEBUGGING and self.device is None:
             if self.mode == ControlMode.POTENTIOSTAT:
@@ -37,57 +121,239 @@ class EGG273A(InstrumentBase):
             else:
                 print(f"SETI {value}")
         else:
-            if self.mode == ControlMode.POTENTIOSTAT:
-                self.device.write(f"SETE {value}")
-            else:
-                I = float(value)
+            self.device.write(self._setpoint_command(value))
 
-                # ---------------- ZERO CURRENT ----------------
-                if I == 0:
-                    n1, n2 = 0, -6
-                else:
-                    # Non-zero current
-                    sign = -1 if I < 0 else 1
-                    I_abs = abs(I)
-
-                    # Find exponent so mantissa is within limits
-                    n2 = int(math.floor(math.log10(I_abs)))
-                    n2 = max(min(n2, -3), -10)
+    def read_value(self):
+        if DEBUGGING and self.device is None:
+            print(self._read_command())
+            return 0.001
+        else:
+            self.device.write(self._read_command())
+            return self._parse_reading(self.device.read_raw())
 
-                    n1 = int(round(I_abs / (10 ** n2)))
-                    n1 *= sign
+    # -------------------------------------------------
+    # Transactions
+    # -------------------------------------------------
+    def transaction(self, commands):
+        """
+        Sends several commands in a single bus write and collects
+        one reply per query command (READI, READE, ID, VER, ERR).
 
-                    # Clamp mantissa
-                    if abs(n1) > 2000:
-                        n1 = 2000 * sign
+        Returns the list of raw replies, in command order.
+        """
+        commands = list(commands)
+        n_replies = sum(
+            1 for cmd in commands
+            if cmd.split(" ", 1)[0].upper() in self.QUERY_COMMANDS
+        )
 
-                self.device.write(f"SETI {n1} {n2}")
+        if DEBUGGING and self.device is None:
+            print(self.COMMAND_SEPARATOR.join(commands))
+            return ["0.001"] * n_replies
 
-                if DEBUGGING:
-                    print(f"SETI {n1} {n2}  -> {n1 * 10**n2:.3e} A")
+        self.device.write(self.COMMAND_SEPARATOR.join(commands))
+        return [self.device.read() for _ in range(n_replies)]
 
-                
+    def step_and_read(self, value):
+        """
+        Applies a new setpoint and reads the response in one round trip.
 
-    def read_value(self):
+        Equivalent to set_value(value) followed by read_value().
+        """
         if DEBUGGING and self.device is None:
-            if self.mode == ControlMode.POTENTIOSTAT:
-                print(f"READI")
-                return 0.001
-            else:
-                print(f"READE")
-                return 0.001
+            self.set_value(value)
+            return self.read_value()
+
+        reply, = self.transaction([
+            self._setpoint_command(value),
+            self._read_command(),
+        ])
+        return self._parse_reading(reply)
+
+    # -------------------------------------------------
+    # Pre-encoded setpoints
+    # -------------------------------------------------
+    @staticmethod
+    def _seti_arrays(currents):
+        """
+        Vectorized SETI mantissa / exponent (same rules as _setpoint_command).
+        """
+        I = np.asarray(currents, dtype=float)
+        sign = np.where(I < 0, -1, 1)
+        I_abs = np.abs(I)
+        zero = I_abs == 0
+
+        with np.errstate(divide="ignore"):
+            n2 = np.floor(np.log10(np.where(zero, 1.0, I_abs)))
+        n2 = np.clip(n2, -10, -3)
+
+        # Python's 10 ** k, as in _setpoint_command (NumPy's power can
+        # differ in the last bit and flip x.5 mantissas)
+        pow10 = np.array([10 ** k for k in range(-10, -2)])
+        n1 = np.rint(I_abs / pow10[n2.astype(int) + 10])
+        n1 = np.minimum(n1, 2000) * sign
+
+        n1 = np.where(zero, 0, n1).astype(int)
+        n2 = np.where(zero, -6, n2).astype(int)
+        return n1, n2
+
+    def encode_setpoints(self, values, read=False):
+        """
+        Encodes a whole setpoint array once into ready-to-send command
+        bytes (termination included), so the acquisition loop does no
+        math or formatting.
+
+        read=True appends the READI/READE query to every command
+        (use with step_and_read_encoded).
+        """
+        if self.mode == ControlMode.POTENTIOSTAT:
+            commands = [f"SETE {v}" for v in np.asarray(values).tolist()]
         else:
-            if self.mode == ControlMode.POTENTIOSTAT:
-                self.device.write("READI")
-                response = self.device.read().strip().split(',')
+            n1, n2 = self._seti_arrays(values)
+            commands = [f"SETI {a} {b}" for a, b in zip(n1.tolist(), n2.tolist())]
 
-                value, exp = map(float, response)
-                current = value * (10 ** exp)
+        suffix = ""
+        if read:
+            suffix = self.COMMAND_SEPARATOR + self._read_command()
 
-                return current
-            else:
-                self.device.write("READE")
-                response = self.device.read().strip().split(',')                
-                voltage = float(response[0])
+        termination = getattr(self.device, "write_termination", None) or ""
+        return [(cmd + suffix + termination).encode("ascii") for cmd in commands]
+
+    def set_value_encoded(self, command):
+        """
+        Sends one command from encode_setpoints(values).
+        """
+        if DEBUGGING and self.device is None:
+            print(command.decode("ascii").strip())
+            return
+
+        self.device.write_raw(command)
+
+    def step_and_read_encoded(self, command):
+        """
+        Hot-loop counterpart of step_and_read for one command from
+        encode_setpoints(values, read=True).
+        """
+        if DEBUGGING and self.device is None:
+            print(command.decode("ascii").strip())
+            return 0.001
+
+        self.device.write_raw(command)
+        return self._parse_reading(self.device.read_raw())
+
+    # -------------------------------------------------
+    # Onboard curve acquisition (hardware timed)
+    # -------------------------------------------------
+    @classmethod
+    def time_base_us(cls, dt):
+        """
+        Dwell time dt (s) as onboard time base (µs). Raises ValueError
+        outside the instrument's limits.
+        """
+        tmb = int(round(dt * 1e6))
+        if not cls.TMB_MIN_US <= tmb <= cls.TMB_MAX_US:
+            raise ValueError(
+                f"Dwell time {dt:g} s outside onboard time base "
+                f"({cls.TMB_MIN_US} µs - {cls.TMB_MAX_US} µs)"
+            )
+        return tmb
+
+    def load_scan(self, E_start, E_vertex, step, dt, cycles=1):
+        """
+        Loads a staircase CV into the instrument's curve memory.
+
+        E_start, E_vertex, step: mV
+        dt: dwell time per point (s)
+
+        Returns the number of points the instrument will store.
+        """
+        commands = self._scan_commands(E_start, E_vertex, step, dt, cycles)
+
+        if DEBUGGING and self.device is None:
+            print(self.COMMAND_SEPARATOR.join(commands))
+            return self.curve_points
+
+        self.transaction(commands)
+        return self.curve_points
+
+    def _scan_commands(self, E_start, E_vertex, step, dt, cycles):
+        """
+        Curve setup commands of load_scan; sets curve_points / curve_dt.
+        """
+        tmb = self.time_base_us(dt)
+
+        points_per_cycle = 2 * int(math.ceil(abs(E_vertex - E_start) / step))
+        self.curve_points = points_per_cycle * int(cycles)
+        self.curve_dt = dt
+
+        commands = [
+            self.CURVE_STORE_CURRENT,
+            f"{self.CURVE_TIME_BASE} {tmb}",
+            f"{self.CURVE_POINTS} {self.curve_points}",
+            f"SETE {E_start}",
+            f"{self.CURVE_VERTEX} {E_vertex}",
+            f"{self.CURVE_STEP} {step}",
+            f"{self.CURVE_CYCLES} {int(cycles)}",
+        ]
+        return commands
+
+    def arm_curve(self):
+        """
+        Starts the loaded curve. Returns immediately.
+        """
+        self.curve_t0 = time.perf_counter()
+
+        if DEBUGGING and self.device is None:
+            print(self.CURVE_START)
+            return
+
+        self.device.write(self.CURVE_START)
+
+    def curve_done(self):
+        if DEBUGGING and self.device is None:
+            elapsed = time.perf_counter() - self.curve_t0
+            return elapsed >= self.curve_points * self.curve_dt
+
+        reply, = self.transaction([self.CURVE_STATUS])
+        return reply.strip() == "1"
+
+    def wait_curve(self, stop_event, progress=None, poll_interval=0.25):
+        """
+        Polls until the curve is complete or stop_event is set.
+
+        Returns True if the curve completed, False if it was aborted.
+        """
+        duration = self.curve_points * self.curve_dt
+
+        while not self.curve_done():
+            if stop_event.is_set():
+                self.abort_curve()
+                return False
+
+            if progress is not None:
+                elapsed = time.perf_counter() - self.curve_t0
+                progress(min(elapsed / duration, 1.0))
+
+            time.sleep(poll_interval)
+
+        return True
+
+    def abort_curve(self):
+        if DEBUGGING and self.device is None:
+            print(self.CURVE_ABORT)
+            return
+
+        self.device.write(self.CURVE_ABORT)
+
+    def dump_curve(self):
+        """
+        Reads the stored points back as a NumPy array
+        (current in A in potentiostat mode, voltage in galvanostat mode).
+        """
+        if DEBUGGING and self.device is None:
+            print(self.CURVE_DUMP)
+            return np.full(self.curve_points, 0.001)
 
-                return voltage
+        self.device.write(self.CURVE_DUMP)
+        replies = [self.device.read_raw() for _ in range(self.curve_points)]
+        return self.parser.block(replies, self.mode)
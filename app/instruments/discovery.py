@@ -0,0 +1,272 @@
+# app/instruments/discovery.py
+import queue
+import threading
+import time
+
+from app.config import DEVICE_SCAN, SIMULATOR
+from app.instruments.sessions import SESSIONS
+from app.instruments.simulator import SimulatedResourceManager, is_simulated
+
+# Pseudo backend for the simulator (see app/instruments/simulator.py)
+SIM_BACKEND = "sim"
+
+# Interfaces probed on every VISA backend, one list_resources() query each
+INTERFACES = {
+    "GPIB": "GPIB?*INSTR",
+    "ASRL": "ASRL?*INSTR",
+    "USB": "USB?*INSTR",
+    "TCPIP": "TCPIP?*INSTR",
+}
+
+
+def is_273a(identity):
+    """True for an ID reply of a 273 / 273A."""
+    return bool(identity) and identity.strip().startswith("273")
+
+
+class DeviceScanner:
+    """
+    Background VISA device discovery.
+
+    Every (backend, interface) pair is listed in its own daemon thread;
+    pairs that do not answer within `timeout` seconds are given up on
+    (a hung driver call cannot be cancelled, its thread is abandoned).
+    With identify=True every resource found is also sent ID, concurrently,
+    with a VISA timeout of id_timeout seconds.
+
+    Results are cached for `ttl` seconds. Callbacks are called from
+    worker threads (GUI code must hand them over to its own thread):
+
+        on_found(resource, info)        as each resource is listed
+        on_identified(resource, id)     id is None if it did not answer
+        on_done(devices)                {resource: info} of the whole scan
+
+    info: {"backend", "interface", "id"}.
+    """
+
+    def __init__(self, sessions=SESSIONS, backends=None, ttl=None, timeout=None,
+                 id_timeout=None):
+        self.sessions = sessions
+        self.backends = list(backends if backends is not None else DEVICE_SCAN["backends"])
+        self.ttl = ttl if ttl is not None else DEVICE_SCAN["ttl"]
+        self.timeout = timeout if timeout is not None else DEVICE_SCAN["timeout"]
+        self.id_timeout = id_timeout if id_timeout is not None else DEVICE_SCAN["id_timeout"]
+
+        self._lock = threading.Lock()
+        self._devices = {}          # resource -> info, of the last scan
+        self._scanned_at = None
+        self._identified = False
+        self._listeners = []        # callback triples of the running scan
+        self._done = None           # Event of the running scan
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+    def cached(self, identify=False):
+        """{resource: info} of the last scan if still fresh, else None."""
+        with self._lock:
+            if self._fresh(identify):
+                return dict(self._devices)
+            return None
+
+    def invalidate(self):
+        with self._lock:
+            self._scanned_at = None
+
+    def scan(self, on_found=None, on_identified=None, on_done=None,
+             identify=False, force=False):
+        """
+        Starts a scan in the background and returns at once. A fresh cache
+        is replayed to the callbacks instead; joining a running scan
+        replays what it found so far.
+        """
+        callbacks = (on_found, on_identified, on_done)
+
+        with self._lock:
+            if not force and self._fresh(identify):
+                devices = dict(self._devices)
+                replay, start = None, False
+            else:
+                replay = dict(self._devices) if self._done is not None else {}
+                self._listeners.append(callbacks)
+                start = self._done is None
+                if start:
+                    self._done = threading.Event()
+                    self._devices = {}
+                    self._scanned_at = None
+
+        if replay is None:
+            # Served from the cache, on the caller's thread
+            for resource, info in devices.items():
+                _call(on_found, resource, info)
+                if info["id"] is not None or identify:
+                    _call(on_identified, resource, info["id"])
+            _call(on_done, devices)
+            return
+
+        for resource, info in replay.items():
+            _call(on_found, resource, info)
+
+        if start:
+            threading.Thread(target=self._scan, args=(identify,), daemon=True,
+                             name="device-scan").start()
+
+    def list_resources(self, identify=False, force=False):
+        """Blocking variant: resource names, 273As first if identified."""
+        done = threading.Event()
+        result = {}
+
+        def _on_done(devices):
+            result.update(devices)
+            done.set()
+
+        self.scan(on_done=_on_done, identify=identify, force=force)
+        done.wait()
+        return sorted_resources(result)
+
+    # -------------------------------------------------
+    # Scan thread
+    # -------------------------------------------------
+    def _fresh(self, identify):
+        return (
+            self._scanned_at is not None
+            and time.monotonic() - self._scanned_at < self.ttl
+            and (self._identified or not identify)
+        )
+
+    def _emit(self, index, *args):
+        with self._lock:
+            listeners = list(self._listeners)
+        for callbacks in listeners:
+            _call(callbacks[index], *args)
+
+    def _scan(self, identify):
+        t0 = time.perf_counter()
+        results = queue.Queue()
+        probes = []
+
+        if SIMULATOR["enabled"]:
+            probes.append((SIM_BACKEND, "SIM"))
+        for backend in self.backends:
+            probes.extend((backend, interface) for interface in INTERFACES)
+
+        for backend, interface in probes:
+            threading.Thread(
+                target=self._probe, args=(backend, interface, results), daemon=True,
+                name=f"device-scan {backend or 'default'} {interface}"
+            ).start()
+
+        found = {}
+        id_threads = []
+        pending = set(probes)
+        deadline = time.monotonic() + self.timeout
+        while pending:
+            try:
+                backend, interface, resources, error = results.get(
+                    timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            pending.discard((backend, interface))
+            if error is not None:
+                if DEVICE_SCAN["verbose"]:
+                    print(f"[VISA] {backend or 'default'} {interface}: {error}")
+                continue
+
+            for resource in resources:
+                if resource in found:
+                    continue
+                info = {"backend": backend, "interface": interface, "id": None}
+                found[resource] = info
+                if backend != SIM_BACKEND:
+                    # Sessions open it with the backend that can see it
+                    self.sessions.set_backend(resource, backend)
+                with self._lock:
+                    self._devices[resource] = info
+                self._emit(0, resource, info)
+
+                if identify:
+                    # ID probes start as soon as a device is listed
+                    thread = threading.Thread(target=self._identify, args=(resource, info),
+                                              daemon=True, name=f"device-id {resource}")
+                    thread.start()
+                    id_threads.append(thread)
+
+        for backend, interface in sorted(pending):
+            print(f"[VISA] {backend or 'default'} {interface}: no answer within {self.timeout:g} s")
+
+        # Hard stop: VISA timeout plus some slack for open / close
+        deadline = time.monotonic() + self.id_timeout + 2.0
+        for thread in id_threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+
+        elapsed = time.perf_counter() - t0
+        print(f"[VISA] Scan: {len(found)} device(s) in {elapsed * 1000:.0f} ms")
+
+        with self._lock:
+            self._devices = found
+            self._scanned_at = time.monotonic()
+            self._identified = identify
+            self._done.set()
+            self._done = None
+            listeners, self._listeners = self._listeners, []
+
+        for callbacks in listeners:
+            _call(callbacks[2], dict(found))
+
+    def _probe(self, backend, interface, results):
+        try:
+            if backend == SIM_BACKEND:
+                resources = SimulatedResourceManager().list_resources()
+            else:
+                rm = self.sessions.resource_manager(backend)
+                resources = rm.list_resources(INTERFACES[interface])
+            results.put((backend, interface, tuple(resources), None))
+        except Exception as e:
+            # pyvisa raises for "no resources found" too
+            results.put((backend, interface, (), e))
+
+    def _identify(self, resource, info):
+        identity = None
+        try:
+            if resource in self.sessions.sessions:
+                # Already open (connected): do not disturb it, use its ID
+                identity = self.sessions.identify(resource)["id"]
+            else:
+                identity = self._query_id(resource, info["backend"])
+        except Exception as e:
+            if DEVICE_SCAN["verbose"]:
+                print(f"[VISA] {resource}: no ID ({e})")
+
+        info["id"] = identity
+        self._emit(1, resource, identity)
+
+    def _query_id(self, resource, backend):
+        if is_simulated(resource):
+            device = SimulatedResourceManager().open_resource(resource)
+        else:
+            device = self.sessions.resource_manager(backend).open_resource(resource)
+        try:
+            device.read_termination = '\r'
+            device.write_termination = '\r'
+            device.timeout = int(self.id_timeout * 1000)
+            device.write("ID")
+            return device.read().strip()
+        finally:
+            device.close()
+
+
+def sorted_resources(devices):
+    """Resource names of {resource: info}, identified 273As first."""
+    return sorted(devices, key=lambda resource: not is_273a(devices[resource]["id"]))
+
+
+def _call(callback, *args):
+    if callback is None:
+        return
+    try:
+        callback(*args)
+    except Exception as e:
+        print(f"[VISA] Scan callback failed: {e}")
+
+
+DEVICES = DeviceScanner()
@@ -0,0 +1,180 @@
+# app/instruments/parsing.py
+import math
+import re
+from collections import namedtuple
+
+from app.lazy import lazy_import
+from app.methods.base import ControlMode
+
+np = lazy_import("numpy")
+
+# One unparsable reply: position in the run/block, raw reply, reason
+BadReply = namedtuple("BadReply", "index raw reason")
+
+# "mantissa,exponent" (READI, curve dumps); optional spaces and sign
+_CURRENT_RE = re.compile(rb"^\s*([-+]?\d+(?:\.\d*)?)\s*,\s*([-+]?\d+)\s*$")
+
+# Plain number (READE)
+_NUMBER_RE = re.compile(rb"^\s*([-+]?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)\s*(?:,.*)?$")
+
+
+def _as_bytes(raw):
+    if isinstance(raw, str):
+        return raw.encode("ascii", "replace")
+    return bytes(raw)
+
+
+class ReplyParser:
+    """
+    Parses 273A replies (str or raw bytes) into floats.
+
+    Bad replies never raise: they become NaN and are recorded in
+    .errors as BadReply(index, raw, reason).
+    """
+
+    def __init__(self, max_errors=1000):
+        self.errors = []
+        self.max_errors = max_errors
+        self.count = 0
+
+    def _bad(self, index, raw, reason):
+        if len(self.errors) < self.max_errors:
+            self.errors.append(BadReply(index, raw, reason))
+        return float("nan")
+
+    # -------------------------------------------------
+    # Single replies
+    # -------------------------------------------------
+    def current(self, raw):
+        """READI reply "mantissa,exponent" -> A"""
+        index = self.count
+        self.count += 1
+
+        # Fast path: "1234,-9" -> float("1234e-9")
+        try:
+            if isinstance(raw, str):
+                mantissa, exp = raw.split(",")
+                return float(mantissa + "e" + exp.strip())
+            mantissa, exp = raw.split(b",")
+            return float(mantissa + b"e" + exp.strip())
+        except ValueError:
+            pass
+
+        match = _CURRENT_RE.match(_as_bytes(raw))
+        if match is None:
+            return self._bad(index, raw, "expected 'mantissa,exponent'")
+
+        mantissa, exp = match.groups()
+        return float(mantissa) * 10.0 ** int(exp)
+
+    def voltage(self, raw):
+        """READE reply -> first field as float"""
+        index = self.count
+        self.count += 1
+
+        try:
+            value = float(raw)
+            if math.isfinite(value):
+                return value
+        except ValueError:
+            pass
+
+        match = _NUMBER_RE.match(_as_bytes(raw))
+        if match is None:
+            return self._bad(index, raw, "expected a number")
+
+        return float(match.group(1))
+
+    def reading(self, raw, mode):
+        """READI in potentiostat mode, READE in galvanostat mode."""
+        if mode == ControlMode.POTENTIOSTAT:
+            return self.current(raw)
+        return self.voltage(raw)
+
+    # -------------------------------------------------
+    # Blocks (several replies or a curve dump)
+    # -------------------------------------------------
+    def block(self, replies, mode, separator=b"\r"):
+        """
+        Parses many replies in one call into a float array.
+
+        replies: list of replies, or one bytes/str blob of replies
+        joined by separator (e.g. a curve dump).
+        """
+        if isinstance(replies, (bytes, bytearray, str)):
+            replies = _as_bytes(replies).strip(separator + b"\n ").split(separator)
+        else:
+            replies = [_as_bytes(r) for r in replies]
+
+        start = self.count
+
+        # Fast path: every reply well formed -> one NumPy conversion.
+        # As strict as current() / voltage(): one comma per READI reply
+        # (a reply with more cannot convert) and no NaN / inf.
+        try:
+            if mode == ControlMode.POTENTIOSTAT:
+                if b"".join(replies).count(b",") != len(replies):
+                    raise ValueError("not 'mantissa,exponent'")
+                fields = [r.replace(b",", b"e") for r in replies]
+            else:
+                fields = [r.split(b",", 1)[0] for r in replies]
+            values = np.array(fields, dtype=float)
+            if not np.isfinite(values).all():
+                raise ValueError("NaN / inf")
+            self.count += len(replies)
+            return values
+        except ValueError:
+            pass
+
+        # Slow path: reply by reply, recording the bad ones
+        values = np.empty(len(replies))
+        for i, r in enumerate(replies):
+            self.count = start + i
+            values[i] = self.reading(r, mode)
+        self.count = start + len(replies)
+        return values
+
+    def summary(self):
+        if not self.errors:
+            return "no parse errors"
+        first = self.errors[0]
+        return (
+            f"{len(self.errors)} unparsable replies "
+            f"(first at #{first.index}: {first.raw!r}, {first.reason})"
+        )
+
+
+def _legacy_current(text):
+    # Original EGG273A.read_value parse, kept for comparison
+    value, exp = map(float, text.strip().split(','))
+    return value * (10 ** exp)
+
+
+def benchmark(n=100000):
+    """
+    Compares the legacy str/split/map parse with the fast paths.
+    Run with: python -m app.instruments.parsing
+    """
+    import timeit
+
+    raw = b"1234,-9\r"
+    names = {
+        "raw": raw,
+        "text": raw.decode(),
+        "parser": ReplyParser(),
+        "block": [raw] * 1000,
+        "mode": ControlMode.POTENTIOSTAT,
+        "legacy": _legacy_current,
+    }
+
+    results = {
+        "legacy str": timeit.timeit("legacy(text)", globals=names, number=n),
+        "fast bytes": timeit.timeit("parser.current(raw)", globals=names, number=n),
+        "block x1000": timeit.timeit("parser.block(block, mode)", globals=names, number=n // 1000),
+    }
+    for name, seconds in results.items():
+        print(f"{name:12s} {seconds / n * 1e6:8.3f} µs/reply")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,197 @@
+# app/instruments/sessions.py
+import threading
+import time
+
+from app.config import DEVICE_SCAN, SIMULATOR
+from app.instruments.simulator import SimulatedResourceManager, is_simulated
+
+# pyvisa StatusCode.error_timeout
+VI_ERROR_TMO = -1073807339
+
+
+def _is_timeout(error):
+    if getattr(error, "error_code", None) == VI_ERROR_TMO:
+        return True
+    return "timeout" in str(error).lower()
+
+
+class Session:
+    """
+    Open VISA resource that reconnects itself after a timeout.
+
+    A timed-out write is retried once on the fresh session; a timed-out
+    read reconnects and re-raises (its reply is lost either way).
+    """
+
+    def __init__(self, manager, resource_name, resource):
+        self._manager = manager
+        self.resource_name = resource_name
+        self.resource = resource
+
+        # Held over multi-command exchanges (identify) so their replies
+        # are not interleaved
+        self.lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # timeout, read_termination, close, ... of the underlying resource
+        return getattr(self.resource, name)
+
+    def __setattr__(self, name, value):
+        if name in ("_manager", "resource_name", "resource", "lock"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.resource, name, value)
+
+    def _call(self, name, *args, retry=False):
+        try:
+            return getattr(self.resource, name)(*args)
+        except Exception as e:
+            if not _is_timeout(e):
+                raise
+            print(f"[VISA] {self.resource_name}: timeout, reconnecting")
+            try:
+                self.resource.close()
+            except Exception:
+                pass
+            self.resource = self._manager._open_resource(self.resource_name)
+            if not retry:
+                raise
+            return getattr(self.resource, name)(*args)
+
+    def write(self, message):
+        return self._call("write", message, retry=True)
+
+    def write_raw(self, message):
+        return self._call("write_raw", message, retry=True)
+
+    def read(self):
+        return self._call("read")
+
+    def read_raw(self):
+        return self._call("read_raw")
+
+
+class SessionManager:
+    """
+    Process-wide VISA access: one cached ResourceManager, one open
+    Session per resource name, cached instrument identity.
+    """
+
+    # Settle time after opening a new resource (s)
+    SETTLE_TIME = 0.3
+
+    def __init__(self):
+        self._rms = {}          # VISA backend ("" = default, "@py", ...) -> ResourceManager
+        self._lock = threading.RLock()
+        self.sessions = {}
+        self.identities = {}
+        self.backends = {}      # resource name -> backend it was found on (see discovery)
+
+    def resource_manager(self, backend=""):
+        with self._lock:
+            if backend not in self._rms:
+                import pyvisa
+                self._rms[backend] = pyvisa.ResourceManager(backend)  ##Change to '@py'
+            return self._rms[backend]
+
+    def list_resources(self):
+        """Simulated resource (if enabled) plus VISA resources, [] on failure."""
+        devices = []
+        if SIMULATOR["enabled"]:
+            devices.extend(SimulatedResourceManager().list_resources())
+        try:
+            devices.extend(self.resource_manager().list_resources())
+        except Exception:
+            pass
+        return devices
+
+    def set_backend(self, resource_name, backend):
+        """Opens resource_name with this VISA backend from now on."""
+        with self._lock:
+            self.backends[resource_name] = backend
+
+    def _open_resource(self, resource_name):
+        if is_simulated(resource_name):
+            resource = SimulatedResourceManager().open_resource(resource_name)
+        else:
+            resource = self._open_visa(resource_name)
+            time.sleep(self.SETTLE_TIME)
+
+        resource.read_termination = '\r'
+        resource.write_termination = '\r'
+        resource.timeout = 10000
+        return resource
+
+    def _open_visa(self, resource_name):
+        # The backend the scan found it on; not scanned (e.g. app.run
+        # --resource): each configured backend in turn
+        backend = self.backends.get(resource_name)
+        backends = [backend] if backend is not None else (DEVICE_SCAN["backends"] or [""])
+
+        error = None
+        for backend in backends:
+            try:
+                resource = self.resource_manager(backend).open_resource(resource_name)
+            except Exception as e:
+                error = e
+                continue
+            self.set_backend(resource_name, backend)
+            return resource
+        raise error
+
+    def open(self, resource_name):
+        """Returns the cached Session for resource_name, opening it if needed."""
+        with self._lock:
+            session = self.sessions.get(resource_name)
+            if session is None:
+                session = Session(self, resource_name, self._open_resource(resource_name))
+                self.sessions[resource_name] = session
+            return session
+
+    def identify(self, resource_name, refresh=False):
+        """
+        {"id", "version", "error"} of the instrument, queried once
+        (ID;VER;ERR in a single write) and cached.
+        """
+        with self._lock:
+            if not refresh and resource_name in self.identities:
+                return self.identities[resource_name]
+
+        session = self.open(resource_name)
+
+        # Bus I/O outside the manager lock: other instruments are not held up
+        with session.lock:
+            session.write("ID;VER;ERR")
+            identity = {
+                "id": session.read().strip(),
+                "version": session.read().strip(),
+                "error": session.read().strip(),
+            }
+
+        with self._lock:
+            # Not for a session closed meanwhile
+            if self.sessions.get(resource_name) is session:
+                self.identities[resource_name] = identity
+        return identity
+
+    def close(self, resource_name):
+        """Turns the cell off and closes the session."""
+        with self._lock:
+            session = self.sessions.pop(resource_name, None)
+            self.identities.pop(resource_name, None)
+
+        if session is None:
+            return
+
+        try:
+            session.write("CELL 0")  # turn cell OFF
+            session.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        for resource_name in list(self.sessions):
+            self.close(resource_name)
+
+
+SESSIONS = SessionManager()
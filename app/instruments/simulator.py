@@ -0,0 +1,245 @@
+# app/instruments/simulator.py
+import math
+import random
+import time
+from collections import deque
+
+from app.config import SIMULATOR
+
+# Resource names starting with this prefix are served by the simulator
+SIM_PREFIX = "SIM::"
+
+
+def is_simulated(resource):
+    return bool(resource) and resource.startswith(SIM_PREFIX)
+
+
+class SimulatedVisaError(Exception):
+    pass
+
+
+class Simulated273A:
+    """
+    Fake VISA resource speaking the 273A command subset used by this app.
+
+    Cell model: resistor of cell_resistance ohms (like the 100 kΩ dummy
+    cell). Commands may be pipelined with ';'. Every write is one bus
+    round trip and costs latency ± jitter seconds once, however many
+    commands it carries (its reply is then read without further delay);
+    error_rate injects failed commands (ERR reports them, queries
+    reply '?').
+
+    latency: seconds, or {"default": s, "READI": s, ...} per command
+    (a pipelined write costs the largest latency of its commands).
+    """
+
+    def __init__(self, resource_name=SIM_PREFIX + "273A::INSTR", latency=0.0,
+                 jitter=0.0, error_rate=0.0, cell_resistance=100e3, seed=None):
+        self.resource_name = resource_name
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.cell_resistance = cell_resistance
+
+        # pyvisa resource attributes
+        self.read_termination = '\r'
+        self.write_termination = '\r'
+        self.timeout = 10000
+
+        self._random = random.Random(seed)
+        self._replies = deque()
+        self._closed = False
+
+        self.mode = 2        # 1 galvanostat, 2 potentiostat
+        self.cell = 0
+        self.potential = 0.0  # mV
+        self.current = 0.0    # A
+        self.error = 0
+
+        # Curve acquisition
+        self.curve = {"TMB": 1000, "NP": 0, "VTX": 0.0, "STEP": 1.0, "NC": 1}
+        self._curve_t0 = None
+        self._curve_start = 0.0
+
+    # -------------------------------------------------
+    # pyvisa resource API
+    # -------------------------------------------------
+    def write(self, message):
+        if self._closed:
+            raise SimulatedVisaError("Resource closed")
+
+        commands = [command.strip() for command in message.split(";") if command.strip()]
+        if commands:
+            self._delay(commands)
+        for command in commands:
+            self._execute(command)
+
+    def write_raw(self, message):
+        message = message.decode("ascii")
+        if self.write_termination and message.endswith(self.write_termination):
+            message = message[:-len(self.write_termination)]
+        self.write(message)
+
+    def read(self):
+        if self._closed:
+            raise SimulatedVisaError("Resource closed")
+        if not self._replies:
+            raise SimulatedVisaError("Timeout expired before operation completed")
+        return self._replies.popleft() + self.read_termination
+
+    def read_raw(self):
+        return self.read().encode("ascii")
+
+    def query(self, message):
+        self.write(message)
+        return self.read()
+
+    def close(self):
+        self._closed = True
+
+    # -------------------------------------------------
+    # Timing / errors
+    # -------------------------------------------------
+    def _delay(self, commands):
+        latency = self.latency
+        if isinstance(latency, dict):
+            default = latency.get("default", 0.0)
+            latency = max(latency.get(command.split(" ", 1)[0].upper(), default) for command in commands)
+
+        delay = latency + self._random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    # -------------------------------------------------
+    # Command set
+    # -------------------------------------------------
+    def _execute(self, command):
+        name, *args = command.split()
+        name = name.upper()
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.error = 1
+            if name in ("READI", "READE", "ID", "VER", "ERR", "DONE"):
+                self._replies.append("?")
+            return
+
+        handler = getattr(self, "_cmd_" + name, None)
+        if handler is None:
+            self.error = 2  # unknown command
+            return
+
+        try:
+            reply = handler(*args)
+        except (TypeError, ValueError):
+            self.error = 3  # bad argument
+            return
+
+        if reply is not None:
+            self._replies.append(reply)
+
+    def _cmd_ID(self):
+        return "273A"
+
+    def _cmd_VER(self):
+        return "SIM 1.00"
+
+    def _cmd_ERR(self):
+        error, self.error = self.error, 0
+        return str(error)
+
+    def _cmd_MODE(self, mode):
+        self.mode = int(mode)
+
+    def _cmd_CELL(self, state):
+        self.cell = int(state)
+
+    def _cmd_SETE(self, mv):
+        self.potential = float(mv)
+        self.current = self.potential * 1e-3 / self.cell_resistance
+
+    def _cmd_SETI(self, n1, n2):
+        self.current = int(n1) * 10 ** int(n2)
+        self.potential = self.current * self.cell_resistance * 1e3
+
+    def _cmd_READI(self):
+        current = self.current if self.cell else 0.0
+        return self._format_current(current)
+
+    def _cmd_READE(self):
+        return str(int(round(self.potential if self.cell else 0.0)))
+
+    # ---------------- Curve acquisition ----------------
+    def _cmd_SIE(self, what):
+        int(what)
+
+    def _cmd_TMB(self, us):
+        self.curve["TMB"] = int(us)
+
+    def _cmd_NP(self, n):
+        self.curve["NP"] = int(n)
+
+    def _cmd_VTX(self, mv):
+        self.curve["VTX"] = float(mv)
+
+    def _cmd_STEP(self, mv):
+        self.curve["STEP"] = float(mv)
+
+    def _cmd_NC(self, n):
+        self.curve["NC"] = int(n)
+
+    def _cmd_TC(self):
+        self.cell = 1
+        self._curve_start = self.potential
+        self._curve_t0 = time.perf_counter()
+
+    def _cmd_HALT(self):
+        self._curve_t0 = None
+
+    def _cmd_DONE(self):
+        if self._curve_t0 is None:
+            return "1"
+        duration = self.curve["NP"] * self.curve["TMB"] * 1e-6
+        return "1" if time.perf_counter() - self._curve_t0 >= duration else "0"
+
+    def _cmd_DC(self):
+        start, vertex = self._curve_start, self.curve["VTX"]
+        step = abs(self.curve["STEP"]) * (1 if vertex >= start else -1)
+
+        forward = []
+        E = start
+        while (E < vertex) if step > 0 else (E > vertex):
+            forward.append(E)
+            E += step
+        backward = [vertex - (e - start) for e in forward]
+        cycle = forward + backward
+
+        for E in (cycle * self.curve["NC"])[:self.curve["NP"]]:
+            self._replies.append(self._format_current(E * 1e-3 / self.cell_resistance))
+
+    @staticmethod
+    def _format_current(current):
+        """READI reply: "mantissa,exponent" with a 4-digit mantissa."""
+        if current == 0:
+            return "0,-9"
+        exp = int(math.floor(math.log10(abs(current)))) - 3
+        return f"{int(round(current / 10 ** exp))},{exp}"
+
+
+class SimulatedResourceManager:
+    """Minimal pyvisa.ResourceManager look-alike for the simulator."""
+
+    def __init__(self, settings=None):
+        self.settings = {**SIMULATOR, **(settings or {})}
+
+    def list_resources(self):
+        return (self.settings["resource"],)
+
+    def open_resource(self, resource_name):
+        return Simulated273A(
+            resource_name=resource_name,
+            latency=self.settings["latency"],
+            jitter=self.settings["jitter"],
+            error_rate=self.settings["error_rate"],
+            cell_resistance=self.settings["cell_resistance"],
+            seed=self.settings["seed"],
+        )
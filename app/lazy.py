@@ -0,0 +1,34 @@
+# app/lazy.py
+import importlib
+import sys
+import types
+
+
+class _LazyModule(types.ModuleType):
+    """Module placeholder that imports the real module on first use."""
+
+    def __getattr__(self, attr):
+        # Only reached while the module has not been imported yet
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return f"<lazy module {self.__name__!r}>"
+
+
+def lazy_import(name):
+    """
+    Returns module `name`, deferring the import until an attribute is
+    first used:
+
+        np = lazy_import("numpy")     # nothing imported yet
+        np.zeros(3)                   # numpy imported here
+
+    Afterwards attribute lookups go straight to the copied module
+    namespace. Modules that are already imported are returned as is.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return _LazyModule(name)
@@ -0,0 +1,195 @@
+# app/live_plot.py
+from app.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+class _Series:
+    """
+    Preallocated ring buffer of (x, y) points behind one Line2D.
+
+    Every point is stored twice, at i and i + capacity, so the stored
+    points are always one contiguous slice: points() is a view, with no
+    per-frame copy however full the buffer is.
+    """
+
+    def __init__(self, line, capacity):
+        self.line = line
+        self.capacity = capacity
+        self.data = np.empty((2 * capacity, 2))
+        self.size = 0       # points stored
+        self.head = 0       # next write position (< capacity)
+        self.dirty = False  # new points since the line was last updated
+
+    def extend(self, xs, ys):
+        capacity = self.capacity
+        n = len(xs)
+        self.dirty = True
+
+        if n >= capacity:
+            for offset in (0, capacity):
+                self.data[offset:offset + capacity, 0] = xs[-capacity:]
+                self.data[offset:offset + capacity, 1] = ys[-capacity:]
+            self.size, self.head = capacity, 0
+            return
+
+        idx = (self.head + np.arange(n)) % capacity
+        for offset in (0, capacity):
+            self.data[idx + offset, 0] = xs
+            self.data[idx + offset, 1] = ys
+        self.head = (self.head + n) % capacity
+        self.size = min(self.size + n, capacity)
+
+    def points(self):
+        """Stored points, oldest first (a view into the buffer)."""
+        if self.size < self.capacity:
+            return self.data[:self.size]
+        return self.data[self.head:self.head + self.capacity]
+
+
+class LivePlot:
+    """
+    Streaming plot for a running method.
+
+    Points go into a preallocated buffer (the oldest are dropped after
+    max_points); each series is one Line2D. Redraws are capped at
+    max_fps and blitted; a full redraw only happens when new data falls
+    outside the current axis limits.
+
+    Must be used from the Tk thread.
+    """
+
+    MARGIN = 0.05
+    HEADROOM = 0.25
+
+    def __init__(self, ax, canvas, widget, max_points=100000, max_fps=20, style="bo"):
+        self.ax = ax
+        self.canvas = canvas
+        self.widget = widget
+        self.max_points = max_points
+        self.interval_ms = int(1000 / max_fps)
+        self.style = style
+
+        self.series = {}
+        self._extent = None      # (xmin, xmax, ymin, ymax) of the data
+        self._limits = None      # (xmin, xmax, ymin, ymax) shown
+        self._background = None
+        self._full_redraw = False
+        self._pending = None
+
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    # -------------------------------------------------
+    # Data
+    # -------------------------------------------------
+    def reset(self, xlabel=None, ylabel=None):
+        self.ax.cla()
+        if xlabel is not None:
+            self.ax.set_xlabel(xlabel)
+        if ylabel is not None:
+            self.ax.set_ylabel(ylabel)
+        self.ax.grid(True)
+
+        self.series = {}
+        self._extent = None
+        self._limits = None
+        self._background = None
+        self.canvas.draw_idle()
+
+    def append(self, x, y, series=0):
+        self.extend((x,), (y,), series)
+
+    def extend(self, xs, ys, series=0):
+        xs = np.asarray(xs, dtype=float).ravel()
+        ys = np.asarray(ys, dtype=float).ravel()
+        if xs.size == 0:
+            return
+
+        self._get_series(series).extend(xs, ys)
+        self._grow_limits(xs, ys)
+        self._schedule()
+
+    def _get_series(self, key):
+        s = self.series.get(key)
+        if s is None:
+            if not self.series:
+                line, = self.ax.plot([], [], self.style, animated=True)
+            else:
+                line, = self.ax.plot([], [], "o", animated=True)
+            s = _Series(line, self.max_points)
+            self.series[key] = s
+        return s
+
+    def _grow_limits(self, xs, ys):
+        ok = np.isfinite(xs) & np.isfinite(ys)
+        if not ok.any():
+            return
+
+        extent = [xs[ok].min(), xs[ok].max(), ys[ok].min(), ys[ok].max()]
+        if self._extent is not None:
+            extent = [
+                min(extent[0], self._extent[0]), max(extent[1], self._extent[1]),
+                min(extent[2], self._extent[2]), max(extent[3], self._extent[3]),
+            ]
+        self._extent = extent
+
+        if self._limits is not None:
+            lx0, lx1, ly0, ly1 = self._limits
+            if lx0 <= extent[0] and extent[1] <= lx1 and ly0 <= extent[2] and extent[3] <= ly1:
+                return
+
+        # Pad the data extent; leave extra room on a side that just grew so
+        # steadily growing data (e.g. time) only rescales now and then
+        limits = []
+        for axis in (0, 1):
+            lo, hi = extent[2 * axis], extent[2 * axis + 1]
+            span = (hi - lo) or abs(hi) or 1.0
+            pad_lo = pad_hi = span * self.MARGIN
+            if self._limits is not None:
+                if lo < self._limits[2 * axis]:
+                    pad_lo += span * self.HEADROOM
+                if hi > self._limits[2 * axis + 1]:
+                    pad_hi += span * self.HEADROOM
+            limits.extend((lo - pad_lo, hi + pad_hi))
+
+        self._limits = tuple(limits)
+        self._full_redraw = True
+
+    # -------------------------------------------------
+    # Rendering
+    # -------------------------------------------------
+    def _schedule(self):
+        if self._pending is None:
+            self._pending = self.widget.after(self.interval_ms, self._render)
+
+    def _render(self):
+        self._pending = None
+        if not self.widget.winfo_exists():
+            return
+
+        for s in self.series.values():
+            if s.dirty:
+                points = s.points()
+                s.line.set_data(points[:, 0], points[:, 1])
+                s.dirty = False
+
+        if self._full_redraw or self._background is None:
+            self._full_redraw = False
+            if self._limits is not None:
+                xmin, xmax, ymin, ymax = self._limits
+                self.ax.set_xlim(xmin, xmax)
+                self.ax.set_ylim(ymin, ymax)
+            self.canvas.draw()   # -> _on_draw captures the background
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_lines()
+
+        self.canvas.blit(self.ax.bbox)
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_lines()
+
+    def _draw_lines(self):
+        for s in self.series.values():
+            self.ax.draw_artist(s.line)
@@ -11,18 +11,30 @@ import customtkinter as ctk
 from tkinter import messagebox
 from tkinter import simpledialog
 import json
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
 import re
-import csv
-import pyvisa
 
-from app.methods.loader import discover_methods
+from app.methods.loader import discover_methods, method_folders
+from app.methods.watcher import MethodWatcher
 from app.instruments.EGG273A import EGG273A
-from app.config import DEBUGGING
+from app.instruments.sessions import SESSIONS
+from app.instruments.discovery import DEVICES, is_273a
+from app.run_manager import RunManager
+from app.live_plot import LivePlot
+from app.runfile import run_header
+from app.runs import changed_params, open_writer, parse_value, run_filepath
+from app.sequencer import ExperimentQueue, Sequencer, RUNNING
+from app.acquisition import AcquisitionQueue
+from app.catalog import Catalog
+from app.startup import TaskGraph
+from app.lazy import lazy_import
+from app.config import DEBUGGING, DEVICE_SCAN, SIMULATOR
 
 from datetime import datetime
 
+# Imported on first use (warmed up by the startup graph)
+plt = lazy_import("matplotlib.pyplot")
+backend_tkagg = lazy_import("matplotlib.backends.backend_tkagg")
+
 # -----------------------
 # Config
 # -----------------------
@@ -30,13 +42,9 @@ APP_NAME = "EGG_273A_Potentiostat"
 DATA_FOLDER = "app/Data"
 METHODS_FOLDER = "Methods"
 WINDOW_SIZE = "900x640"
+POLL_INTERVAL_MS = 50   # GUI refresh period for running methods
 METHODS_PATHS = ["Methods/BuiltIn", "Methods/Custom"]
 
-method_classes = discover_methods()
-print("Available methods:")
-for i, method_cls in enumerate(method_classes):
-    print(f"{i + 1}. {method_cls.name}")
-
 # -----------------------
 # Helpers
 # -----------------------
@@ -45,12 +53,8 @@ def module_exists(name):
     return importlib.util.find_spec(name) is not None
 
 def safe_list_resources():
-    """Try to list VISA resources if pyvisa available, else return []"""
-    try:
-        rm = pyvisa.ResourceManager()
-        return list(rm.list_resources())
-    except Exception:
-        return []
+    """Try to list VISA resources if pyvisa available, else return [] (blocking, cached)"""
+    return DEVICES.list_resources(identify=DEVICE_SCAN["identify"])
     
 class SafeFrame(ctk.CTkFrame):
     def __init__(self, master, **kwargs):
@@ -96,7 +100,7 @@ class LoadingFrame(SafeFrame):
         self.detail_label.pack(fill="x", padx=18, pady=(0,8))
 
         # Start loader thread
-        self.safe_after(300, self.start_loading)
+        self.safe_after(50, self.start_loading)
 
     def start_loading(self):
         thread = threading.Thread(target=self._do_loading, daemon=True)
@@ -113,77 +117,170 @@ class LoadingFrame(SafeFrame):
         self.safe_after(0, _upd)
 
     def _do_loading(self):
+        """
+        Startup as a task graph: independent tasks run in parallel, the
+        progress bar follows finished tasks, timings go to the log.
+        """
+        graph = TaskGraph()
+        graph.add("folders", self._task_folders)
+        graph.add("catalog", self._task_catalog, deps=("folders",))
+        graph.add("packages", self._task_packages)
+        graph.add("methods", self._task_methods)
+        graph.add("visa", self._task_visa, deps=("packages",))
+        graph.add("matplotlib", self._task_matplotlib)
+
+        labels = {
+            "folders": "Data folders",
+            "catalog": "Data catalog",
+            "packages": "Packages",
+            "methods": "Methods",
+            "visa": "VISA devices",
+            "matplotlib": "Plotting",
+        }
+        self._update_ui("Starting up", "Scanning devices, loading methods and data...", 0.02)
 
-        steps = [
-            ("Checking folders", f"Ensuring '{DATA_FOLDER}' and '{METHODS_FOLDER}' exist."),
-            ("Probing required packages", "Checking pyvisa, matplotlib, csv, time..."),
-            ("Scanning for VISA devices", "Looking for connected instruments (if pyvisa installed)."),
-            ("Finalizing", "Setting up UI...")
-        ]
+        def on_task_done(name, finished, total):
+            elapsed = graph.timings.get(name)
+            if name in graph.errors:
+                detail = f"{labels[name]}: failed ({graph.errors[name]})"
+            else:
+                detail = f"{labels[name]}: {self._task_summary(name, graph.results[name])}"
+            if elapsed is not None:
+                detail += f" — {elapsed * 1000:.0f} ms"
+            self._update_ui(f"Starting up ({finished}/{total})", detail, finished / total)
 
-        # Step 1: Ensure folders
-        self._update_ui(steps[0][0], steps[0][1], 0.05)
-        time.sleep(0.35)
-        os.makedirs(DATA_FOLDER, exist_ok=True)
-        #os.makedirs(METHODS_FOLDER, exist_ok=True)
-        time.sleep(0.2)
-        self._update_ui(steps[0][0], f"Folders ready: '{DATA_FOLDER}', '{METHODS_FOLDER}'", 0.15)
-        time.sleep(0.25)
-
-        # Step 2: Check modules
-        self._update_ui(steps[1][0], "Checking: pyvisa, matplotlib, customtkinter", 0.25)
-        time.sleep(0.25)
-        mods = {
-            "pyvisa": module_exists("pyvisa"),
-            "matplotlib": module_exists("matplotlib"),
-            "csv": module_exists("csv"),  # always True
-            "time": module_exists("time"),  # always True
-        }
-        detail = ", ".join(f"{k}: {'OK' if v else 'Missing'}" for k, v in mods.items())
-        self._update_ui(steps[1][0], detail, 0.45)
-        time.sleep(0.45)
-
-        # Show methods
-        for cls in method_classes:
-            detail = ", "+cls.name
-            self._update_ui(steps[1][0], detail, 0.5)
-            time.sleep(0.3)
-        
-
-        # Step 3: Scan VISA devices (if available)
-        self._update_ui(steps[2][0], steps[2][1], 0.55)
-        devices = []
-        if mods["pyvisa"]:
-            devices = safe_list_resources()
-            devs_text = f"Found {len(devices)} device(s): {devices}" if devices else "No VISA devices found."
-        else:
-            devs_text = "pyvisa not installed — skipping device scan."
-        self._update_ui(steps[2][0], devs_text, 0.75)
-        time.sleep(0.6)
+        results = graph.run(on_task_done)
 
-        # Step 4: Finalize
-        self._update_ui(steps[3][0], "Launching main UI...", 0.95)
-        time.sleep(0.5)
+        for line in graph.report():
+            print(f"[STARTUP] {line}")
 
-        # Prepare state to pass to main page
+        mods = results.get("packages", {})
         initial_state = {
-            "pyvisa_installed": mods["pyvisa"],
-            "matplotlib_installed": mods["matplotlib"],
-            "visa_devices": devices
+            "pyvisa_installed": mods.get("pyvisa", False),
+            "matplotlib_installed": mods.get("matplotlib", False),
+            "visa_devices": results.get("visa", []),
+            "methods": results.get("methods", []),
         }
 
-        # Short pause so progress bar is visible
-        self._update_ui("Done", "Opening application...", 1.0)
-        time.sleep(0.4)
-
         # Switch to main page in main thread
+        self._update_ui("Done", "Opening application...", 1.0)
         self.safe_after(0, lambda: self.controller.on_loading_done(initial_state))
-    
+
+    # ---- startup tasks (worker threads, no Tk calls) ----
+    def _task_folders(self):
+        os.makedirs(DATA_FOLDER, exist_ok=True)
+        #os.makedirs(METHODS_FOLDER, exist_ok=True)
+
+    def _task_catalog(self, _):
+        return self.controller.catalog.refresh()
+
+    def _task_packages(self):
+        return {
+            "pyvisa": module_exists("pyvisa"),
+            "matplotlib": module_exists("matplotlib"),
+        }
+
+    def _task_methods(self):
+        methods = discover_methods()
+        print("Available methods:")
+        for i, method_cls in enumerate(methods):
+            print(f"{i + 1}. {method_cls.name}")
+        return methods
+
+    def _task_visa(self, mods):
+        if not mods["pyvisa"] and not SIMULATOR["enabled"]:
+            return []
+        return safe_list_resources()
+
+    def _task_matplotlib(self):
+        # Font cache, text layout and Agg renderer, off the Tk thread;
+        # also imports pyplot and the Tk backend ahead of MainPage
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        import matplotlib.backends.backend_tkagg
+        import matplotlib.pyplot
+
+        fig = Figure()
+        ax = fig.add_subplot(111)
+        ax.plot([0, 1], [0, 1], "bo")
+        ax.set_xlabel("Potential (mV)")
+        ax.set_ylabel("Current (A)")
+        FigureCanvasAgg(fig).draw()
+
+    @staticmethod
+    def _task_summary(name, result):
+        if name == "catalog":
+            return (
+                f"{result['added']} new, {result['updated']} changed, "
+                f"{result['removed']} removed runs"
+            )
+        if name == "packages":
+            return ", ".join(f"{k}: {'OK' if v else 'Missing'}" for k, v in result.items())
+        if name == "methods":
+            return ", ".join(cls.name for cls in result) or "none found"
+        if name == "visa":
+            return f"found {len(result)} device(s): {result}" if result else "no VISA devices found"
+        return "ready"
+
     def destroy(self):
         # cancel all after callbacks
         self.cancel_all_after()
         super().destroy()
 
+# -----------------------
+# Run window (one per concurrent run)
+# -----------------------
+class RunWindow(ctk.CTkToplevel):
+    """Live plot, progress bar and stop control for a run on another device."""
+
+    def __init__(self, master, run_manager, resource):
+        super().__init__(master)
+        self.run_manager = run_manager
+        self.resource = resource
+
+        self.title(resource)
+        self.geometry("560x480")
+
+        self.fig, self.ax = plt.subplots(figsize=(5, 4))
+        self.ax.grid(True)
+
+        self.canvas = backend_tkagg.FigureCanvasTkAgg(self.fig, master=self)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True, padx=8, pady=(8,4))
+        self.plot = LivePlot(self.ax, self.canvas, self)
+
+        self.progress_bar = ctk.CTkProgressBar(self)
+        self.progress_bar.set(0.0)
+        self.progress_bar.pack(fill="x", padx=8, pady=4)
+
+        ctk.CTkButton(self, text="⏹ Stop", fg_color="red", command=self.stop).pack(pady=(4,8))
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+    def stop(self):
+        if self.run_manager.busy(self.resource):
+            print(f"⏹ Stop requested by user ({self.resource})")
+            self.run_manager.stop(self.resource)
+
+    def close(self):
+        self.stop()
+        self._release_session()
+        self.canvas.get_tk_widget().destroy()
+        plt.close(self.fig)
+        self.destroy()
+
+    def _release_session(self):
+        """Closes the device session once the run (if any) has stopped."""
+        run = self.run_manager.runs.get(self.resource)
+
+        def _release():
+            if run is not None:
+                run.join()
+            # A new run may have been started on it meanwhile
+            if not self.run_manager.busy(self.resource):
+                self.run_manager.close_device(self.resource)
+
+        threading.Thread(target=_release, daemon=True, name=f"release-{self.resource}").start()
+
 # -----------------------
 # Main App / Pages
 # -----------------------
@@ -193,9 +290,13 @@ class MainPage(ctk.CTkFrame):
         self.controller = controller
         self.initial_state = initial_state
 
-        # VISA Resource Manager
-        self.rm = pyvisa.ResourceManager() ##Change to '@py'
+        # VISA sessions are shared process-wide (app.instruments.sessions)
         self.device = None
+        self.connected_resource = None
+
+        # Runs whose data is being drained into the GUI
+        self._live_runs = []
+        self._poll_id = None
 
         # layout: left status bar + main area
         self.grid_rowconfigure(0, weight=1)
@@ -206,9 +307,13 @@ class MainPage(ctk.CTkFrame):
         self.tabview.grid(row=0, column=1, sticky="nsew", padx=(8,16), pady=16)
         self.tabview.add("Config")
         self.tabview.add("Methods")
+        self.tabview.add("Runs")
+        self.tabview.add("Queue")
 
         self._build_config_tab()
         self._build_methods_tab()
+        self._build_runs_tab()
+        self._build_queue_tab()
 
         # Left status indicator (rounded rectangle-like)
         self.status_frame = ctk.CTkFrame(self, width=80, corner_radius=20)
@@ -297,7 +402,7 @@ class MainPage(ctk.CTkFrame):
         f = self.tabview.tab("Methods")
 
         # --- Load methods ---
-        self.methods = method_classes
+        self.methods = self.initial_state.get("methods", [])
         method_names = [m.name for m in self.methods] if self.methods else ["No methods found"]
 
         # --- Top frame for dropdown + button ---
@@ -313,6 +418,10 @@ class MainPage(ctk.CTkFrame):
         #self.status_label = ctk.CTkLabel(top_frame, text="Instrument: unknown", text_color="gray")
         #self.status_label.pack(side="left", padx=(10, 0))
 
+        # --- Method reload status (hot reload, see _on_methods_reloaded) ---
+        self.method_status = ctk.CTkLabel(top_frame, text="", text_color="gray", anchor="w")
+        self.method_status.pack(side="left", fill="x", expand=True, padx=(10, 0))
+
         # --- Middle frame with plot (left) and inputs (right) ---
         middle_frame = ctk.CTkFrame(f)
         middle_frame.pack(fill="both", expand=True, padx=12, pady=(0, 12))
@@ -326,8 +435,9 @@ class MainPage(ctk.CTkFrame):
         self.ax.set_ylabel("Current (A)/Voltage (V)/...")
         self.ax.grid(True)
 
-        self.canvas = FigureCanvasTkAgg(self.fig, master=plot_frame)
+        self.canvas = backend_tkagg.FigureCanvasTkAgg(self.fig, master=plot_frame)
         self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.plot = LivePlot(self.ax, self.canvas, self)
 
         # Right frame for method inputs (for now blank)
         self.inputs_frame = ctk.CTkScrollableFrame(middle_frame, width=300, height=400, label_text="Method Inputs")
@@ -338,19 +448,28 @@ class MainPage(ctk.CTkFrame):
         # Dictionary to store input widgets
         self.input_widgets = {}
 
+        # Values typed into each method's form (only those differing from
+        # the default), kept across method switches and plugin reloads
+        self._form_values = {}
+        self._form_defaults = {}
+        self._form_method = None
+
         def stop_method():
-            if self.controller.current_thread and self.controller.current_thread.is_alive():
+            if self.controller.run_manager.busy(self._run_resource()):
                 print("⏹ Stop requested by user")
-                self.controller.stop_event.set()
+                self.controller.run_manager.stop(self._run_resource())
 
         # Function to populate inputs based on selected method
         def update_inputs(event=None):
+            self._save_form_values()
+
             # clear old widgets
             for widget in self.inputs_frame.winfo_children():
                 widget.destroy()
             self.input_widgets.clear()
 
             selected_name = self.method_combo.get()
+            self._form_method = None
             
             # Method is now a CLASS, not a dict
             method_cls = next((m for m in self.methods if m.name == selected_name), None)
@@ -358,18 +477,19 @@ class MainPage(ctk.CTkFrame):
                 return
 
             params = method_cls.parameters()
+            values = self._form_values.get(method_cls.name, {})
+            self._form_method = method_cls.name
+            self._form_defaults[method_cls.name] = {
+                var_name: str(meta.get("default", "")) for var_name, meta in params.items()
+            }
 
             # Update axis labels dynamically
-            self.ax.cla()
-            self.ax.set_xlabel(method_cls.xlabel)
-            self.ax.set_ylabel(method_cls.ylabel)
-            self.ax.grid(True)
-            self.canvas.draw_idle()
+            self.plot.reset(method_cls.xlabel, method_cls.ylabel)
 
             row = 0
             for var_name, meta in params.items():
                 label_text = meta.get("label", var_name)
-                default_val = meta.get("default", "")
+                default_val = values.get(var_name, meta.get("default", ""))
 
                 label = ctk.CTkLabel(
                     self.inputs_frame,
@@ -417,32 +537,18 @@ class MainPage(ctk.CTkFrame):
 
         # Bind dropdown change
         self.method_combo.configure(command=update_inputs)
+        self._update_inputs = update_inputs
 
-        # Run method simulation
-        def run_method():
-            
-            # -----------------------
-            # Prepare save path FIRST
-            # -----------------------
-            user = self.user_combo.get()
-            project = self.project_combo.get()
-            experiment = self.experiment_entry.get() or "experiment"
+        # Hot reload: plugin files are watched while the app runs
+        self.method_watcher = MethodWatcher(
+            method_folders(),
+            lambda methods, errors: self.after(0, lambda: self._on_methods_reloaded(methods, errors)),
+            methods=self.methods,
+        )
+        self.method_watcher.start()
 
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-            folder = os.path.join(DATA_FOLDER, user, project)
-            filename = f"{experiment}_{self.method_combo.get()}_{timestamp}.csv"
-            filepath = os.path.join(folder, filename)
-
-            # --- Pre-run save validation ---
-            if not self._check_save_path(filepath):
-                return
-
-            if not messagebox.askokcancel(
-                "Confirm Run",
-                f"Data will be saved to:\n\n{filepath}\n\nProceed?"
-            ):
-                return
+        # Run method on the connected device
+        def run_method():
 
             # ---------------- SAFETY CHECK ----------------
             if not DEBUGGING and self.device is None:
@@ -452,110 +558,420 @@ class MainPage(ctk.CTkFrame):
                     "Connect a device or enable DEBUGGING mode."
                 )
                 return
-            
-            self.controller.stop_event.clear()
 
-            selected_name = self.method_combo.get()
-            method_cls = next((m for m in self.methods if m.name == selected_name), None)
-            if not method_cls:
-                messagebox.showwarning("Warning", "Select a valid method first.")
+            if self.controller.run_manager.busy(self._run_resource()):
+                messagebox.showwarning("Busy", "A method is already running on this device.")
                 return
 
-            # Instantiate method
-            method = method_cls(self.device)
+            self._start_run(
+                self._run_resource(),
+                self.plot,
+                lambda: self.progress_bar
+            )
 
-            # Collect params
-            params = {}
-            for k, entry in self.input_widgets.items():
-                val = entry.get()
-                try:
-                    params[k] = float(val) if "." in val else int(val)
-                except Exception:
-                    params[k] = val
+    def _save_form_values(self):
+        if self._form_method is None:
+            return
+        defaults = self._form_defaults.get(self._form_method, {})
+        self._form_values[self._form_method] = {
+            var_name: entry.get()
+            for var_name, entry in self.input_widgets.items()
+            if entry.get() != defaults.get(var_name)
+        }
 
-            method.set_params(params)
+    def _on_methods_reloaded(self, methods, errors):
+        """Method plugins changed on disk (MethodWatcher, GUI thread)."""
+        old = {m.name: m for m in self.methods}
+        self.methods = methods
+        names = [m.name for m in methods]
+        self.method_combo.configure(values=names or ["No methods found"])
 
-            # Update axis labels dynamically
-            self.ax.cla()
-            self.ax.set_xlabel(method.xlabel)
-            self.ax.set_ylabel(method.ylabel)
-            self.ax.grid(True)
-            self.canvas.draw_idle()
-
-            # -----------------------
-            # Prepare CSV file
-            # -----------------------
-
-            csv_file = open(filepath, "w", newline="")
-            csv_writer = csv.writer(csv_file)
-
-            # --- Metadata ---
-            csv_writer.writerow([f"# Method: {method.name}"])
-            csv_writer.writerow([f"# Mode: {method.mode.value}"])
-            csv_writer.writerow([f"# Timestamp: {timestamp}"])
-            csv_writer.writerow([f"# User: {user}"])
-            csv_writer.writerow([f"# Project: {project}"])
-            csv_writer.writerow(["# ----------------------------------"])
-            csv_writer.writerow(["# PARAMETERS"])
-
-            # --- Parameters ---
-            for k, v in params.items():
-                csv_writer.writerow([k, v])
-
-            csv_writer.writerow(["# ----------------------------------"])
-            csv_writer.writerow(["# DATA"])
-            csv_writer.writerow([method.xlabel, method.ylabel])
-
-            def emit(x, y):
-                def _update():
-                    self.ax.plot(x, y, 'bo')
-                    self.canvas.draw_idle()
-                    csv_writer.writerow([x, y])
-                self.after(0, _update)
-
-            def progress_cb(f):
-                self.after(0, lambda: self.progress_bar.set(f))
-
-            def task():
+        if errors:
+            text = "; ".join(f"{os.path.basename(path)}: {e}" for path, e in errors.items())
+            self.method_status.configure(text=f"Load error: {text}", text_color="#e74c3c")
+        else:
+            self.method_status.configure(text=f"Methods reloaded ({len(methods)})", text_color="gray")
+
+        # Refresh the open form if its method changed; typed values are kept.
+        # Not during a run: that would reset its live plot
+        if self.controller.run_manager.busy(self._run_resource()):
+            return
+        selected = self.method_combo.get()
+        if selected in names:
+            method_cls = next(m for m in methods if m.name == selected)
+            before = old.get(selected)
+            if before is None or before.parameters() != method_cls.parameters() \
+                    or (before.xlabel, before.ylabel) != (method_cls.xlabel, method_cls.ylabel):
+                self._update_inputs()
+        elif self._form_method is not None:
+            self.method_combo.set("Select a method")
+            self._update_inputs()
+
+    # -------------------------
+    # Runs
+    # -------------------------
+    def _run_resource(self):
+        """Resource name used by the run manager for the connected device."""
+        if self.device is None:
+            return None
+        return self.connected_resource
+
+    def _prepare_run(self):
+        """
+        Validates the save path, asks for confirmation and reads the
+        selected method and its parameters.
+
+        Returns (method_cls, params, filepath, header) or None.
+        """
+        user = self.user_combo.get()
+        project = self.project_combo.get()
+        experiment = self.experiment_entry.get() or "experiment"
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        filepath = run_filepath(DATA_FOLDER, user, project, experiment, self.method_combo.get(), timestamp)
+
+        # --- Pre-run save validation ---
+        if not self._check_save_path(filepath):
+            return None
+
+        if not messagebox.askokcancel(
+            "Confirm Run",
+            f"Data will be saved to:\n\n{filepath}\n\nProceed?"
+        ):
+            return None
+
+        selected_name = self.method_combo.get()
+        method_cls = next((m for m in self.methods if m.name == selected_name), None)
+        if not method_cls:
+            messagebox.showwarning("Warning", "Select a valid method first.")
+            return None
+
+        # Collect params
+        params = {}
+        for k, entry in self.input_widgets.items():
+            params[k] = parse_value(entry.get())
+
+        header = {
+            "timestamp": timestamp,
+            "user": user,
+            "project": project,
+        }
+        return method_cls, params, filepath, header
+
+    def _start_run(self, resource, plot, get_progress_bar):
+        """
+        Starts the selected method on resource, streaming into plot
+        (a LivePlot) and saving to a new CSV/.egr file. Plot updates stop once
+        the plot's widget is destroyed; data is written by a DataWriter
+        thread independently of the GUI.
+        """
+        prepared = self._prepare_run()
+        if prepared is None:
+            return None
+        method_cls, params, filepath, header = prepared
+
+        # Update axis labels dynamically
+        plot.reset(method_cls.xlabel, method_cls.ylabel)
+
+        writer = open_writer(filepath, run_header(method_cls, params, header))
+
+        # run thread -> writer (chunks) and GUI poller (batches)
+        acquisition = AcquisitionQueue(
+            writer,
+            method_cls.record_dtype(),
+            method_cls.xfield,
+            method_cls.yfield
+        )
+
+        def on_done(run):
+            # run thread: flush and close the file before reporting
+            acquisition.close()
+            writer.close()
+
+            # Failed before recording anything: no header-only file
+            removed = False
+            if run.error is not None and writer.rows_written == 0:
                 try:
-                    method.run(self.controller.stop_event, emit, progress_cb)
-                finally:
-                    csv_file.close()
-                    print(f"Data saved to: {filepath}")
-                self.after(0, lambda: messagebox.showinfo(
+                    os.remove(filepath)
+                    removed = True
+                except OSError:
+                    pass
+
+            if not removed:
+                try:
+                    self.controller.catalog.index_file(filepath)
+                except Exception as e:
+                    print(f"[CATALOG] {e}")
+
+            def _finish():
+                if run.method.timing_stats:
+                    print(f"[TIMING] {run.method.timing_stats}")
+                if run.error is not None:
+                    if removed:
+                        detail = "No data was recorded."
+                    else:
+                        detail = f"Partial data ({writer.rows_written} points) kept in:\n{filepath}"
+                    messagebox.showerror(
+                        "Run failed",
+                        f"{method_cls.name} failed:\n{run.error}\n\n{detail}"
+                    )
+                    return
+                print(f"Data saved to: {filepath}")
+                if writer.error:
+                    messagebox.showerror(
+                        "Save Error",
+                        f"Writing {filepath} failed:\n{writer.error}"
+                    )
+                    return
+                messagebox.showinfo(
                     "Saved",
                     f"Data saved successfully:\n{filepath}"
-                ))
+                )
+            self.after(0, _finish)
 
-            self.controller.current_thread = threading.Thread(target=task, daemon=True)
-            self.controller.current_thread.start()
+        try:
+            run = self.controller.run_manager.start(
+                resource, method_cls, params,
+                acquisition, acquisition.progress, on_done
+            )
+        except Exception as e:
+            # Nothing was recorded: do not leave a header-only file behind
+            acquisition.close()
+            writer.close()
+            try:
+                os.remove(filepath)
+            except OSError:
+                pass
+            messagebox.showerror("Run failed", str(e))
+            return None
+
+        self._live_runs.append((acquisition, plot, get_progress_bar))
+        self._poll_acquisition()
+        return run
+
+    def _poll_acquisition(self):
+        """
+        Single GUI poller for all running methods: drains each run's
+        AcquisitionQueue and updates its plot and progress bar in one go.
+        """
+        if self._poll_id is not None:
+            return
 
-            
+        def _poll():
+            self._poll_id = None
+
+            for entry in list(self._live_runs):
+                acquisition, plot, get_progress_bar = entry
+                xs, ys, progress = acquisition.drain()
+
+                if plot.widget.winfo_exists():
+                    plot.extend(xs, ys)
+                    if progress is not None:
+                        get_progress_bar().set(progress)
+
+                if acquisition.finished():
+                    self._live_runs.remove(entry)
+
+            if self._live_runs:
+                self._poll_id = self.after(POLL_INTERVAL_MS, _poll)
+
+        self._poll_id = self.after(POLL_INTERVAL_MS, _poll)
+
+    def _build_runs_tab(self):
+        frame = self.tabview.tab("Runs")
+        frame.grid_columnconfigure(0, weight=1)
+
+        ctk.CTkLabel(frame, text="Concurrent runs", font=ctk.CTkFont(size=16, weight="bold")).grid(row=0, column=0, sticky="w", padx=12, pady=(12,6))
+        ctk.CTkLabel(
+            frame,
+            text="Runs the method selected in the Methods tab on another instrument.\n"
+                 "Each run opens its own window with plot, progress and stop control.",
+            anchor="w",
+            justify="left"
+        ).grid(row=1, column=0, columnspan=2, sticky="w", padx=12, pady=(0,8))
+
+        self.run_device_combo = ctk.CTkComboBox(frame, values=self.initial_state.get("visa_devices", []), state="readonly")
+        self.run_device_combo.set("Select device")
+        self.run_device_combo.grid(row=2, column=0, sticky="we", padx=12, pady=(0,6))
+
+        ctk.CTkButton(frame, text="▶ Run on device", command=self._run_on_other_device).grid(row=2, column=1, sticky="we", padx=12, pady=(0,6))
+
+    def _run_on_other_device(self):
+        resource = self.run_device_combo.get()
+        if resource not in (self.run_device_combo.cget("values") or []):
+            messagebox.showwarning("No device", "Select a device first.")
+            return
+
+        if resource == self._run_resource():
+            messagebox.showwarning("Busy", "Use the Methods tab for the connected device.")
+            return
+
+        if self.controller.run_manager.busy(resource):
+            messagebox.showwarning("Busy", f"{resource} is already running a method.")
+            return
+
+        window = RunWindow(self, self.controller.run_manager, resource)
+        run = self._start_run(
+            resource,
+            window.plot,
+            lambda: window.progress_bar
+        )
+        if run is None:
+            window.close()
+            return
+        window.title(f"{run.method.name} — {resource}")
+
+    # -------------------------
+    # Experiment queue (app/sequencer.py)
+    # -------------------------
+    def _build_queue_tab(self):
+        frame = self.tabview.tab("Queue")
+        frame.grid_columnconfigure(0, weight=1)
+        frame.grid_rowconfigure(3, weight=1)
+
+        self.queue = ExperimentQueue(DATA_FOLDER)
+        self.sequencer = None
+
+        ctk.CTkLabel(frame, text="Experiment queue", font=ctk.CTkFont(size=16, weight="bold")).grid(row=0, column=0, sticky="w", padx=12, pady=(12,6))
+        ctk.CTkLabel(
+            frame,
+            text="Runs the queued experiments back to back on the connected device.\n"
+                 "The queue is saved on every change and resumes after a restart.",
+            anchor="w",
+            justify="left"
+        ).grid(row=1, column=0, columnspan=4, sticky="w", padx=12, pady=(0,8))
+
+        controls = ctk.CTkFrame(frame)
+        controls.grid(row=2, column=0, sticky="we", padx=12, pady=(0,6))
+        ctk.CTkButton(controls, text="➕ Add selected method", command=self._queue_add).pack(side="left", padx=(0,6))
+        ctk.CTkLabel(controls, text="Rest (s):").pack(side="left", padx=(6,2))
+        self.queue_rest_entry = ctk.CTkEntry(controls, width=60)
+        self.queue_rest_entry.insert(0, f"{self.queue.rest_s:g}")
+        self.queue_rest_entry.pack(side="left")
+        self.queue_rest_entry.bind("<FocusOut>", self._queue_set_rest)
+        self.queue_rest_entry.bind("<Return>", self._queue_set_rest)
+        self.queue_start_btn = ctk.CTkButton(controls, text="▶ Start queue", width=110, command=self._queue_start)
+        self.queue_start_btn.pack(side="left", padx=6)
+        ctk.CTkButton(controls, text="⏹ Stop", width=70, fg_color="red", command=self._queue_stop).pack(side="left")
+        ctk.CTkButton(controls, text="Clear finished", width=100, command=self._queue_clear).pack(side="left", padx=6)
+
+        self.queue_list = ctk.CTkScrollableFrame(frame, height=300)
+        self.queue_list.grid(row=3, column=0, sticky="nsew", padx=12, pady=(0,6))
+        self.queue_list.grid_columnconfigure(0, weight=1)
+
+        self.queue_status = ctk.CTkLabel(frame, text="", anchor="w")
+        self.queue_status.grid(row=4, column=0, sticky="we", padx=12, pady=(0,8))
+
+        self._refresh_queue()
+
+    def _queue_add(self):
+        method_cls = next((m for m in self.methods if m.name == self.method_combo.get()), None)
+        if method_cls is None:
+            messagebox.showwarning("Warning", "Select a method (and its parameters) in the Methods tab first.")
+            return
+        params = {k: parse_value(entry.get()) for k, entry in self.input_widgets.items()}
+        self.queue.add(
+            method_cls.name,
+            changed_params(method_cls, params),
+            user=self.user_combo.get(),
+            project=self.project_combo.get(),
+            experiment=self.experiment_entry.get() or "experiment",
+        )
+        self._refresh_queue()
+
+    def _queue_set_rest(self, event=None):
+        try:
+            self.queue.set_rest(max(0.0, float(self.queue_rest_entry.get())))
+        except ValueError:
+            self.queue_rest_entry.delete(0, "end")
+            self.queue_rest_entry.insert(0, f"{self.queue.rest_s:g}")
 
+    def _queue_start(self):
+        if self.sequencer is not None and self.sequencer.running():
+            return
+        if not DEBUGGING and self.device is None:
+            messagebox.showerror("No device connected", "Connect a device first.")
+            return
+        if self.controller.run_manager.busy(self._run_resource()):
+            messagebox.showwarning("Busy", "A method is already running on this device.")
+            return
 
+        self.sequencer = Sequencer(
+            self.queue,
+            self._run_resource(),
+            methods=self.methods,
+            manager=self.controller.run_manager,
+            # sequencer thread -> GUI thread
+            on_update=lambda item: self.after(0, self._refresh_queue),
+            catalog=self.controller.catalog,
+        )
+        self.sequencer.start()
+        self._refresh_queue()
+
+    def _queue_stop(self):
+        if self.sequencer is not None:
+            self.sequencer.stop()
+
+    def _queue_clear(self):
+        self.queue.clear_finished()
+        self._refresh_queue()
+
+    def _queue_action(self, action, item_id, *args):
+        action(item_id, *args)
+        self._refresh_queue()
+
+    def _refresh_queue(self):
+        for widget in self.queue_list.winfo_children():
+            widget.destroy()
+
+        colors = {"done": "#2ecc71", "failed": "#e74c3c", "stopped": "#e67e22", RUNNING: "#3498db"}
+        for row, item in enumerate(self.queue.snapshot()):
+            text = f"#{item['id']}  {item['method']}  ·  {item['experiment']}  ·  {item['status']}"
+            if item["points"] is not None:
+                text += f" ({item['points']} pts)"
+            if item["error"]:
+                text += f"  —  {item['error']}"
+            ctk.CTkLabel(self.queue_list, text=text, anchor="w", text_color=colors.get(item["status"]),
+                         wraplength=420, justify="left").grid(row=row, column=0, sticky="we", padx=6, pady=2)
+
+            running = item["status"] == RUNNING
+            for col, (label, action, args) in enumerate((
+                ("↑", self.queue.move, (-1,)),
+                ("↓", self.queue.move, (1,)),
+                ("↺", self.queue.reset, ()),
+                ("✕", self.queue.remove, ()),
+            ), start=1):
+                ctk.CTkButton(
+                    self.queue_list, text=label, width=28,
+                    state="disabled" if running and label in ("↺", "✕") else "normal",
+                    command=lambda a=action, i=item["id"], x=args: self._queue_action(a, i, *x)
+                ).grid(row=row, column=col, padx=1, pady=2)
+
+        counts = self.queue.counts()
+        active = self.sequencer is not None and self.sequencer.running()
+        text = (f"{'Running' if active else 'Idle'}  —  {counts['pending']} pending, {counts['done']} done, "
+                f"{counts['failed']} failed, {counts['stopped']} stopped")
+        if not active and self.sequencer is not None and self.sequencer.error:
+            text += f"  —  {self.sequencer.error}"
+        self.queue_status.configure(text=text)
+        self.queue_start_btn.configure(state="disabled" if active else "normal")
 
     # -------------------------
     # Simple actions / helpers
     # -------------------------
     def _list_users(self):
-        users = []
         try:
-            users = [d for d in os.listdir(DATA_FOLDER) if os.path.isdir(os.path.join(DATA_FOLDER, d))]
+            return self.controller.catalog.users()
         except Exception:
-            users = []
-        return users
+            return []
 
     def _list_projects(self):
-        projects = []
         try:
             user = self.user_combo.get()  # <-- get current combo value
-            projects = [
-                d for d in os.listdir(os.path.join(DATA_FOLDER, user))
-                if os.path.isdir(os.path.join(DATA_FOLDER, user, d))
-            ]
+            return self.controller.catalog.projects(user)
         except Exception:
-            projects = []
-        return projects
+            return []
 
     def _on_user_selected(self, event=None):
         self.reload_project_combo()
@@ -579,6 +995,7 @@ class MainPage(ctk.CTkFrame):
             path = os.path.join(DATA_FOLDER, name)
             try:
                 os.makedirs(path, exist_ok=True)
+                self.controller.catalog.add_folder(name)
                 self.user_combo.configure(values=self._list_users())
                 messagebox.showinfo("Created", f"Created folder: {path}")
                 self.user_combo.set(name)
@@ -596,20 +1013,68 @@ class MainPage(ctk.CTkFrame):
             path = os.path.join(DATA_FOLDER, user, name)
             try:
                 os.makedirs(path, exist_ok=True)
+                self.controller.catalog.add_folder(user, name)
                 messagebox.showinfo("Created", f"Created folder: {path}")
                 self.reload_project_combo()
             except Exception as e:
                 messagebox.showerror("Error", str(e))
 
-    def _refresh_devices(self, event=None):
-        # refresh VISA device list
-        devices = safe_list_resources()
+    def _refresh_devices(self, event=None, force=True):
+        # Scan VISA devices in the background (force: ignore the cached
+        # result); results stream into the combos
+        self._scan_token = getattr(self, "_scan_token", 0) + 1
+        token = self._scan_token
+        self._scan_devices = []
+        self._scan_ids = {}
+
+        self.refresh_btn.configure(state="disabled", text="Scanning...")
+        self.device_combo.set("Scanning...")
+
+        def in_gui(fn):
+            # Scanner callbacks run on worker threads; stale scans are ignored
+            def _cb(*args):
+                self.after(0, lambda: fn(*args) if token == self._scan_token else None)
+            return _cb
+
+        DEVICES.scan(
+            on_found=in_gui(self._on_device_found),
+            on_identified=in_gui(self._on_device_identified),
+            on_done=in_gui(self._on_scan_done),
+            identify=DEVICE_SCAN["identify"],
+            force=force,
+        )
+
+    def _on_device_found(self, resource, info):
+        if resource in self._scan_devices:
+            return
+        self._scan_devices.append(resource)
+        self._show_devices()
+
+    def _on_device_identified(self, resource, identity):
+        self._scan_ids[resource] = identity
+        # 273As first
+        self._scan_devices.sort(key=lambda r: not is_273a(self._scan_ids.get(r)))
+        if is_273a(identity) and not is_273a(self._scan_ids.get(self.device_combo.get())):
+            self.device_combo.set(resource)
+        self._show_devices()
+
+    def _on_scan_done(self, devices):
+        for resource in devices:
+            if resource not in self._scan_devices:
+                self._scan_devices.append(resource)
+        self.refresh_btn.configure(state="normal", text="Refresh")
+        self._show_devices(done=True)
+
+    def _show_devices(self, done=False):
+        devices = list(self._scan_devices)
         self.device_combo.configure(values=devices)
+        self.run_device_combo.configure(values=devices)
         # adjust connect button
         if devices:
             self.connect_btn.configure(state="normal")
-            self.device_combo.set(devices[0])
-        else:
+            if self.device_combo.get() not in devices:
+                self.device_combo.set(devices[0])
+        elif done:
             self.device_combo.set("No devices found")
             self.connect_btn.configure(state="disabled")
         # update status colour
@@ -620,14 +1085,9 @@ class MainPage(ctk.CTkFrame):
         if not dev:
             messagebox.showwarning("No device", "Select a device first.")
             return
-        # For now, attempt to open resource to test connection (non-blocking quick test)
+        # Open (or reuse) the shared session for this resource
         try:
-            self.device = self.rm.open_resource(dev)
-            self.device.read_termination = '\r'
-            self.device.write_termination = '\r'
-            self.device.timeout = 10000
-
-            time.sleep(0.3)
+            self.device = SESSIONS.open(dev)
 
             # Initialize device
             # self.device.write("MODE 2")  # potentiostat mode
@@ -636,24 +1096,19 @@ class MainPage(ctk.CTkFrame):
 
             # attempt ID or IDN
             try:
-                # Query ID, Version, Error
-                self.device.write("ID")
-                dev_id = self.device.read().strip()
-
-                self.device.write("VER")
-                version = self.device.read().strip()
-
-                self.device.write("ERR")
-                error = self.device.read().strip()
+                # Query ID, Version, Error (cached per resource)
+                identity = SESSIONS.identify(dev)
 
                 messagebox.showinfo("Connected",
                             f"Connected to {dev}\n\n"
-                            f"ID: {dev_id}\n"
-                            f"Version: {version}\n"
-                            f"Error: {error}")
+                            f"ID: {identity['id']}\n"
+                            f"Version: {identity['version']}\n"
+                            f"Error: {identity['error']}")
             except Exception as e:
                 messagebox.showerror("Connection Error", str(e))
 
+            self.connected_resource = dev
+
             # Mark as connected (for now simply set the indicator and enable disconnect)
             self._set_connected(True)
             messagebox.showinfo("Connected", f"Connection test to {dev} completed (quick test).")
@@ -675,17 +1130,34 @@ class MainPage(ctk.CTkFrame):
         if not getattr(self.controller, "connected", False):
             return
         if messagebox.askyesno("Disconnect", "Are you sure you want to disconnect the device?"):
-            # Here we would safely send the "CELL 0" or close instrument safely.
-            if self.device:
-                try:
-                    self.device.write("CELL 0")  # turn cell OFF
-                    self.device.close()
-                except:
-                    pass
-            self.device = None
-            self._set_connected(False)
-            messagebox.showinfo("Disconnected", "Device disconnected.")
-            self._update_status_color()
+            resource = self.connected_resource
+            if resource:
+                # Stop the queue first, or it starts its next item and
+                # reopens the instrument
+                if self.sequencer is not None:
+                    self.sequencer.stop()
+                self.controller.run_manager.stop(resource)
+                self.disconnect_btn.configure(state="disabled")
+            self._finish_disconnect(resource)
+
+    def _finish_disconnect(self, resource):
+        # Polled, never joined: the queue and the run report back through
+        # self.after, i.e. they need this (Tk) thread to end
+        stopping = (
+            (self.sequencer is not None and self.sequencer.running())
+            or (resource and self.controller.run_manager.busy(resource))
+        )
+        if stopping:
+            self.after(POLL_INTERVAL_MS, lambda: self._finish_disconnect(resource))
+            return
+
+        if resource:
+            SESSIONS.close(resource)  # CELL 0 + close
+            self.connected_resource = None
+        self.device = None
+        self._set_connected(False)
+        messagebox.showinfo("Disconnected", "Device disconnected.")
+        self._update_status_color()
 
     def _update_status_color(self):
         # Decide color:
@@ -717,11 +1189,13 @@ class App(ctk.CTk):
     def __init__(self):
         super().__init__()
 
-        # --- Thread control ---
-        self.current_thread = None
-        self.stop_event = threading.Event()
+        # --- Run control (one run per instrument) ---
+        self.run_manager = RunManager()
         self.instrument = EGG273A(device=None)
 
+        # --- Index of saved runs (users, projects, run search) ---
+        self.catalog = Catalog(DATA_FOLDER)
+
         # store after IDs
         self._after_ids = []
 
@@ -737,9 +1211,14 @@ class App(ctk.CTk):
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def on_close(self, event=None):
-        if self.current_thread and self.current_thread.is_alive():
-            self.stop_event.set()
+        if hasattr(self, "main_page"):
+            self.main_page.method_watcher.stop()
+            if self.main_page.sequencer is not None:
+                self.main_page.sequencer.stop()
+        if self.run_manager.active_runs():
+            self.run_manager.stop_all()
             time.sleep(0.1)
+        SESSIONS.close_all()
         if hasattr(self, "main_page"):
             if hasattr(self.main_page, "canvas"):
                 self.main_page.canvas.get_tk_widget().destroy()
@@ -1,7 +1,4 @@
-import time
-from PySide6.QtWidgets import QMessageBox
-
-from app.methods.base import MethodBase, ControlMode
+from app.methods.base import MethodBase, ControlMode, DeadlineTimer
 from app.instruments.EGG273A import EGG273A
 from app.config import DEBUGGING
 
@@ -13,6 +10,11 @@ class GalvanostaticConstantCurrent(MethodBase):
     xlabel = "Time (s)"
     ylabel = "Voltage (mV)"
 
+    # Time since start (s), measured voltage, applied current (A)
+    record_fields = (("t", "f8"), ("V", "f8"), ("I", "f8"))
+    xfield = "t"
+    yfield = "V"
+
     @classmethod
     def parameters(cls):
         return {
@@ -59,37 +61,38 @@ class GalvanostaticConstantCurrent(MethodBase):
         # Instrument wrapper
         # -----------------------------
         instrument = EGG273A(self.device)
+        timer = DeadlineTimer(dt)
 
         try:
             # --- Configure instrument ---
             instrument.set_mode(self.mode)
             instrument.set_value(I)  # constant current
 
-            t0 = time.time()
-            t = 0.0
+            total_points = int(duration / dt + 1e-9) + 1
+            timer.start()
 
             # -----------------------------
             # Measurement loop
             # -----------------------------
-            while t <= duration:
+            for _ in range(total_points):
 
                 if stop_event.is_set():
                     if DEBUGGING:
                         print("⏹ Galvanostatic run stopped by user")
                     break
 
+                # Wait for this point's deadline (actual time since start)
+                t = timer.wait()
+
                 # Read voltage
                 V = instrument.read_value()
 
-                # Emit (time, voltage)
-                emit(t, V)
+                # Emit (time, voltage, applied current)
+                self.emit_record(emit, t=t, V=V, I=I)
 
                 # Progress
                 progress_cb(min(t / duration, 1.0))
 
-                time.sleep(dt)
-                t = time.time() - t0
-
             if DEBUGGING:
                 print("✅ Galvanostatic run finished\n")
                 
@@ -99,6 +102,8 @@ class GalvanostaticConstantCurrent(MethodBase):
             print(f"[WARN] Galvanostatic method failed: {e}")
 
         finally:
+            self.collect_run_stats(timer, instrument)
+
             # Always turn current OFF
             try:
                 instrument.set_value(0)
@@ -1,8 +1,6 @@
-import time
 import numpy as np
-from PySide6.QtWidgets import QMessageBox
 
-from app.methods.base import MethodBase, ControlMode
+from app.methods.base import MethodBase, ControlMode, DeadlineTimer
 from app.instruments.EGG273A import EGG273A
 from app.config import DEBUGGING
 
@@ -14,6 +12,11 @@ class CyclicVoltammetry(MethodBase):
     xlabel = "Potential (mV)"
     ylabel = "Current (A)"
 
+    # Potential, current, time since start (s), cycle index
+    record_fields = (("E", "f8"), ("I", "f8"), ("t", "f8"), ("cycle", "i4"))
+    xfield = "E"
+    yfield = "I"
+
     @classmethod
     def parameters(cls):
         return {
@@ -36,6 +39,10 @@ class CyclicVoltammetry(MethodBase):
             "step": {
                 "label": "Potential Step (mV)",
                 "default": 5
+            },
+            "hardware_timed": {
+                "label": "Hardware Timed (0/1)",
+                "default": 0
             }
         }
 
@@ -78,21 +85,45 @@ class CyclicVoltammetry(MethodBase):
         # dwell time per point
         dt = step / scan_rate
 
+        hardware_timed = bool(int(self.params.get("hardware_timed", 0)))
+        if hardware_timed:
+            # Checked before the run: failures inside it are only logged
+            try:
+                EGG273A.time_base_us(dt)
+            except ValueError as e:
+                raise ValueError(
+                    f"hardware_timed: {e}; use a smaller step or a faster scan rate "
+                    f"(now {step} mV at {scan_rate} mV/s), or hardware_timed=0"
+                ) from None
+
         # -----------------------------
         # REAL DEVICE MODE
         # -----------------------------
 
         # 🔹 Wrap the low-level device into an instrument
         instrument = EGG273A(self.device)
+        timer = DeadlineTimer(dt)
 
         try:
             # --- Configure instrument ---
             instrument.set_mode(self.mode)
             instrument.set_value(E_start)
 
+            if hardware_timed:
+                self._run_hardware_timed(
+                    instrument, waveform, len(single_cycle), dt,
+                    stop_event, emit, progress_cb
+                )
+                return
+
+            # Encode all SETE;READI commands before the timed loop
+            commands = instrument.encode_setpoints(waveform, read=True)
+
             # -----------------------------
             # Run CV
             # -----------------------------
+            timer.start()
+
             for i, E in enumerate(waveform):
 
                 if stop_event.is_set():
@@ -100,25 +131,21 @@ class CyclicVoltammetry(MethodBase):
                         print("⏹ CV stopped by user")
                     break
 
-                # ---- Set potential ----
-                instrument.set_value(E)
-                if DEBUGGING:
-                        print(f"Potential: {E}")
+                # ---- Wait for this point's deadline ----
+                t = timer.wait()
 
-                # ---- Real current ----
-                I = instrument.read_value()
+                # ---- Set potential and read current (one round trip) ----
+                I = instrument.step_and_read_encoded(commands[i])
                 if DEBUGGING:
+                        print(f"Potential: {E}")
                         print(f"Current: {I}")
 
                 # ---- Emit point ----
-                emit(E, I)
+                self.emit_record(emit, E=E, I=I, t=t, cycle=i // len(single_cycle))
 
                 # ---- Progress ----
                 progress_cb((i + 1) / total_points)
 
-                time.sleep(dt)
-
-
             if DEBUGGING:
                 print("✅ CV finished\n")
 
@@ -128,8 +155,47 @@ class CyclicVoltammetry(MethodBase):
                 print(f"[WARN] Method failed: {e}")
 
         finally:
+            self.collect_run_stats(timer, instrument)
+
             # Always turn current OFF
             try:
                 instrument.set_value(0.0)
             except Exception:
                 pass
+
+    # -------------------------------------------------
+    # Hardware-timed execution (onboard curve memory)
+    # -------------------------------------------------
+    def _run_hardware_timed(self, instrument, waveform, cycle_points, dt,
+                            stop_event, emit, progress_cb):
+
+        instrument.load_scan(
+            self.params["E_start"],
+            self.params["E_vertex"],
+            self.params["step"],
+            dt,
+            int(self.params["cycles"]),
+        )
+        instrument.arm_curve()
+
+        completed = instrument.wait_curve(stop_event, progress_cb)
+        if not completed:
+            if DEBUGGING:
+                print("⏹ CV stopped by user")
+            return
+
+        currents = instrument.dump_curve()
+
+        # Whole curve as one block of records (points are dt apart)
+        n = min(len(waveform), len(currents))
+        records = np.zeros(n, dtype=self.record_dtype())
+        records["E"] = waveform[:n]
+        records["I"] = currents[:n]
+        records["t"] = np.arange(n) * dt
+        records["cycle"] = np.arange(n) // cycle_points
+        self.emit_many(emit, records)
+
+        progress_cb(1.0)
+
+        if DEBUGGING:
+            print("✅ CV finished\n")
@@ -1,7 +1,6 @@
 # app/methods/BuiltIn/dummy.py
 
-import time
-from app.methods.base import MethodBase, ControlMode
+from app.methods.base import MethodBase, ControlMode, DeadlineTimer
 from app.instruments.EGG273A import EGG273A
 
 
@@ -47,6 +46,7 @@ class DummyMethod(MethodBase):
 
         # 🔹 Wrap the low-level device into an instrument
         instrument = EGG273A(self.device)
+        timer = DeadlineTimer(delay)
  
         try:
             # --- Configure instrument ---
@@ -54,19 +54,54 @@ class DummyMethod(MethodBase):
             instrument.set_value(setpoint)
 
             # --- Acquisition loop ---
+            timer.start()
             for i in range(total):
 
                 if stop_event.is_set():
                     print("Dummy method stopped by user.")
                     return
 
+                timer.wait()
                 y = instrument.read_value()
                 emit(i, y)
 
                 progress((i + 1) / total)
-                time.sleep(delay)
 
             print("Dummy method finished successfully.")
 
         finally:
+            self.collect_run_stats(timer, instrument)
+            self.safe_shutdown()
+
+    async def run_async(self, stop_event, emit, progress):
+        from app.instruments.AsyncEGG273A import AsyncEGG273A
+
+        total = int(self.params["points"])
+        delay = float(self.params["delay"])
+        setpoint = float(self.params["setpoint"])
+
+        instrument = AsyncEGG273A(self.device)
+        timer = DeadlineTimer(delay)
+
+        try:
+            await instrument.set_mode(self.mode)
+            await instrument.set_value(setpoint)
+
+            timer.start()
+            for i in range(total):
+
+                if stop_event.is_set():
+                    print("Dummy method stopped by user.")
+                    return
+
+                await timer.wait_async()
+                y = await instrument.read_value()
+                emit(i, y)
+
+                progress((i + 1) / total)
+
+            print("Dummy method finished successfully.")
+
+        finally:
+            self.collect_run_stats(timer, instrument)
             self.safe_shutdown()
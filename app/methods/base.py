@@ -1,11 +1,102 @@
 # app/methods/base.py
+import math
+import time
 from abc import ABC, abstractmethod
 from enum import Enum
 
+from app.lazy import lazy_import
+
+# Only needed by the async paths
+asyncio = lazy_import("asyncio")
+
 class ControlMode(Enum):
     POTENTIOSTAT = "potentiostat"
     GALVANOSTAT = "galvanostat"
 
+class DeadlineTimer:
+    """
+    Schedules acquisition points on absolute monotonic deadlines
+    (t0 + i * dt, perf_counter), so I/O time does not accumulate into
+    the sampling interval.
+
+    Records the actual timestamp and lateness of every point.
+    """
+
+    def __init__(self, dt):
+        self.dt = float(dt)
+        self.t0 = None
+        self.index = 0
+        self.timestamps = []
+        self.lateness = []
+
+    def start(self):
+        self.t0 = time.perf_counter()
+        self.index = 0
+        self.timestamps.clear()
+        self.lateness.clear()
+
+    def _next_delay(self):
+        if self.t0 is None:
+            self.start()
+        deadline = self.t0 + self.index * self.dt
+        return deadline, deadline - time.perf_counter()
+
+    def _record(self, deadline):
+        now = time.perf_counter()
+        self.timestamps.append(now - self.t0)
+        self.lateness.append(now - deadline)
+        self.index += 1
+        return now - self.t0
+
+    def wait(self):
+        """
+        Blocks until the next deadline; returns the actual time (s)
+        since start.
+        """
+        deadline, delay = self._next_delay()
+        if delay > 0:
+            time.sleep(delay)
+        return self._record(deadline)
+
+    async def wait_async(self):
+        deadline, delay = self._next_delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self._record(deadline)
+
+    def elapsed(self):
+        if self.t0 is None:
+            return 0.0
+        return time.perf_counter() - self.t0
+
+    def stats(self):
+        """
+        Jitter / overrun summary of the points taken so far.
+
+        overruns: points that started more than one dt late.
+        """
+        n = len(self.lateness)
+        if n == 0:
+            return {"points": 0}
+
+        mean = sum(self.lateness) / n
+        jitter = math.sqrt(sum((x - mean) ** 2 for x in self.lateness) / n)
+
+        if n > 1:
+            interval = (self.timestamps[-1] - self.timestamps[0]) / (n - 1)
+        else:
+            interval = self.dt
+
+        return {
+            "points": n,
+            "dt": self.dt,
+            "mean_interval": interval,
+            "mean_lateness": mean,
+            "max_lateness": max(self.lateness),
+            "jitter": jitter,
+            "overruns": sum(1 for x in self.lateness if x > self.dt),
+        }
+
 class MethodBase(ABC):
     name: str = "Unnamed Method"
     mode: ControlMode = ControlMode.POTENTIOSTAT
@@ -14,10 +105,23 @@ class MethodBase(ABC):
     xlabel: str = "X"
     ylabel: str = "Y"
 
+    # One emitted point as a NumPy record: (name, dtype) pairs. xfield and
+    # yfield are the plotted columns and come first in the data file;
+    # further fields (time, setpoint, cycle, ...) are saved alongside.
+    record_fields: tuple = (("x", "f8"), ("y", "f8"))
+    xfield: str = "x"
+    yfield: str = "y"
+
     def __init__(self, device):
         self.device = device
         self.params = {}
 
+        # DeadlineTimer.stats() of the last run (None if not timed)
+        self.timing_stats = None
+
+        # BadReply records of the last run (see ReplyParser)
+        self.parse_errors = []
+
     @classmethod
     @abstractmethod
     def parameters(cls) -> dict:
@@ -26,6 +130,53 @@ class MethodBase(ABC):
     def set_params(self, params: dict):
         self.params = params
 
+    # ---- records ----
+    @classmethod
+    def record_dtype(cls):
+        import numpy as np
+        return np.dtype(list(cls.record_fields))
+
+    @classmethod
+    def column_labels(cls):
+        """Data file column labels, in record_fields order."""
+        labels = {cls.xfield: cls.xlabel, cls.yfield: cls.ylabel}
+        return [labels.get(name, name) for name, _ in cls.record_fields]
+
+    def emit_record(self, emit, **fields):
+        """
+        Emits one record. Sinks with emit_record (AcquisitionQueue) keep
+        every field; a plain emit(x, y) callable gets the plotted pair.
+        """
+        emit_record = getattr(emit, "emit_record", None)
+        if emit_record is not None:
+            emit_record(**fields)
+        else:
+            emit(fields[self.xfield], fields[self.yfield])
+
+    def emit_many(self, emit, records):
+        """
+        Emits a block of records (structured array of record_dtype())
+        in one call, or point by point to a plain emit(x, y) callable.
+        """
+        emit_many = getattr(emit, "emit_many", None)
+        if emit_many is not None:
+            emit_many(records)
+            return
+        for x, y in zip(records[self.xfield].tolist(), records[self.yfield].tolist()):
+            emit(x, y)
+
+    def collect_run_stats(self, timer, instrument):
+        """
+        Stores timing and reply-parsing results at the end of a run.
+        """
+        self.timing_stats = timer.stats()
+
+        parser = getattr(instrument, "parser", None)
+        if parser is not None:
+            self.parse_errors = list(parser.errors)
+            if parser.errors:
+                print(f"[WARN] {parser.summary()}")
+
     def safe_shutdown(self):
         try:
             if hasattr(self.device, "disable"):
@@ -36,6 +187,16 @@ class MethodBase(ABC):
     @abstractmethod
     def run(self, stop_event, emit, progress):
         """
+        emit(x, y) → one plotted/saved point (see emit_record, emit_many)
         progress(fraction) → updates GUI progress bar
         """
         pass
+
+    async def run_async(self, stop_event, emit, progress):
+        """
+        asyncio variant of run().
+
+        Default runs the blocking run() in a worker thread; methods can
+        override it with a native coroutine (see AsyncEGG273A).
+        """
+        await asyncio.to_thread(self.run, stop_event, emit, progress)
@@ -0,0 +1,588 @@
+# app/methods/dsl.py
+"""
+Process language of the JSON custom methods (written by the old
+"New Method" tab into Methods/Custom):
+
+    REPEAT(C){
+        FOR_RANGEV(Vs,Ve,Vstep){
+            MEAN(R),
+            DELAY(D),
+            OUTPUT(Vout=V,Iout=I)
+        };
+    }
+
+REPEAT(n) runs its body n times; FOR_RANGEV(start, end, step) steps the
+potential (mV) from start to end inclusive. In each step the potential
+is applied, DELAY(d) seconds pass, and the current is read MEAN(r) times
+during the second half of d and averaged. OUTPUT(name=V, name=I)
+names the data columns of the potential (V) and the mean current (I);
+every point is recorded whether or not its loop has an OUTPUT.
+Arguments are numbers or names of the method's inputs. REPEAT blocks
+may nest, and several blocks may follow each other.
+
+The text is parsed once per file into an AST (parse). compile_plan
+expands it, for one set of parameter values, into NumPy arrays: the
+setpoint, time slot and number of readings of every point. execute_plan
+runs those arrays with pre-encoded commands, so nothing is interpreted
+per point.
+"""
+import json
+import math
+import pathlib
+import re
+import time
+from collections import namedtuple
+
+from app.lazy import lazy_import
+from app.methods.base import MethodBase, ControlMode, DeadlineTimer
+
+np = lazy_import("numpy")
+
+
+class DSLError(ValueError):
+    pass
+
+
+# -------------------------------------------------
+# AST
+# -------------------------------------------------
+Num = namedtuple("Num", "value")
+Var = namedtuple("Var", "name")
+Repeat = namedtuple("Repeat", "count body")
+# index: FOR_RANGEV number in the source; mean / delay: expression or None;
+# outputs: {column name: "V" or "I"} from OUTPUT ({} without one)
+RangeV = namedtuple("RangeV", "index start end step mean delay outputs")
+
+
+# -------------------------------------------------
+# Parser
+# -------------------------------------------------
+_TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<number>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+  | (?P<name>[A-Za-z_]\w*)
+  | (?P<punct>[(){},;:=])
+""", re.VERBOSE)
+
+# Separators between statements (the old writer used all three)
+_SEPARATORS = (",", ";", ":")
+
+# What OUTPUT can record: applied potential, mean current
+_QUANTITIES = ("V", "I")
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if m is None:
+            raise DSLError(f"unexpected {text[pos]!r} at {_where(text, pos)}")
+        kind = m.lastgroup
+        if kind != "space":
+            tokens.append((kind, m.group(), pos))
+        pos = m.end()
+    tokens.append(("end", "", len(text)))
+    return tokens
+
+
+def _where(text, pos):
+    line = text.count("\n", 0, pos) + 1
+    column = pos - (text.rfind("\n", 0, pos) + 1) + 1
+    return f"line {line}, column {column}"
+
+
+class _Parser:
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.i = 0
+        self.loops = 0
+
+    def peek(self):
+        return self.tokens[self.i]
+
+    def take(self, value=None, kind=None):
+        tok_kind, tok_value, pos = self.tokens[self.i]
+        if (value is not None and tok_value.upper() != value) or (kind is not None and tok_kind != kind):
+            wanted = value or kind
+            found = tok_value or "end of text"
+            raise DSLError(f"expected {wanted!r}, found {found!r} at {_where(self.text, pos)}")
+        self.i += 1
+        return tok_value
+
+    def skip_separators(self):
+        while self.peek()[1] in _SEPARATORS:
+            self.i += 1
+
+    def program(self):
+        body = self.statements(end="")
+        if not body:
+            raise DSLError("empty process")
+        return body
+
+    def statements(self, end):
+        body = []
+        self.skip_separators()
+        while self.peek()[1] != end and self.peek()[0] != "end":
+            body.append(self.statement())
+            self.skip_separators()
+        return body
+
+    def statement(self):
+        kind, value, pos = self.peek()
+        keyword = value.upper()
+        if keyword == "REPEAT":
+            self.take("REPEAT")
+            self.take("(")
+            count = self.expr()
+            self.take(")")
+            self.take("{")
+            body = self.statements(end="}")
+            self.take("}")
+            return Repeat(count, body)
+        if keyword == "FOR_RANGEV":
+            return self.range_loop()
+        raise DSLError(f"expected REPEAT or FOR_RANGEV, found {value or 'end of text'!r} at {_where(self.text, pos)}")
+
+    def range_loop(self):
+        self.take("FOR_RANGEV")
+        self.take("(")
+        start = self.expr()
+        self.take(",")
+        end = self.expr()
+        self.take(",")
+        step = self.expr()
+        self.take(")")
+        self.take("{")
+
+        commands = {}
+        self.skip_separators()
+        while self.peek()[1] != "}":
+            kind, value, pos = self.peek()
+            keyword = value.upper()
+            if keyword not in ("MEAN", "DELAY", "OUTPUT"):
+                raise DSLError(f"expected MEAN, DELAY or OUTPUT, found {value or 'end of text'!r} at {_where(self.text, pos)}")
+            if keyword in commands:
+                raise DSLError(f"{keyword} given twice in one FOR_RANGEV at {_where(self.text, pos)}")
+            self.take(keyword)
+            self.take("(")
+            commands[keyword] = self.outputs() if keyword == "OUTPUT" else self.expr()
+            self.take(")")
+            self.skip_separators()
+        self.take("}")
+
+        self.loops += 1
+        return RangeV(self.loops - 1, start, end, step,
+                      commands.get("MEAN"), commands.get("DELAY"), commands.get("OUTPUT", {}))
+
+    def outputs(self):
+        pairs = {}
+        while self.peek()[1] != ")":
+            key = self.take(kind="name")
+            self.take("=")
+            pos = self.peek()[2]
+            quantity = self.take(kind="name").upper()
+            if quantity not in _QUANTITIES:
+                raise DSLError(f"OUTPUT can record V or I, found {quantity!r} at {_where(self.text, pos)}")
+            if quantity in pairs.values():
+                raise DSLError(f"OUTPUT records {quantity} twice at {_where(self.text, pos)}")
+            pairs[key] = quantity
+            if self.peek()[1] == ",":
+                self.take(",")
+        return pairs
+
+    def expr(self):
+        kind, value, pos = self.peek()
+        if kind == "number":
+            self.i += 1
+            return Num(float(value))
+        if kind == "name":
+            self.i += 1
+            return Var(value)
+        raise DSLError(f"expected a number or input name, found {value or 'end of text'!r} at {_where(self.text, pos)}")
+
+
+def parse(text):
+    """Process text -> AST (list of Repeat / RangeV). Raises DSLError."""
+    return _Parser(text).program()
+
+
+def variables(program):
+    """Input names the program refers to."""
+    names = set()
+
+    def visit(node):
+        if isinstance(node, Var):
+            names.add(node.name)
+        elif isinstance(node, Repeat):
+            visit(node.count)
+            for child in node.body:
+                visit(child)
+        elif isinstance(node, RangeV):
+            for expr in (node.start, node.end, node.step, node.mean, node.delay):
+                if expr is not None:
+                    visit(expr)
+
+    for node in program:
+        visit(node)
+    return names
+
+
+def output_columns(program):
+    """
+    (potential column, current column) named by the program's OUTPUT
+    clauses, or None without any. Raises DSLError if they disagree or
+    leave V or I out.
+    """
+    found = set()
+
+    def visit(node):
+        if isinstance(node, Repeat):
+            for child in node.body:
+                visit(child)
+        elif node.outputs:
+            found.add(tuple(sorted(node.outputs.items())))
+
+    for node in program:
+        visit(node)
+    if not found:
+        return None
+    if len(found) > 1:
+        raise DSLError("FOR_RANGEV blocks have different OUTPUT columns")
+
+    columns = {quantity: name for name, quantity in found.pop()}
+    if len(columns) < 2:
+        raise DSLError("OUTPUT must record both V and I")
+    return columns["V"], columns["I"]
+
+
+# -------------------------------------------------
+# Plan
+# -------------------------------------------------
+class Plan:
+    """
+    One run of a program as arrays, one entry per point:
+
+        setpoint    potential (mV)
+        duration    time slot of the point (s, = DELAY)
+        n_avg       readings averaged (MEAN)
+        cycle       iteration of the outermost REPEAT
+        loop        FOR_RANGEV the point belongs to
+        start       start time of the point (s since the run started)
+    """
+
+    def __init__(self, setpoint, duration, n_avg, cycle, loop):
+        self.setpoint = setpoint
+        self.duration = duration
+        self.n_avg = n_avg
+        self.cycle = cycle
+        self.loop = loop
+
+        self.start = np.zeros(len(setpoint))
+        np.cumsum(duration[:-1], out=self.start[1:])
+
+    def __len__(self):
+        return len(self.setpoint)
+
+    def read_times(self):
+        """
+        (point index, time) of every reading: n_avg readings evenly spread
+        over the second half of the point's slot, the last at its end.
+        """
+        owner = np.repeat(np.arange(len(self)), self.n_avg)
+        # k = 1..n_avg within each point
+        first = np.repeat(np.cumsum(self.n_avg) - self.n_avg, self.n_avg)
+        k = np.arange(len(owner)) - first + 1
+        half = self.duration[owner] / 2
+        return owner, self.start[owner] + half + k * half / self.n_avg[owner]
+
+    @property
+    def total_time(self):
+        return float(self.duration.sum())
+
+
+def _value(expr, params, what):
+    if isinstance(expr, Num):
+        return expr.value
+    if expr.name not in params:
+        raise DSLError(f"{what}: unknown input {expr.name!r}")
+    try:
+        return float(params[expr.name])
+    except (TypeError, ValueError):
+        raise DSLError(f"{what}: input {expr.name!r} is not a number ({params[expr.name]!r})")
+
+
+def _range(start, end, step):
+    """FOR_RANGEV values, start to end inclusive, in the direction of end."""
+    if step == 0:
+        raise DSLError("FOR_RANGEV step is 0")
+    n = int(math.floor(abs(end - start) / abs(step) + 1e-9)) + 1
+    return start + math.copysign(abs(step), end - start) * np.arange(n)
+
+
+def compile_plan(program, params):
+    """Expands the AST with the given input values into a Plan."""
+
+    def expand(nodes):
+        parts = []
+        for node in nodes:
+            if isinstance(node, Repeat):
+                count = _value(node.count, params, "REPEAT")
+                if count < 0 or count != int(count):
+                    raise DSLError(f"REPEAT count must be a whole number >= 0, got {count:g}")
+                body = expand(node.body)
+                count = int(count)
+                n = len(body[0])
+                tiled = [np.tile(a, count) for a in body]
+                tiled[3] = np.repeat(np.arange(count, dtype=np.int32), n)
+                parts.append(tiled)
+            else:
+                values = _range(
+                    _value(node.start, params, "FOR_RANGEV start"),
+                    _value(node.end, params, "FOR_RANGEV end"),
+                    _value(node.step, params, "FOR_RANGEV step"),
+                )
+                n = len(values)
+                delay = _value(node.delay, params, "DELAY") if node.delay is not None else 0.0
+                mean = _value(node.mean, params, "MEAN") if node.mean is not None else 1
+                if delay < 0:
+                    raise DSLError(f"DELAY must be >= 0, got {delay:g}")
+                if mean < 1 or mean != int(mean):
+                    raise DSLError(f"MEAN must be a whole number >= 1, got {mean:g}")
+                parts.append([
+                    values,
+                    np.full(n, delay),
+                    np.full(n, int(mean), dtype=np.int32),
+                    np.zeros(n, dtype=np.int32),
+                    np.full(n, node.index, dtype=np.int32),
+                ])
+
+        if not parts:
+            return [np.zeros(0), np.zeros(0), np.zeros(0, np.int32), np.zeros(0, np.int32), np.zeros(0, np.int32)]
+        return [np.concatenate(column) for column in zip(*parts)]
+
+    return Plan(*expand(program))
+
+
+# -------------------------------------------------
+# Engine
+# -------------------------------------------------
+class ScheduleTimer(DeadlineTimer):
+    """DeadlineTimer over precomputed point start times instead of i * dt."""
+
+    def __init__(self, schedule):
+        super().__init__(float(np.median(np.diff(schedule))) if len(schedule) > 1 else 0.0)
+        self.schedule = schedule.tolist()
+
+    def _next_delay(self):
+        if self.t0 is None:
+            self.start()
+        deadline = self.t0 + self.schedule[self.index]
+        return deadline, deadline - time.perf_counter()
+
+
+def _sleep_until(deadline):
+    delay = deadline - time.perf_counter()
+    if delay > 0:
+        time.sleep(delay)
+
+
+# Points per emit_many block (or fewer, every EMIT_INTERVAL seconds)
+EMIT_BLOCK = 64
+EMIT_INTERVAL = 0.1
+
+
+def execute_plan(method, plan, instrument, timer, stop_event, emit, progress_cb):
+    """
+    Runs plan on instrument (mode already set): per point one pre-encoded
+    setpoint write and n_avg readings at their scheduled times. timer:
+    ScheduleTimer(plan.start). Records are emitted in blocks. Returns the
+    number of points completed.
+    """
+    n = len(plan)
+    if n == 0:
+        return 0
+
+    commands = instrument.encode_setpoints(plan.setpoint)
+    _, read_times = plan.read_times()
+    read_times = read_times.tolist()
+    n_avg = plan.n_avg.tolist()
+
+    records = np.zeros(n, dtype=method.record_dtype())
+    x, y = method.xfield, method.yfield
+    records[x] = plan.setpoint
+    records["cycle"] = plan.cycle
+    records["loop"] = plan.loop
+    currents = [0.0] * n
+    times = [0.0] * n
+
+    timer.start()
+    t0 = timer.t0
+
+    emitted = 0
+    last_emit = t0
+    r = 0
+    done = 0
+
+    for i in range(n):
+        if stop_event.is_set():
+            break
+
+        times[i] = timer.wait()
+        instrument.set_value_encoded(commands[i])
+
+        total = 0.0
+        for _ in range(n_avg[i]):
+            _sleep_until(t0 + read_times[r])
+            total += instrument.read_value()
+            r += 1
+        currents[i] = total / n_avg[i]
+        done = i + 1
+
+        now = time.perf_counter()
+        if done - emitted >= EMIT_BLOCK or now - last_emit >= EMIT_INTERVAL:
+            _emit_block(method, emit, records, currents, times, emitted, done, y)
+            emitted, last_emit = done, now
+            progress_cb(done / n)
+
+    if done > emitted:
+        _emit_block(method, emit, records, currents, times, emitted, done, y)
+    progress_cb(done / n)
+    return done
+
+
+def _emit_block(method, emit, records, currents, times, start, stop, yfield):
+    block = records[start:stop]
+    block[yfield] = currents[start:stop]
+    block["t"] = times[start:stop]
+    method.emit_many(emit, block)
+
+
+# -------------------------------------------------
+# JSON methods
+# -------------------------------------------------
+# Data columns when the file has no "output" list (as written by the old GUI)
+DEFAULT_OUTPUT = [
+    {"label": "Potential(mV)", "type": "float", "variable": "Vout"},
+    {"label": "Current(A)", "type": "float", "variable": "Iout"},
+]
+
+_TYPES = {"int": int, "float": float}
+
+
+class DSLMethod(MethodBase):
+    """
+    Base of the classes made from JSON custom methods (load_json_method):
+    program is the parsed process, inputs the JSON "inputs" list.
+    """
+
+    mode = ControlMode.POTENTIOSTAT
+    program = ()
+    inputs = ()
+    process = ""
+    description = ""
+    source = None
+
+    @classmethod
+    def parameters(cls):
+        params = {}
+        for inp in cls.inputs:
+            spec = {"label": inp.get("label", inp["variable"]), "default": inp.get("default", 0)}
+            if inp.get("type") in _TYPES:
+                spec["type"] = _TYPES[inp["type"]]
+            params[inp["variable"]] = spec
+        return params
+
+    def plan(self):
+        return compile_plan(self.program, self.params)
+
+    def run(self, stop_event, emit, progress_cb):
+        from app.instruments.EGG273A import EGG273A
+
+        plan = self.plan()
+        print(f"[DSL] {self.name}: {len(plan)} points, {plan.total_time:.1f} s")
+
+        instrument = EGG273A(self.device)
+        timer = ScheduleTimer(plan.start)
+        try:
+            instrument.set_mode(self.mode)
+            if len(plan):
+                instrument.set_value(float(plan.setpoint[0]))
+            execute_plan(self, plan, instrument, timer, stop_event, emit, progress_cb)
+        except Exception as e:
+            print(f"[WARN] Method failed: {e}")
+            raise
+        finally:
+            self.collect_run_stats(timer, instrument)
+            try:
+                instrument.set_value(0.0)
+            except Exception:
+                pass
+
+
+def _class_name(stem):
+    name = re.sub(r"\W", "_", stem)
+    return "DSL_" + name
+
+
+def load_json_method(path):
+    """
+    Reads a JSON custom method and returns its DSLMethod subclass.
+    Raises DSLError (or OSError / ValueError for unreadable files),
+    including for a process naming inputs the file does not define
+    (the old interpreter silently used fixed fallback values) and for
+    any mode other than potentiostat.
+
+    Data columns: those named by OUTPUT, labelled from the "output"
+    list; without OUTPUT, the first two "output" entries.
+    """
+    path = pathlib.Path(path)
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    for key in ("name", "process"):
+        if key not in data:
+            raise DSLError(f"missing {key!r}")
+
+    program = parse(data["process"])
+
+    inputs = data.get("inputs", [])
+    unknown = variables(program) - {inp["variable"] for inp in inputs}
+    if unknown:
+        raise DSLError(f"process uses undefined inputs {sorted(unknown)}")
+
+    output = data.get("output") or DEFAULT_OUTPUT
+    columns = output_columns(program)
+    if columns is None:
+        if len(output) < 2:
+            raise DSLError("'output' needs a potential and a current column")
+        columns = output[0]["variable"], output[1]["variable"]
+    xfield, yfield = columns
+    if len({xfield, yfield, "t", "cycle", "loop"}) < 5:
+        raise DSLError("output variables clash with t / cycle / loop")
+    labels = {out["variable"]: out.get("label", out["variable"]) for out in output}
+
+    # FOR_RANGEV steps are potentials (mV): galvanostat mode would send
+    # them as currents (A)
+    mode = data.get("mode", ControlMode.POTENTIOSTAT.value)
+    if mode != ControlMode.POTENTIOSTAT.value:
+        raise DSLError(f"mode {mode!r} not supported; only {ControlMode.POTENTIOSTAT.value!r}")
+
+    return type(_class_name(path.stem), (DSLMethod,), {
+        "__module__": path.stem,
+        "__doc__": data.get("description") or None,
+        "name": data["name"],
+        "mode": ControlMode.POTENTIOSTAT,
+        "xlabel": labels.get(xfield, xfield),
+        "ylabel": labels.get(yfield, yfield),
+        "record_fields": ((xfield, "f8"), (yfield, "f8"), ("t", "f8"), ("cycle", "i4"), ("loop", "i4")),
+        "xfield": xfield,
+        "yfield": yfield,
+        "program": program,
+        "inputs": inputs,
+        "process": data["process"],
+        "description": data.get("description", ""),
+        "source": str(path),
+    })
@@ -1,42 +1,257 @@
+import hashlib
 import importlib.util
+import json
+import os
 import pathlib
 import sys
+import types
 
-from app.methods.base import MethodBase
+from app.methods.base import MethodBase, ControlMode
 
+# Cached method metadata, one per methods folder
+MANIFEST_NAME = ".methods_manifest.json"
+MANIFEST_VERSION = 2
 
-def load_methods_from_folder(folder: pathlib.Path):
-    methods = []
+# JSON stand-ins for the "type" entries of parameters()
+_TYPES = {"int": int, "float": float, "str": str, "bool": bool}
 
-    if not folder.exists():
-        return methods
+# Plugin files: Python modules and JSON process methods (see dsl.py)
+PLUGIN_SUFFIXES = (".py", ".json")
+
+# path -> ((mtime_ns, size), module) of files imported so far
+_MODULES = {}
+
+
+def plugin_files(folder: pathlib.Path):
+    """Plugin files in folder, sorted; names starting with _ or . are skipped."""
+    return sorted(
+        file for file in folder.iterdir()
+        if file.suffix in PLUGIN_SUFFIXES and not file.name.startswith(("_", "."))
+    )
 
-    for file in folder.glob("*.py"):
-        if file.name.startswith("_"):
-            continue
 
+def _import_file(file: pathlib.Path):
+    st = file.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _MODULES.get(str(file))
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    if file.suffix == ".json":
+        # Compiled into a DSLMethod subclass, held by a stand-in module
+        from app.methods.dsl import load_json_method
+        cls = load_json_method(file)
+        module = types.ModuleType(file.stem)
+        module.__file__ = str(file)
+        setattr(module, cls.__name__, cls)
+    else:
         spec = importlib.util.spec_from_file_location(file.stem, file)
         module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+    _MODULES[str(file)] = (stamp, module)
+    return module
+
 
+def _method_classes(module):
+    return [
+        obj for obj in module.__dict__.values()
+        if isinstance(obj, type)
+        and issubclass(obj, MethodBase)
+        and obj is not MethodBase
+    ]
+
+
+def load_methods_from_folder(folder: pathlib.Path, errors=None):
+    """
+    Imports every plugin file in folder (unchanged files come from the
+    module cache). errors: optional dict, gets file path -> exception.
+    """
+    methods = []
+
+    if not folder.exists():
+        return methods
+
+    for file in plugin_files(folder):
         try:
-            spec.loader.exec_module(module)
+            module = _import_file(file)
         except Exception as e:
             print(f"[METHOD LOAD ERROR] {file.name}: {e}")
+            if errors is not None:
+                errors[str(file)] = e
             continue
 
-        for obj in module.__dict__.values():
-            if (
-                isinstance(obj, type)
-                and issubclass(obj, MethodBase)
-                and obj is not MethodBase
-            ):
-                methods.append(obj)
+        methods.extend(_method_classes(module))
 
     return methods
 
 
-def discover_methods():
+# -------------------------------------------------
+# Manifest / lazy loading
+# -------------------------------------------------
+class LazyMethod:
+    """
+    Stands in for a MethodBase subclass listed in the manifest.
+
+    name, mode, labels and parameters() come from the manifest; any
+    other attribute, or creating an instance, imports the plugin file
+    and forwards to the real class.
+    """
+
+    def __init__(self, path, info):
+        self._path = pathlib.Path(path)
+        self._class_name = info["class"]
+        self._cls = None
+
+        # As on the real class (plugin modules are named after their file)
+        self.__name__ = info["class"]
+        self.__module__ = self._path.stem
+
+        self.name = info["name"]
+        self.mode = ControlMode(info["mode"])
+        self.xlabel = info["xlabel"]
+        self.ylabel = info["ylabel"]
+        self._parameters = info["parameters"]
+
+    def parameters(self):
+        return {
+            key: {
+                k: _TYPES.get(v, v) if k == "type" else v
+                for k, v in spec.items()
+            }
+            for key, spec in self._parameters.items()
+        }
+
+    @property
+    def loaded(self):
+        return self._cls is not None
+
+    def load(self):
+        """Imports the plugin file (once) and returns the real class."""
+        if self._cls is None:
+            module = _import_file(self._path)
+            self._cls = getattr(module, self._class_name)
+        return self._cls
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        # Only reached for attributes not set in __init__
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._cls is not None else "not loaded"
+        return f"<LazyMethod {self.name!r} from {self._path.name} ({state})>"
 
+
+def _file_hash(file):
+    return hashlib.sha1(file.read_bytes()).hexdigest()
+
+
+def _describe(cls):
+    params = {}
+    for key, spec in cls.parameters().items():
+        params[key] = {
+            k: v.__name__ if k == "type" and isinstance(v, type) else v
+            for k, v in spec.items()
+        }
+    return {
+        "class": cls.__name__,
+        "name": cls.name,
+        "mode": cls.mode.value,
+        "xlabel": cls.xlabel,
+        "ylabel": cls.ylabel,
+        "parameters": params,
+    }
+
+
+def _load_manifest(path):
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "files": {}}
+
+
+def _save_manifest(path, manifest):
+    try:
+        # Serialize first: a parameters() value JSON cannot hold (e.g. a
+        # callable) must not leave a half-written file behind
+        text = json.dumps(manifest, indent=1)
+        with open(str(path) + ".tmp", "w") as f:
+            f.write(text)
+        os.replace(str(path) + ".tmp", path)
+    except (OSError, TypeError, ValueError) as e:
+        # e.g. read-only install: works, just without the cache
+        print(f"[METHOD LOADER] Cannot write manifest {path}: {e}")
+
+
+def scan_methods(folder: pathlib.Path, errors=None):
+    """
+    LazyMethod for every method in folder, from the folder's manifest.
+
+    Only files that are new or whose mtime/size and content hash changed
+    are imported (to re-read their metadata); the manifest is rewritten
+    when anything changed. errors: optional dict, gets file path ->
+    exception for files that failed to import.
+    """
+    if not folder.exists():
+        return []
+
+    manifest_path = folder / MANIFEST_NAME
+    manifest = _load_manifest(manifest_path)
+    files = {}
+    changed = False
+
+    for file in plugin_files(folder):
+        st = file.stat()
+        entry = manifest["files"].get(file.name)
+
+        if entry is not None and (entry["mtime_ns"], entry["size"]) != (st.st_mtime_ns, st.st_size):
+            digest = _file_hash(file)
+            if entry["hash"] == digest:
+                entry = {**entry, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+            else:
+                entry = None
+            changed = True
+
+        if entry is None:
+            try:
+                classes = _method_classes(_import_file(file))
+            except Exception as e:
+                print(f"[METHOD LOAD ERROR] {file.name}: {e}")
+                if errors is not None:
+                    errors[str(file)] = e
+                continue
+            entry = {
+                "mtime_ns": st.st_mtime_ns,
+                "size": st.st_size,
+                "hash": _file_hash(file),
+                "methods": [_describe(cls) for cls in classes],
+            }
+            changed = True
+
+        files[file.name] = entry
+
+    if changed or set(files) != set(manifest["files"]):
+        manifest["files"] = files
+        _save_manifest(manifest_path, manifest)
+
+    return [
+        LazyMethod(folder / name, info)
+        for name, entry in files.items()
+        for info in entry["methods"]
+    ]
+
+
+def method_folders():
+    """BuiltIn methods folder, then the Custom ones that exist."""
     candidates = []
 
     # 1️⃣ Normal source execution
@@ -51,14 +266,30 @@ def discover_methods():
             exe_dir / "app/methods/BuiltIn"
         )
 
-    methods = []
+    folders = []
 
     for folder in candidates:
         if folder.exists():
             print(f"[METHOD LOADER] Using: {folder}")
-            methods.extend(load_methods_from_folder(folder))
+            folders.append(folder)
             break
     else:
         print("[METHOD LOADER] No BuiltIn methods found")
 
+    # User methods: next to the BuiltIn ones, or Methods/Custom in the working directory
+    for folder in (pathlib.Path(__file__).parent / "Custom", pathlib.Path("Methods/Custom")):
+        if folder.exists() and folder.resolve() not in [f.resolve() for f in folders]:
+            print(f"[METHOD LOADER] Using: {folder}")
+            folders.append(folder)
+
+    return folders
+
+
+def discover_methods(errors=None):
+
+    methods = []
+
+    for folder in method_folders():
+        methods.extend(scan_methods(folder, errors))
+
     return methods
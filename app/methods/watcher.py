@@ -0,0 +1,99 @@
+# app/methods/watcher.py
+import pathlib
+import threading
+
+from app.methods.loader import plugin_files, scan_methods
+
+
+class MethodWatcher:
+    """
+    Polls the method folders and reloads plugins (.py and .json) when a
+    file changes.
+
+    Only new / changed files are re-imported (scan_methods and the loader's
+    (mtime, size)-keyed module cache); their classes are loaded right
+    away. If a changed file fails to import, the methods it provided before stay
+    available (when they had been loaded) and the error is reported.
+
+    on_change(methods, errors) is called from the watcher thread with the
+    full method list and {file path: exception}.
+    """
+
+    def __init__(self, folders, on_change, methods=(), interval=0.5):
+        self.folders = [pathlib.Path(folder) for folder in folders]
+        self.on_change = on_change
+        self.interval = interval
+
+        # file path -> methods it provides, of the last good import
+        self._by_file = {}
+        for method in methods:
+            self._by_file.setdefault(str(method._path), []).append(method)
+
+        self._stamps = {folder: self._snapshot(folder) for folder in self.folders}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._watch, daemon=True, name="method-watcher")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    @staticmethod
+    def _snapshot(folder):
+        stamps = {}
+        if folder.exists():
+            for file in plugin_files(folder):
+                try:
+                    st = file.stat()
+                except OSError:
+                    continue    # removed while listing
+                stamps[str(file)] = (st.st_mtime_ns, st.st_size)
+        return stamps
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"[METHOD WATCHER] {e}")
+
+    def poll(self):
+        """Reloads changed folders; returns True if anything changed."""
+        changed = set()
+        for folder in self.folders:
+            stamps = self._snapshot(folder)
+            old = self._stamps[folder]
+            changed.update(path for path in stamps.keys() | old.keys() if stamps.get(path) != old.get(path))
+            self._stamps[folder] = stamps
+
+        if not changed:
+            return False
+
+        errors = {}
+        by_file = {}
+        for folder in self.folders:
+            for method in scan_methods(folder, errors):
+                path = str(method._path)
+                if path in changed and path not in errors:
+                    # Just imported by scan_methods: pin the class, so a
+                    # later broken edit cannot take it away
+                    try:
+                        method.load()
+                    except Exception as e:
+                        errors[path] = e
+                        continue
+                by_file.setdefault(path, []).append(method)
+
+        # Broken files keep what they provided before (if it was imported)
+        for path in errors:
+            kept = [m for m in self._by_file.get(path, []) if m.loaded]
+            if kept:
+                by_file[path] = kept
+        self._by_file = by_file
+
+        methods = [method for group in by_file.values() for method in group]
+        print(f"[METHOD WATCHER] Reloaded: {len(methods)} methods, {len(errors)} errors")
+        self.on_change(methods, errors)
+        return True
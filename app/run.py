@@ -0,0 +1,117 @@
+# app/run.py
+"""
+Headless method runner: no Tk, no matplotlib.
+
+    python -m app.run --list
+    python -m app.run CV --resource GPIB0::13::INSTR --param E_start=-200 --param cycles=3
+    python -m app.run CV --simulate --params cv.json --user Max --project Project1
+
+Parameters start from the method's defaults, then the JSON file
+(--params), then --param name=value. Data goes straight to the data store
+(<root>/<user>/<project>/<experiment>_<method>_<timestamp>.csv|.egr)
+and is indexed in the catalog; throughput and timing stats are printed
+at exit.
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+
+from app.catalog import Catalog
+from app.config import DATA_FORMAT, DEBUGGING, SIMULATOR
+from app.instruments.sessions import SESSIONS
+from app.methods.loader import discover_methods
+from app.runs import DEFAULT_ROOT, find_method, method_params, run_filepath, run_method
+
+
+def _print_methods(methods):
+    for method_cls in methods:
+        print(f"{method_cls.name}  ({method_cls.mode.name.lower()}, {method_cls.xlabel} / {method_cls.ylabel})")
+        for key, spec in method_cls.parameters().items():
+            print(f"    {key} = {spec.get('default')!r:10}  {spec.get('label', '')}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.run", description=__doc__.split("\n\n")[0])
+    parser.add_argument("method", nargs="?", help="method name (see --list)")
+    parser.add_argument("--list", action="store_true", help="list methods and their parameters")
+    parser.add_argument("--resource", help="VISA resource name")
+    parser.add_argument("--simulate", action="store_true", help="run on the simulated 273A")
+    parser.add_argument("--params", help="JSON file with parameter values")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUE")
+    parser.add_argument("--root", default=DEFAULT_ROOT, help="data store (default: %(default)s)")
+    parser.add_argument("--user", default="default")
+    parser.add_argument("--project", default="default")
+    parser.add_argument("--experiment", default="experiment")
+    parser.add_argument("--out", help="data file (default: in the data store)")
+    parser.add_argument("--format", choices=("csv", "egr"), default=DATA_FORMAT)
+    parser.add_argument("--stats", help="also write the stats to this JSON file")
+    parser.add_argument("--quiet", action="store_true", help="no progress line")
+    args = parser.parse_args(argv)
+
+    methods = discover_methods()
+    if args.list:
+        _print_methods(methods)
+        return 0
+    if not args.method:
+        parser.error("a method name is required (or --list)")
+
+    method_cls = find_method(methods, args.method)
+    if method_cls is None:
+        parser.error(f"unknown method {args.method!r}; available: {', '.join(m.name for m in methods)}")
+
+    resource = args.resource
+    if args.simulate:
+        resource = resource or SIMULATOR["resource"]
+    elif resource is None and not DEBUGGING:
+        parser.error("--resource is required (or --simulate)")
+
+    try:
+        params = method_params(method_cls, args.params, args.param)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filepath = args.out or run_filepath(
+        args.root, args.user, args.project, args.experiment, method_cls.name, timestamp, args.format
+    )
+    header = {"timestamp": timestamp, "user": args.user, "project": args.project}
+
+    print(f"[RUN] {method_cls.name} on {resource or 'no device (DEBUGGING)'} -> {filepath}")
+    print(f"[RUN] Parameters: {params}")
+    try:
+        run, stats = run_method(method_cls, params, resource, filepath, header,
+                                args.format, progress=not args.quiet)
+    finally:
+        if resource is not None:
+            SESSIONS.close(resource)  # CELL 0 + close
+
+    if args.out is None:
+        try:
+            Catalog(args.root).index_file(filepath)
+        except Exception as e:
+            print(f"[CATALOG] {e}")
+
+    print(f"[STATS] {stats['points']} points in {stats['run_s']:.3f} s "
+          f"({stats['points_per_s']:.1f} pts/s), setup {stats['setup_s'] * 1000:.0f} ms, "
+          f"final flush {stats['flush_s'] * 1000:.0f} ms, {stats['file_bytes']} bytes")
+    if stats["timing"]:
+        print(f"[TIMING] {stats['timing']}")
+    if stats["parse_errors"]:
+        print(f"[WARN] {stats['parse_errors']} unparsable replies")
+    if args.stats:
+        with open(args.stats, "w") as f:
+            json.dump({"method": method_cls.name, "file": filepath, "params": params, **stats},
+                      f, indent=1, default=str)
+
+    if run.error is not None:
+        print(f"[RUN ERROR] {run.error}")
+        return 1
+    if stats.get("write_error"):
+        print(f"[WARN] Writing {filepath} failed: {stats['write_error']}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+# app/run_manager.py
+import threading
+
+from app.config import DEBUGGING
+from app.instruments.sessions import SESSIONS
+from app.lazy import lazy_import
+
+# Only needed by run_many_async
+asyncio = lazy_import("asyncio")
+
+# Key used for runs without a real instrument (DEBUGGING only)
+SIMULATED = "SIMULATED"
+
+
+class Run:
+    """
+    One method executing on one instrument, with its own stop control
+    and worker thread.
+    """
+
+    def __init__(self, resource, method, emit, progress, on_done=None):
+        self.resource = resource
+        self.method = method
+        self.stop_event = threading.Event()
+        self.error = None
+
+        # Set while run_async() is executing on an event loop
+        self._async_active = False
+
+        self._emit = emit
+        self._progress = progress
+        self._on_done = on_done
+
+        self.thread = threading.Thread(
+            target=self._task,
+            name=f"run-{resource}",
+            daemon=True
+        )
+
+    def _task(self):
+        try:
+            self.method.run(self.stop_event, self._emit, self._progress)
+        except Exception as e:
+            self.error = e
+            print(f"[RUN ERROR] {self.resource}: {e}")
+        finally:
+            if self._on_done is not None:
+                self._on_done(self)
+
+    async def run_async(self):
+        """
+        Executes the method's run_async on the running event loop instead
+        of the worker thread.
+        """
+        self._async_active = True
+        try:
+            await self.method.run_async(self.stop_event, self._emit, self._progress)
+        except Exception as e:
+            self.error = e
+            print(f"[RUN ERROR] {self.resource}: {e}")
+        finally:
+            self._async_active = False
+            if self._on_done is not None:
+                self._on_done(self)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def is_alive(self):
+        return self._async_active or self.thread.is_alive()
+
+    def join(self, timeout=None):
+        if self.thread.ident is not None:
+            self.thread.join(timeout)
+
+
+class RunManager:
+    """
+    Keeps at most one active Run per resource (sessions come from the
+    shared SessionManager).
+
+    Every run owns its device and thread, so timing on one instrument
+    never waits on another one.
+    """
+
+    def __init__(self, sessions=SESSIONS):
+        self._sessions = sessions
+        self._lock = threading.Lock()
+        self.runs = {}  # resource name -> Run
+
+    # -------------------------------------------------
+    # Devices
+    # -------------------------------------------------
+    def open_device(self, resource):
+        return self._sessions.open(resource)
+
+    def close_device(self, resource):
+        self._sessions.close(resource)
+
+    # -------------------------------------------------
+    # Runs
+    # -------------------------------------------------
+    def busy(self, resource):
+        run = self.runs.get(resource or SIMULATED)
+        return run is not None and run.is_alive()
+
+    def start(self, resource, method_cls, params, emit, progress, on_done=None):
+        """
+        Starts method_cls on resource in its own thread and returns the Run.
+
+        resource=None runs without an instrument (DEBUGGING only).
+        """
+        resource, method = self._new_method(resource, method_cls, params)
+
+        with self._lock:
+            if self.busy(resource):
+                raise RuntimeError(f"{resource} is already running a method")
+
+            run = Run(resource, method, emit, progress, on_done)
+            self.runs[resource] = run
+            run.start()
+
+        return run
+
+    async def run_many_async(self, jobs):
+        """
+        Runs several methods concurrently as coroutines (their run_async)
+        on the running event loop: one thread for all instruments.
+
+        jobs: (resource, method_cls, params, emit, progress) tuples, one
+        per resource. Returns the Runs once all have ended (see Run.error);
+        stop() / stop_all() work as for threaded runs.
+        """
+        prepared = [
+            (self._new_method(resource, method_cls, params), emit, progress)
+            for resource, method_cls, params, emit, progress in jobs
+        ]
+
+        with self._lock:
+            resources = [resource for (resource, _), _, _ in prepared]
+            for resource in resources:
+                if self.busy(resource) or resources.count(resource) > 1:
+                    raise RuntimeError(f"{resource} is already running a method")
+
+            runs = [Run(resource, method, emit, progress)
+                    for (resource, method), emit, progress in prepared]
+            for run in runs:
+                # Busy from now on, before the loop gets to the coroutine
+                run._async_active = True
+                self.runs[run.resource] = run
+
+        await asyncio.gather(*(run.run_async() for run in runs))
+        return runs
+
+    def _new_method(self, resource, method_cls, params):
+        """
+        method_cls instance on the opened resource, with params set.
+        """
+        if resource is None:
+            if not DEBUGGING:
+                raise RuntimeError("No device given and DEBUGGING is off")
+            resource, device = SIMULATED, None
+        else:
+            device = self.open_device(resource)
+
+        method = method_cls(device)
+        method.set_params(params)
+        return resource, method
+
+    def stop(self, resource):
+        run = self.runs.get(resource or SIMULATED)
+        if run is not None:
+            run.stop()
+
+    def stop_all(self):
+        for run in list(self.runs.values()):
+            run.stop()
+
+    def active_runs(self):
+        return [run for run in self.runs.values() if run.is_alive()]
@@ -0,0 +1,204 @@
+# app/runfile.py
+"""
+Native binary run format (.egr).
+
+    EGGRUN1\\n
+    {"method": ..., "params": {...}, "dtype": [...], ...}   <- one JSON line,
+                                                             space padded
+    records ...                                             <- fixed width
+
+The JSON line is padded so the records start on a 64-byte boundary; the
+records are little-endian NumPy records (header "dtype") appended in
+chunks while the run goes. The record count follows from the file size,
+so a run cut short (crash, power loss) is still readable up to its last
+complete record.
+"""
+import csv
+import json
+import os
+
+from app.data_writer import DataWriter
+from app.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+MAGIC = b"EGGRUN1\n"
+EXTENSION = ".egr"
+FORMAT_VERSION = 1
+ALIGN = 64
+
+
+# -------------------------------------------------
+# Headers
+# -------------------------------------------------
+def run_header(method_cls, params, meta):
+    """
+    Header dict of a run: method, mode, params, record layout plus the
+    meta entries (timestamp, user, project).
+    """
+    dtype = method_cls.record_dtype()
+    header = {
+        "format": FORMAT_VERSION,
+        "method": method_cls.name,
+        "mode": method_cls.mode.value,
+    }
+    header.update(meta)
+    header.update({
+        "params": dict(params),
+        "columns": method_cls.column_labels(),
+        "xfield": method_cls.xfield,
+        "yfield": method_cls.yfield,
+        "dtype": _descr(dtype),
+    })
+    return header
+
+
+def csv_header_rows(header):
+    """The run_method CSV header (metadata, PARAMETERS, DATA, labels)."""
+    rows = [
+        # --- Metadata ---
+        [f"# Method: {header.get('method', '')}"],
+        [f"# Mode: {header.get('mode', '')}"],
+        [f"# Timestamp: {header.get('timestamp', '')}"],
+        [f"# User: {header.get('user', '')}"],
+        [f"# Project: {header.get('project', '')}"],
+    ]
+    if header.get("source"):
+        # Converted file: name of the run it was made from
+        rows.append([f"# Source: {header['source']}"])
+    rows += [
+        ["# ----------------------------------"],
+        ["# PARAMETERS"],
+    ]
+
+    # --- Parameters ---
+    for k, v in header.get("params", {}).items():
+        rows.append([k, v])
+
+    rows.append(["# ----------------------------------"])
+    rows.append(["# DATA"])
+    rows.append(header.get("columns") or [name for name, _ in header["dtype"]])
+    return rows
+
+
+def _descr(dtype):
+    # JSON-friendly [[name, "<f8"], ...], always little-endian
+    return [[name, dtype.fields[name][0].newbyteorder("<").str] for name in dtype.names]
+
+
+def header_dtype(header):
+    return np.dtype([(name, fmt) for name, fmt in header["dtype"]])
+
+
+def _encode_header(header):
+    text = json.dumps(header, ensure_ascii=False, default=str).encode("utf-8")
+    size = len(MAGIC) + len(text) + 1
+    padding = -size % ALIGN
+    return MAGIC + text + b" " * padding + b"\n"
+
+
+# -------------------------------------------------
+# Writing
+# -------------------------------------------------
+class RunFileWriter(DataWriter):
+    """
+    DataWriter that appends binary records instead of CSV text.
+
+    header: run_header() dict; put()/put_many() rows must match its dtype.
+    """
+
+    def __init__(self, filepath, header, **kwargs):
+        self.header = header
+        self.dtype = header_dtype(header)
+        super().__init__(filepath, (), **kwargs)
+
+    def _open(self, header_rows):
+        f = open(self.filepath, "wb")
+        f.write(_encode_header(self.header))
+        f.flush()
+        return f
+
+    def _write_items(self, items):
+        blocks = [
+            np.array([item], dtype=self.dtype) if isinstance(item, tuple)
+            else np.asarray(item, dtype=self.dtype)
+            for item in items
+        ]
+        data = np.concatenate(blocks) if len(blocks) > 1 else blocks[0]
+        if not len(data):
+            return
+
+        self._file.write(data.tobytes())
+        self._sync()
+
+        self.rows_written += len(data)
+
+
+# -------------------------------------------------
+# Reading
+# -------------------------------------------------
+def read_header(filepath):
+    """Returns (header dict, byte offset of the first record)."""
+    with open(filepath, "rb") as f:
+        if f.readline() != MAGIC:
+            raise ValueError(f"{filepath}: not a binary run file")
+        header = json.loads(f.readline())
+        return header, f.tell()
+
+
+def load(filepath, mmap=True):
+    """
+    Returns (header, records). With mmap the records are a read-only
+    np.memmap (nothing is read until used); otherwise an in-memory copy.
+    A trailing partial record is ignored.
+    """
+    header, offset = read_header(filepath)
+    dtype = header_dtype(header)
+
+    with open(filepath, "rb") as f:
+        f.seek(0, 2)
+        count = (f.tell() - offset) // dtype.itemsize
+
+        if count == 0:
+            return header, np.empty(0, dtype=dtype)
+        if not mmap:
+            f.seek(offset)
+            return header, np.fromfile(f, dtype=dtype, count=count)
+
+    return header, np.memmap(filepath, dtype=dtype, mode="r", offset=offset, shape=(count,))
+
+
+# -------------------------------------------------
+# CSV conversion
+# -------------------------------------------------
+def to_csv(filepath, csv_path):
+    """Writes a binary run in the run_method CSV layout."""
+    header, records = load(filepath)
+    header["source"] = os.path.basename(filepath)
+
+    with open(csv_path, "w", newline="") as f:
+        csv.writer(f).writerows(csv_header_rows(header))
+        width = len(records.dtype.names)
+        line = ",".join(["%r"] * width) + "\r\n"
+        for start in range(0, len(records), 100000):
+            rows = records[start:start + 100000].tolist()
+            f.write((line * len(rows)) % tuple(v for row in rows for v in row))
+
+
+def from_csv(csv_path, filepath):
+    """
+    Converts a run_method CSV file (or a legacy label + data file) to a
+    binary run. Columns become f8 fields named after the CSV labels.
+    """
+    from app.data import read_run   # app.data reads .egr files via this module
+
+    run = read_run(csv_path)
+    header = dict(run.header)
+    header.pop("legacy", None)
+    header["format"] = FORMAT_VERSION
+    header["dtype"] = _descr(run.records.dtype)
+    header["source"] = os.path.basename(csv_path)
+
+    with open(filepath, "wb") as f:
+        f.write(_encode_header(header))
+        f.write(run.records.astype(header_dtype(header)).tobytes())
@@ -0,0 +1,175 @@
+# app/runs.py
+"""
+Running a method into a data file, shared by the GUI (app/main.py), the
+headless runner (python -m app.run) and the sequencer (app/sequencer.py).
+"""
+import json
+import os
+import sys
+import time
+
+from app.acquisition import AcquisitionQueue
+from app.config import DATA_FORMAT, DATA_FSYNC
+from app.data_writer import DataWriter
+from app.run_manager import RunManager
+from app.runfile import RunFileWriter, run_header, csv_header_rows, EXTENSION as RUNFILE_EXTENSION
+
+DEFAULT_ROOT = "app/Data"
+
+# Progress line period (s)
+REPORT_INTERVAL = 1.0
+
+
+# -------------------------------------------------
+# Helpers
+# -------------------------------------------------
+def parse_value(text):
+    """Parameter text as typed by the user: int, float or the text itself."""
+    try:
+        return float(text) if "." in text else int(text)
+    except Exception:
+        return text
+
+
+def run_filepath(root, user, project, experiment, method_name, timestamp, data_format=DATA_FORMAT):
+    extension = RUNFILE_EXTENSION if data_format == "egr" else ".csv"
+    filename = f"{experiment}_{method_name}_{timestamp}{extension}"
+    return os.path.join(root, user, project, filename)
+
+
+def open_writer(filepath, header, data_format=DATA_FORMAT, fsync=DATA_FSYNC):
+    if data_format == "egr":
+        return RunFileWriter(filepath, header, fsync=fsync)
+    return DataWriter(filepath, csv_header_rows(header), fsync=fsync)
+
+
+def find_method(methods, name):
+    """Method by display name, class name or plugin file name, case-insensitive."""
+    wanted = name.lower()
+    for method_cls in methods:
+        if method_cls.name.lower() == wanted:
+            return method_cls
+    for method_cls in methods:
+        if wanted in (method_cls.__name__.lower(), method_cls.__module__.lower()):
+            return method_cls
+    return None
+
+
+def method_params(method_cls, params_file=None, overrides=()):
+    params = {key: spec.get("default") for key, spec in method_cls.parameters().items()}
+
+    if params_file:
+        with open(params_file) as f:
+            params.update(json.load(f))
+
+    for item in overrides:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"--param needs name=value, got {item!r}")
+        key = key.strip()
+        if key not in params:
+            print(f"[WARN] {method_cls.name} has no parameter {key!r}")
+        params[key] = parse_value(value.strip())
+
+    return params
+
+
+def changed_params(method_cls, params):
+    """
+    params that differ from method_cls's defaults (what a queue item
+    stores, so later default changes apply to it).
+    """
+    defaults = {key: spec.get("default") for key, spec in method_cls.parameters().items()}
+    return {k: v for k, v in params.items() if k not in defaults or defaults[k] != v}
+
+
+# -------------------------------------------------
+# Run
+# -------------------------------------------------
+def _report(writer, fraction, t0, final=False):
+    elapsed = time.perf_counter() - t0
+    points = writer.rows_written
+    line = f"\r{elapsed:7.1f} s  {points:9d} points  {points / elapsed if elapsed > 0 else 0.0:9.1f} pts/s"
+    if fraction is not None:
+        line += f"  {fraction:6.1%}"
+    sys.stderr.write(line + ("\n" if final else ""))
+    sys.stderr.flush()
+
+
+def run_method(method_cls, params, resource, filepath, header, data_format=DATA_FORMAT,
+               progress=True, manager=None, on_start=None):
+    """
+    Runs method_cls on resource, saving to filepath; blocks until the run
+    ends (Ctrl+C stops it cleanly). manager: RunManager to start it on
+    (default: a new one); on_start(run) is called once it is started.
+    Returns (run, stats).
+    """
+    t0 = time.perf_counter()
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+
+    header = run_header(method_cls, params, header)
+    writer = open_writer(filepath, header, data_format)
+
+    # Straight to the writer: no plot buffer (maxsize=0)
+    acquisition = AcquisitionQueue(
+        writer,
+        method_cls.record_dtype(),
+        method_cls.xfield,
+        method_cls.yfield,
+        maxsize=0,
+        chunk_size=1024,
+    )
+
+    manager = manager or RunManager()
+    try:
+        run = manager.start(resource, method_cls, params, acquisition, acquisition.progress)
+    except Exception:
+        # Nothing was recorded: do not leave a header-only file behind
+        acquisition.close()
+        writer.close()
+        try:
+            os.remove(filepath)
+        except OSError:
+            pass
+        raise
+    if on_start is not None:
+        on_start(run)
+    t_start = time.perf_counter()
+
+    last, fraction = t_start, None
+    try:
+        while run.is_alive():
+            run.join(0.1)
+            if progress and time.perf_counter() - last >= REPORT_INTERVAL:
+                latest = acquisition.drain()[2]
+                fraction = latest if latest is not None else fraction
+                _report(writer, fraction, t_start)
+                last = time.perf_counter()
+    except KeyboardInterrupt:
+        print("\n[RUN] Stop requested", file=sys.stderr)
+        run.stop()
+        run.join()
+
+    t_end = time.perf_counter()
+    acquisition.close()
+    writer.close()
+    t_closed = time.perf_counter()
+
+    if progress:
+        _report(writer, acquisition.drain()[2] or fraction, t_start, final=True)
+
+    run_time = t_end - t_start
+    stats = {
+        "points": writer.rows_written,
+        "setup_s": t_start - t0,
+        "run_s": run_time,
+        "flush_s": t_closed - t_end,
+        "points_per_s": writer.rows_written / run_time if run_time > 0 else 0.0,
+        "file_bytes": os.path.getsize(filepath) if os.path.exists(filepath) else 0,
+        "stopped": run.stop_event.is_set(),
+        "parse_errors": len(run.method.parse_errors),
+        "timing": run.method.timing_stats,
+    }
+    if writer.error:
+        stats["write_error"] = str(writer.error)
+    return run, stats
@@ -0,0 +1,562 @@
+# app/sequencer.py
+"""
+Persistent experiment queue, executed back to back on one instrument.
+
+    python -m app.sequencer list
+    python -m app.sequencer add CV --param cycles=3 --experiment sampleA --rest 60
+    python -m app.sequencer run --resource GPIB0::13::INSTR
+
+The queue lives in <root>/.queue.json and is rewritten on every change,
+so a crashed or closed session resumes where it stopped: items that
+were running are run again (into a new file). The GUI and the command
+line may share it: every change re-reads the file under a lock, and
+only one sequencer at a time runs a queue.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from app.config import DEBUGGING, SIMULATOR
+from app.instruments.sessions import SESSIONS
+from app.methods.loader import discover_methods
+from app.runs import DEFAULT_ROOT, changed_params, find_method, method_params, run_filepath, run_method
+from app.run_manager import RunManager
+
+QUEUE_FILE = ".queue.json"
+QUEUE_VERSION = 1
+
+# Item status
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+STOPPED = "stopped"
+STATUSES = (PENDING, RUNNING, DONE, FAILED, STOPPED)
+
+
+class _FileLock:
+    """
+    Exclusive lock on a file, between processes (flock / msvcrt).
+    Not reentrant; one instance per holder.
+    """
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def acquire(self, blocking=True):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        f = open(self.path, "a+b")
+        while True:
+            try:
+                if os.name == "nt":
+                    import msvcrt
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                else:
+                    import fcntl
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self._file = f
+                return True
+            except OSError:
+                if not blocking:
+                    f.close()
+                    return False
+                time.sleep(self.POLL_INTERVAL)
+
+    def release(self):
+        f, self._file = self._file, None
+        if f is None:
+            return
+        try:
+            if os.name == "nt":
+                import msvcrt
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        finally:
+            f.close()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class ExperimentQueue:
+    """
+    Ordered list of experiments, persisted as JSON after every change.
+
+    Item: {"id", "method", "params", "user", "project", "experiment",
+    "path" (explicit data file or None), "rest_s" (pause after it, None =
+    queue default), "status", "error", "output", "points", "attempts",
+    "started", "finished"}.
+
+    Thread-safe: the GUI edits the queue while the Sequencer runs it.
+    Process-safe: every change re-reads the file and writes it back
+    under <path>.lock, and reads pick up changes made by other processes
+    (e.g. python -m app.sequencer add while the GUI runs the queue).
+    """
+
+    def __init__(self, root=DEFAULT_ROOT, path=None):
+        self.root = root
+        self.path = path or os.path.join(root, QUEUE_FILE)
+        self._lock = threading.RLock()
+        self._file_lock = _FileLock(self.path + ".lock")
+        self._depth = 0         # nesting of _change()
+        self._stamp = None      # (mtime_ns, size) of the file last read / written
+        self.rest_s = 0.0
+        self.items = []
+        self._next_id = 1
+        self.load()
+
+    # -------------------------------------------------
+    # Persistence
+    # -------------------------------------------------
+    def load(self):
+        try:
+            with open(self.path) as f:
+                st = os.fstat(f.fileno())
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"[QUEUE] Cannot read {self.path}: {e}")
+            return
+        if data.get("version") != QUEUE_VERSION:
+            print(f"[QUEUE] Ignoring {self.path}: unknown version {data.get('version')!r}")
+            return
+
+        with self._lock:
+            self.rest_s = data.get("rest_s", 0.0)
+            self.items = data.get("items", [])
+            self._next_id = max((item["id"] for item in self.items), default=0) + 1
+            self._stamp = (st.st_mtime_ns, st.st_size)
+
+    def save(self):
+        with self._change():
+            pass
+
+    def _write(self):
+        data = {"version": QUEUE_VERSION, "rest_s": self.rest_s, "items": self.items}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(data, f, indent=1, default=str)
+        os.replace(self.path + ".tmp", self.path)
+        st = os.stat(self.path)
+        self._stamp = (st.st_mtime_ns, st.st_size)
+
+    @contextmanager
+    def _change(self, write=True):
+        """
+        Read-modify-write: holds the file lock, re-reads the file on
+        entry and writes it on exit (outermost level only).
+        """
+        with self._lock:
+            if self._depth == 0:
+                self._file_lock.acquire()
+                try:
+                    self.load()
+                except BaseException:
+                    self._file_lock.release()
+                    raise
+            self._depth += 1
+            try:
+                yield
+                if self._depth == 1 and write:
+                    self._write()
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._file_lock.release()
+
+    def _sync(self):
+        """Re-reads the file if another process changed it."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return
+        if (st.st_mtime_ns, st.st_size) != self._stamp:
+            with self._change(write=False):
+                pass
+
+    def recover(self):
+        """
+        Items left running by a crashed session go back to pending.
+        Only call it while holding the queue's run lock (see Sequencer).
+        """
+        with self._change():
+            recovered = [item for item in self.items if item["status"] == RUNNING]
+            for item in recovered:
+                item["status"] = PENDING
+                item["error"] = "interrupted (resumed)"
+            return recovered
+
+    # -------------------------------------------------
+    # Editing
+    # -------------------------------------------------
+    def add(self, method, params, user="default", project="default", experiment="experiment",
+            path=None, rest_s=None):
+        with self._change():
+            item = {
+                "id": self._next_id,
+                "method": method,
+                "params": dict(params),
+                "user": user,
+                "project": project,
+                "experiment": experiment,
+                "path": path,
+                "rest_s": rest_s,
+                "status": PENDING,
+                "error": None,
+                "output": None,
+                "points": None,
+                "attempts": 0,
+                "started": None,
+                "finished": None,
+            }
+            self._next_id += 1
+            self.items.append(item)
+            return dict(item)
+
+    def get(self, item_id):
+        self._sync()
+        with self._lock:
+            item = self._find(item_id)
+            return dict(item) if item is not None else None
+
+    def _find(self, item_id):
+        return next((item for item in self.items if item["id"] == item_id), None)
+
+    def remove(self, item_id):
+        with self._change():
+            item = self._find(item_id)
+            if item is None or item["status"] == RUNNING:
+                return False
+            self.items.remove(item)
+            return True
+
+    def move(self, item_id, offset):
+        """Moves an item up (offset < 0) or down the queue."""
+        with self._change():
+            item = self._find(item_id)
+            if item is None:
+                return False
+            i = self.items.index(item)
+            j = min(max(i + offset, 0), len(self.items) - 1)
+            self.items.insert(j, self.items.pop(i))
+            return True
+
+    def reset(self, item_id):
+        """Queues a finished / failed / stopped item again."""
+        return self.update(item_id, status=PENDING, error=None, allow_running=False)
+
+    def update(self, item_id, allow_running=True, **fields):
+        with self._change():
+            item = self._find(item_id)
+            if item is None or (item["status"] == RUNNING and not allow_running):
+                return False
+            item.update(fields)
+            return True
+
+    def clear_finished(self):
+        with self._change():
+            self.items = [item for item in self.items if item["status"] in (PENDING, RUNNING)]
+
+    def set_rest(self, rest_s):
+        with self._change():
+            self.rest_s = float(rest_s)
+
+    # -------------------------------------------------
+    # Reading
+    # -------------------------------------------------
+    def snapshot(self):
+        self._sync()
+        with self._lock:
+            return [dict(item) for item in self.items]
+
+    def next_pending(self):
+        self._sync()
+        with self._lock:
+            item = next((item for item in self.items if item["status"] == PENDING), None)
+            return dict(item) if item is not None else None
+
+    def counts(self):
+        self._sync()
+        with self._lock:
+            counts = dict.fromkeys(STATUSES, 0)
+            for item in self.items:
+                counts[item["status"]] += 1
+            return counts
+
+
+class Sequencer:
+    """
+    Runs the queue's pending items one after the other on resource, in
+    its own thread, resting rest_s (item's, else the queue's) between
+    items. Nothing here touches the GUI: on_update(item) is called from
+    the sequencer thread whenever an item changes state (item=None when
+    the sequencer stops).
+    """
+
+    def __init__(self, queue, resource, methods=None, manager=None, on_update=None,
+                 catalog=None):
+        self.queue = queue
+        self.resource = resource
+        self.methods = methods
+        self.manager = manager
+        self.on_update = on_update
+        self.catalog = catalog
+
+        self.current = None
+        self.error = None
+        self._running = False
+        self._stop = threading.Event()
+        self._thread = None
+        # Held while running: one sequencer per queue, across processes
+        self._run_lock = _FileLock(queue.path + ".run.lock")
+
+    def start(self):
+        if self.running():
+            return
+        self._stop.clear()
+        self.error = None
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name=f"sequencer-{self.resource}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the running item and the queue (the rest stays pending)."""
+        self._stop.set()
+        if self.manager is not None and self.current is not None:
+            self.manager.stop(self.resource)
+
+    def running(self):
+        return self._running
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _notify(self, item):
+        if self.on_update is not None:
+            try:
+                self.on_update(item)
+            except Exception as e:
+                print(f"[SEQUENCER] Update callback failed: {e}")
+
+    def _loop(self):
+        if not self._run_lock.acquire(blocking=False):
+            self.error = "the queue is already being run by another process"
+            print(f"[SEQUENCER] Not starting: {self.error}")
+            self._running = False
+            self._notify(None)
+            return
+
+        try:
+            if self.manager is None:
+                self.manager = RunManager()
+            if self.methods is None:
+                self.methods = discover_methods()
+
+            for item in self.queue.recover():
+                print(f"[SEQUENCER] Resuming interrupted item #{item['id']} ({item['method']})")
+
+            while not self._stop.is_set():
+                item = self.queue.next_pending()
+                if item is None:
+                    break
+                self._run_item(item)
+
+                rest = item["rest_s"] if item["rest_s"] is not None else self.queue.rest_s
+                if rest and self.queue.next_pending() is not None:
+                    print(f"[SEQUENCER] Resting {rest:g} s")
+                    self._stop.wait(rest)
+        finally:
+            self._run_lock.release()
+            self.current = None
+            self._running = False
+            self._notify(None)
+
+    def _output_path(self, item):
+        path = item["path"]
+        if not path:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = run_filepath(self.queue.root, item["user"], item["project"],
+                                item["experiment"], item["method"], timestamp)
+
+        # Never overwrite: a retried item keeps its partial file, and short
+        # items can finish within the timestamp's second
+        base, ext = os.path.splitext(path)
+        n = 1
+        while os.path.exists(path):
+            path = f"{base}_{n}{ext}"
+            n += 1
+        return path
+
+    def _run_item(self, item):
+        item_id = item["id"]
+        method_cls = find_method(self.methods, item["method"])
+        if method_cls is None:
+            self.queue.update(item_id, status=FAILED, error=f"unknown method {item['method']!r}")
+            self._notify(self.queue.get(item_id))
+            return
+
+        params = {key: spec.get("default") for key, spec in method_cls.parameters().items()}
+        params.update(item["params"])
+
+        if self._stop.is_set():
+            return
+        filepath = self._output_path(item)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        header = {"timestamp": timestamp, "user": item["user"], "project": item["project"],
+                  "queue_item": item_id}
+
+        # Removed or edited by another process since next_pending()
+        if not self.queue.update(item_id, allow_running=False, status=RUNNING, error=None,
+                                 output=filepath, attempts=item["attempts"] + 1,
+                                 started=datetime.now().isoformat(timespec="seconds"), finished=None):
+            return
+        self.current = item_id
+        self._notify(self.queue.get(item_id))
+        print(f"[SEQUENCER] #{item_id} {method_cls.name} -> {filepath}")
+
+        def on_start(run):
+            # A Stop between current being set and the run being
+            # registered found nothing to stop
+            if self._stop.is_set():
+                run.stop()
+
+        error = None
+        points = None
+        try:
+            run, stats = run_method(method_cls, params, self.resource, filepath, header,
+                                    progress=False, manager=self.manager, on_start=on_start)
+            points = stats["points"]
+            error = run.error or stats.get("write_error")
+            status = FAILED if error else STOPPED if stats["stopped"] else DONE
+        except Exception as e:
+            error, status = e, FAILED
+
+        self.current = None
+        self.queue.update(item_id, status=status, error=str(error) if error else None, points=points,
+                          finished=datetime.now().isoformat(timespec="seconds"))
+        self._notify(self.queue.get(item_id))
+
+        if self.catalog is not None and os.path.exists(filepath):
+            try:
+                self.catalog.index_file(filepath)
+            except Exception as e:
+                print(f"[CATALOG] {e}")
+
+
+# -------------------------------------------------
+# Command line
+# -------------------------------------------------
+def _print_queue(queue):
+    print(f"Queue {queue.path} (rest {queue.rest_s:g} s between items)")
+    for item in queue.snapshot():
+        rest = "" if item["rest_s"] is None else f", rest {item['rest_s']:g} s"
+        line = f"  #{item['id']:<4} {item['status']:8} {item['method']}  {item['experiment']}  {item['params']}{rest}"
+        if item["error"]:
+            line += f"  [{item['error']}]"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.sequencer", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--root", default=DEFAULT_ROOT, help="data store (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list")
+
+    add = commands.add_parser("add")
+    add.add_argument("method")
+    add.add_argument("--params", help="JSON file with parameter values")
+    add.add_argument("--param", action="append", default=[], metavar="NAME=VALUE")
+    add.add_argument("--user", default="default")
+    add.add_argument("--project", default="default")
+    add.add_argument("--experiment", default="experiment")
+    add.add_argument("--out", help="data file (default: in the data store)")
+    add.add_argument("--rest", type=float, help="rest after this item (s)")
+
+    for name in ("remove", "reset"):
+        commands.add_parser(name).add_argument("id", type=int)
+
+    commands.add_parser("clear", help="remove finished items")
+    commands.add_parser("rest").add_argument("seconds", type=float)
+
+    run = commands.add_parser("run")
+    run.add_argument("--resource", help="VISA resource name")
+    run.add_argument("--simulate", action="store_true", help="run on the simulated 273A")
+
+    args = parser.parse_args(argv)
+    queue = ExperimentQueue(args.root)
+
+    if args.command == "add":
+        methods = discover_methods()
+        method_cls = find_method(methods, args.method)
+        if method_cls is None:
+            parser.error(f"unknown method {args.method!r}; available: {', '.join(m.name for m in methods)}")
+        try:
+            params = method_params(method_cls, args.params, args.param)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+        item = queue.add(method_cls.name, changed_params(method_cls, params), args.user, args.project,
+                         args.experiment, args.out, args.rest)
+        print(f"Added #{item['id']}")
+    elif args.command == "remove":
+        if not queue.remove(args.id):
+            print(f"[WARN] #{args.id} not found or running")
+    elif args.command == "reset":
+        if not queue.reset(args.id):
+            print(f"[WARN] #{args.id} not found or running")
+    elif args.command == "clear":
+        queue.clear_finished()
+    elif args.command == "rest":
+        queue.set_rest(args.seconds)
+    elif args.command == "run":
+        resource = args.resource
+        if args.simulate:
+            resource = resource or SIMULATOR["resource"]
+        elif resource is None and not DEBUGGING:
+            parser.error("--resource is required (or --simulate)")
+
+        from app.catalog import Catalog
+        sequencer = Sequencer(queue, resource, catalog=Catalog(args.root))
+        sequencer.start()
+        try:
+            while sequencer.running():
+                sequencer.join(0.5)
+        except KeyboardInterrupt:
+            print("\n[SEQUENCER] Stop requested")
+            sequencer.stop()
+            sequencer.join()
+        finally:
+            if resource is not None:
+                SESSIONS.close(resource)  # CELL 0 + close
+
+        if sequencer.error:
+            print(f"[ERROR] {sequencer.error}")
+            return 1
+        counts = queue.counts()
+        print(f"[SEQUENCER] {counts[DONE]} done, {counts[FAILED]} failed, "
+              f"{counts[STOPPED]} stopped, {counts[PENDING]} pending")
+
+    _print_queue(queue)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+# app/startup.py
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class TaskGraph:
+    """
+    Runs named tasks on a thread pool, each as soon as the tasks it
+    depends on have finished. A task is called with its dependencies'
+    results as positional arguments.
+
+    A failing task records its exception in .errors; tasks depending on
+    it are not run and get an error too. .timings holds each task's own
+    run time (s) plus "total".
+    """
+
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+        self.tasks = {}
+        self.results = {}
+        self.errors = {}
+        self.timings = {}
+
+    def add(self, name, fn, deps=()):
+        self.tasks[name] = (fn, tuple(deps))
+
+    def run(self, on_task_done=None):
+        """
+        Runs every task; blocks until all are done and returns .results.
+
+        on_task_done(name, finished, total) is called from the calling
+        thread after each task (also for failed / skipped ones).
+        """
+        for name, (_, deps) in self.tasks.items():
+            unknown = [d for d in deps if d not in self.tasks]
+            if unknown:
+                raise ValueError(f"Task {name!r} depends on unknown {unknown}")
+
+        pending = dict(self.tasks)
+        running = {}
+        total = len(self.tasks)
+        finished = 0
+        t0 = time.perf_counter()
+
+        def _finished(name):
+            nonlocal finished
+            finished += 1
+            if on_task_done is not None:
+                on_task_done(name, finished, total)
+
+        with ThreadPoolExecutor(self.max_workers, thread_name_prefix="startup") as pool:
+            while pending or running:
+                for name, (fn, deps) in list(pending.items()):
+                    failed = [d for d in deps if d in self.errors]
+                    if failed:
+                        del pending[name]
+                        self.errors[name] = RuntimeError(f"dependency {failed[0]!r} failed")
+                        _finished(name)
+                    elif all(d in self.results for d in deps):
+                        del pending[name]
+                        args = [self.results[d] for d in deps]
+                        running[pool.submit(_timed, fn, args)] = name
+
+                if not running:
+                    if pending:
+                        raise ValueError(f"Dependency cycle among {sorted(pending)}")
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.results[name], self.timings[name] = future.result()
+                    except _TaskError as e:
+                        self.errors[name], self.timings[name] = e.error, e.elapsed
+                    _finished(name)
+
+        self.timings["total"] = time.perf_counter() - t0
+        return self.results
+
+    def report(self):
+        """One line per task: run time, and the error if it failed."""
+        lines = []
+        for name in self.tasks:
+            elapsed = self.timings.get(name)
+            line = f"{name:12s} {elapsed * 1000:8.1f} ms" if elapsed is not None else f"{name:12s} {'skipped':>8s}   "
+            if name in self.errors:
+                line += f"  FAILED: {self.errors[name]}"
+            lines.append(line)
+        lines.append(f"{'total':12s} {self.timings.get('total', 0.0) * 1000:8.1f} ms")
+        return lines
+
+
+class _TaskError(Exception):
+    def __init__(self, error, elapsed):
+        super().__init__(str(error))
+        self.error = error
+        self.elapsed = elapsed
+
+
+def _timed(fn, args):
+    t0 = time.perf_counter()
+    try:
+        result = fn(*args)
+    except Exception as e:
+        raise _TaskError(e, time.perf_counter() - t0)
+    return result, time.perf_counter() - t0
@@ -0,0 +1,110 @@
+# app/test_acquisition.py
+"""
+Run thread -> writer / GUI hand-off (app/acquisition.py).
+
+    python -m pytest app/test_acquisition.py
+"""
+import unittest
+
+import numpy as np
+
+from app.acquisition import AcquisitionQueue
+
+DTYPE = np.dtype([("E", "f8"), ("I", "f8"), ("cycle", "i4")])
+
+
+class FakeWriter:
+    def __init__(self):
+        self.blocks = []
+
+    def put_many(self, records):
+        self.blocks.append(records)
+
+    def rows(self):
+        return [row for block in self.blocks for row in block.tolist()]
+
+
+def _records(start, stop):
+    records = np.zeros(stop - start, dtype=DTYPE)
+    records["E"] = np.arange(start, stop)
+    records["I"] = -records["E"]
+    return records
+
+
+class AcquisitionQueueTest(unittest.TestCase):
+
+    def _queue(self, **kwargs):
+        writer = FakeWriter()
+        kwargs = {"xfield": "E", "yfield": "I", "chunk_interval": 60, **kwargs}
+        return AcquisitionQueue(writer, DTYPE, **kwargs), writer
+
+    def test_chunks(self):
+        acquisition, writer = self._queue(chunk_size=3)
+        acquisition(0.0, -0.0)                        # emit(x, y)
+        acquisition.emit_record(E=1.0, I=-1.0, cycle=1)
+        self.assertEqual(writer.blocks, [])
+
+        acquisition.emit_many(_records(2, 4))
+        # One structured block, in emit order; fields not given are 0
+        self.assertEqual(len(writer.blocks), 1)
+        self.assertEqual(writer.blocks[0].dtype, DTYPE)
+        self.assertEqual(writer.rows(), [(0.0, -0.0, 0), (1.0, -1.0, 1), (2.0, -2.0, 0), (3.0, -3.0, 0)])
+
+        acquisition.emit_record(E=4.0, I=-4.0)
+        acquisition.close()
+        self.assertEqual(len(writer.blocks), 2)
+        self.assertEqual(writer.rows()[-1], (4.0, -4.0, 0))
+
+        # Nothing left: close does not send an empty block
+        acquisition.close()
+        self.assertEqual(len(writer.blocks), 2)
+
+    def test_chunk_interval(self):
+        acquisition, writer = self._queue(chunk_size=1000, chunk_interval=0.0)
+        acquisition(1.0, 2.0)
+        self.assertEqual(writer.rows(), [(1.0, 2.0, 0)])
+
+    def test_plot_buffer_trimmed(self):
+        acquisition, writer = self._queue(maxsize=5, chunk_size=1000)
+        for i in range(4):
+            acquisition(float(i), -float(i))
+        acquisition.emit_many(_records(4, 8))
+
+        xs, ys, _ = acquisition.drain()
+        self.assertEqual(xs.tolist(), [3.0, 4.0, 5.0, 6.0, 7.0])
+        self.assertEqual(ys.tolist(), [-3.0, -4.0, -5.0, -6.0, -7.0])
+        self.assertEqual(acquisition.dropped, 3)
+
+        # The file still gets every point
+        acquisition.close()
+        self.assertEqual([row[0] for row in writer.rows()], list(map(float, range(8))))
+
+    def test_headless(self):
+        acquisition, writer = self._queue(maxsize=0, chunk_size=2)
+        acquisition.emit_many(_records(0, 3))
+        xs, ys, _ = acquisition.drain()
+        self.assertEqual(len(xs), 0)
+        self.assertEqual(len(writer.rows()), 3)
+
+    def test_drain_and_finished(self):
+        acquisition, _ = self._queue()
+        acquisition(1.0, 2.0)
+        acquisition.progress(0.25)
+        acquisition.progress(0.5)
+        self.assertFalse(acquisition.finished())
+
+        xs, ys, progress = acquisition.drain()
+        self.assertEqual((xs.tolist(), ys.tolist(), progress), ([1.0], [2.0], 0.5))
+        # Progress is reported once
+        self.assertIsNone(acquisition.drain()[2])
+        self.assertFalse(acquisition.finished())    # run still going
+
+        acquisition(3.0, 4.0)
+        acquisition.close()
+        self.assertFalse(acquisition.finished())    # not drained yet
+        self.assertEqual(acquisition.drain()[0].tolist(), [3.0])
+        self.assertTrue(acquisition.finished())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,223 @@
+# app/test_async.py
+"""
+asyncio driver (AsyncEGG273A) and DummyMethod.run_async against a
+scripted 100 kOhm cell; RunManager.run_many_async on the simulator.
+
+    python -m pytest app/test_async.py
+"""
+import asyncio
+import threading
+import time
+import unittest
+
+from app.instruments.AsyncEGG273A import AsyncEGG273A
+from app.instruments.sessions import SessionManager
+from app.methods.base import ControlMode, MethodBase
+from app.methods.BuiltIn.dummy import DummyMethod
+from app.run_manager import RunManager
+
+FAST = {"points": 5, "delay": 0.001, "setpoint": 0.1}
+
+
+class Cell:
+    """
+    Bus stand-in with a resistor on the cell: SETE <mV> sets the
+    potential, READI queues the current as "mantissa,exponent" (nA).
+    Every write and read is logged and takes `latency` seconds.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.E = 0.0
+        self.pending = []
+        self.log = []
+
+    def write(self, message):
+        time.sleep(self.latency)
+        self.log.append(("write", message))
+        for command in message.split(";"):
+            name, _, arg = command.partition(" ")
+            if name == "SETE":
+                self.E = float(arg)
+            elif name == "READI":
+                self.pending.append(f"{self.E * 10:g},-9")
+
+    def write_raw(self, message):
+        self.write(message.decode("ascii").rstrip("\r"))
+
+    def read(self):
+        time.sleep(self.latency)
+        reply = self.pending.pop(0)
+        self.log.append(("read", reply))
+        return reply + "\r"
+
+    def read_raw(self):
+        return self.read().encode("ascii")
+
+    def writes(self):
+        return [entry for kind, entry in self.log if kind == "write"]
+
+    def reads(self):
+        return [entry for kind, entry in self.log if kind == "read"]
+
+
+def _instrument(mode=ControlMode.POTENTIOSTAT, latency=0.0):
+    device = Cell(latency)
+    instrument = AsyncEGG273A(device)
+    asyncio.run(instrument.set_mode(mode))
+    device.log.clear()
+    return instrument, device
+
+
+class Failing(MethodBase):
+    name = "Failing"
+
+    @classmethod
+    def parameters(cls):
+        return {}
+
+    def run(self, stop_event, emit, progress):
+        raise RuntimeError("overload")
+
+
+class AsyncEGG273ATest(unittest.TestCase):
+
+    def test_set_mode_same_writes_as_sync(self):
+        device = Cell()
+        asyncio.run(AsyncEGG273A(device).set_mode(ControlMode.POTENTIOSTAT))
+        self.assertEqual(device.writes(), ["MODE 2", "CELL 1"])
+
+    def test_step_and_read(self):
+        instrument, device = _instrument()
+        self.assertAlmostEqual(asyncio.run(instrument.step_and_read(300)), 3e-6)
+        self.assertEqual(device.writes(), ["SETE 300;READI"])
+        self.assertEqual(len(device.reads()), 1)
+
+    def test_encoded_commands(self):
+        instrument, device = _instrument()
+        commands = instrument.encode_setpoints([100, 200], read=True)
+
+        async def main():
+            await instrument.set_value_encoded(instrument.encode_setpoints([50])[0])
+            return [await instrument.step_and_read_encoded(command) for command in commands]
+
+        currents = asyncio.run(main())
+        self.assertAlmostEqual(currents[0], 1e-6)
+        self.assertAlmostEqual(currents[1], 2e-6)
+        self.assertEqual(device.writes(), ["SETE 50", "SETE 100;READI", "SETE 200;READI"])
+
+    def test_lock_serializes_round_trips(self):
+        # Bus latency gives the worker threads a chance to interleave
+        instrument, device = _instrument(latency=0.002)
+
+        async def main():
+            return await asyncio.gather(*(instrument.step_and_read(E) for E in range(100, 600, 100)))
+
+        currents = asyncio.run(main())
+        # Every caller gets its own reply ...
+        for E, current in zip(range(100, 600, 100), currents):
+            self.assertAlmostEqual(current, E * 1e-8)
+        # ... because each write is read back before the next one
+        self.assertEqual([kind for kind, _ in device.log], ["write", "read"] * 5)
+
+
+class DummyRunAsyncTest(unittest.TestCase):
+
+    def _method(self, device, **params):
+        method = DummyMethod(device)
+        method.set_params({**FAST, **params})
+        return method
+
+    def test_two_methods_one_loop(self):
+        a, b = [], []
+
+        async def main():
+            await asyncio.gather(
+                self._method(Cell(0.001)).run_async(threading.Event(), lambda x, y: a.append(x), lambda f: None),
+                self._method(Cell(0.001)).run_async(threading.Event(), lambda x, y: b.append(x), lambda f: None),
+            )
+
+        asyncio.run(main())
+        self.assertEqual(a, [0, 1, 2, 3, 4])
+        self.assertEqual(b, [0, 1, 2, 3, 4])
+
+    def test_stop(self):
+        stop = threading.Event()
+        points, fractions = [], []
+
+        def emit(x, y):
+            points.append(x)
+            if x == 1:
+                stop.set()
+
+        device = Cell()
+        asyncio.run(self._method(device, points=1000).run_async(stop, emit, fractions.append))
+        self.assertEqual(points, [0, 1])
+        self.assertEqual(fractions, [0.001, 0.002])
+        self.assertEqual(device.writes()[:3], ["MODE 2", "CELL 1", "SETE 0.1"])
+
+
+class RunManyAsyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sessions = SessionManager()
+        self.manager = RunManager(self.sessions)
+
+    def tearDown(self):
+        self.sessions.close_all()
+
+    def _job(self, resource, method_cls=DummyMethod, params=FAST, points=None):
+        points = [] if points is None else points
+        return (resource, method_cls, params, lambda x, y: points.append((x, y)), lambda fraction: None)
+
+    def test_two_instruments_one_loop(self):
+        a, b = [], []
+        busy = []
+
+        def progress(fraction):
+            # A runs for as long as B does: both on the loop at once
+            busy.append(self.manager.busy("SIM::A::INSTR") and self.manager.busy("SIM::B::INSTR"))
+            if fraction == 1:
+                self.manager.stop("SIM::A::INSTR")
+
+        jobs = [
+            self._job("SIM::A::INSTR", params={**FAST, "points": 100000}, points=a),
+            ("SIM::B::INSTR", DummyMethod, FAST, lambda x, y: b.append((x, y)), progress),
+        ]
+        runs = asyncio.run(self.manager.run_many_async(jobs))
+
+        self.assertEqual([run.error for run in runs], [None, None])
+        self.assertGreater(len(a), 0)
+        self.assertEqual([x for x, _ in b], [0, 1, 2, 3, 4])
+        self.assertEqual(busy, [True] * 5)
+        self.assertTrue(runs[0].stop_event.is_set())
+        self.assertEqual(self.manager.active_runs(), [])
+
+    def test_errors_and_stop(self):
+        points = []
+
+        def emit(x, y):
+            points.append(x)
+            if x == 1:
+                self.manager.stop("SIM::B::INSTR")
+
+        jobs = [
+            self._job("SIM::A::INSTR", Failing, {}),
+            ("SIM::B::INSTR", DummyMethod, {**FAST, "points": 1000}, emit, lambda fraction: None),
+        ]
+        failed, stopped = asyncio.run(self.manager.run_many_async(jobs))
+
+        self.assertIsInstance(failed.error, RuntimeError)
+        self.assertIsNone(stopped.error)
+        self.assertTrue(stopped.stop_event.is_set())
+        self.assertEqual(points, [0, 1])
+
+    def test_busy_resource(self):
+        jobs = [self._job("SIM::A::INSTR"), self._job("SIM::A::INSTR")]
+        with self.assertRaisesRegex(RuntimeError, "already running"):
+            asyncio.run(self.manager.run_many_async(jobs))
+        self.assertEqual(self.manager.runs, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+# app/test_base.py
+"""
+Method base class helpers: DeadlineTimer, records and emit paths
+(app/methods/base.py).
+
+    python -m pytest app/test_base.py
+"""
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from app.acquisition import AcquisitionQueue
+from app.methods.base import DeadlineTimer, MethodBase
+
+
+class FakeClock:
+    """perf_counter / sleep stand-in: time moves only when told to."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class Sweep(MethodBase):
+    name = "Sweep"
+    xlabel = "Potential (mV)"
+    ylabel = "Current (A)"
+    record_fields = (("t", "f8"), ("E", "f8"), ("I", "f8"), ("cycle", "i4"))
+    xfield = "E"
+    yfield = "I"
+
+    @classmethod
+    def parameters(cls):
+        return {}
+
+    def run(self, stop_event, emit, progress):
+        pass
+
+
+class DeadlineTimerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch("app.methods.base.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_on_time(self):
+        timer = DeadlineTimer(0.1)
+        timer.start()
+        for _ in range(3):
+            timer.wait()
+            self.clock.now += 0.02     # I/O
+
+        self.assertEqual(len(self.clock.sleeps), 2)
+        self.assertAlmostEqual(self.clock.sleeps[0], 0.08)
+        stats = timer.stats()
+        self.assertEqual(stats["points"], 3)
+        self.assertEqual(stats["overruns"], 0)
+        self.assertAlmostEqual(stats["mean_interval"], 0.1)
+        self.assertAlmostEqual(stats["jitter"], 0.0)
+
+    def test_overrun(self):
+        timer = DeadlineTimer(0.1)
+        timer.start()
+        for io in (0.0, 0.25, 0.0, 0.0, 0.0):
+            timer.wait()
+            self.clock.now += io
+
+        # Point 1 hangs for 0.25 s: point 2 (due 0.2) starts at 0.35,
+        # point 3 (due 0.3) right after it, point 4 on time again
+        for got, want in zip(timer.lateness, (0.0, 0.0, 0.15, 0.05, 0.0)):
+            self.assertAlmostEqual(got, want)
+
+        stats = timer.stats()
+        self.assertEqual(stats["points"], 5)
+        self.assertEqual(stats["overruns"], 1)
+        self.assertAlmostEqual(stats["mean_lateness"], 0.04)
+        self.assertAlmostEqual(stats["max_lateness"], 0.15)
+        self.assertAlmostEqual(stats["jitter"], (0.017 / 5) ** 0.5)
+        self.assertAlmostEqual(stats["mean_interval"], 0.1)
+
+    def test_no_catch_up_sleep(self):
+        timer = DeadlineTimer(0.1)
+        timer.start()
+        timer.wait()
+        self.clock.now += 0.35          # stall of 3.5 dt
+
+        # Late points are taken at once, none skipped, the grid not shifted
+        for _ in range(3):
+            timer.wait()
+        self.assertEqual(self.clock.sleeps, [])
+        self.assertEqual(timer.index, 4)
+        for got, want in zip(timer.lateness, (0.0, 0.25, 0.15, 0.05)):
+            self.assertAlmostEqual(got, want)
+
+        stats = timer.stats()
+        self.assertEqual(stats["overruns"], 2)     # more than one dt late
+        self.assertAlmostEqual(stats["mean_lateness"], 0.1125)
+        self.assertAlmostEqual(stats["max_lateness"], 0.25)
+
+        # Back on the original schedule
+        timer.wait()
+        self.assertAlmostEqual(self.clock.sleeps[0], 0.05)
+        self.assertAlmostEqual(timer.timestamps[-1], 0.4)
+
+    def test_empty(self):
+        self.assertEqual(DeadlineTimer(0.1).stats(), {"points": 0})
+
+
+class RecordsTest(unittest.TestCase):
+
+    def test_dtype_and_labels(self):
+        self.assertEqual(Sweep.record_dtype(), np.dtype([("t", "f8"), ("E", "f8"), ("I", "f8"), ("cycle", "i4")]))
+        self.assertEqual(Sweep.column_labels(), ["t", "Potential (mV)", "Current (A)", "cycle"])
+
+        # Defaults: plain (x, y)
+        self.assertEqual(MethodBase.record_dtype().names, ("x", "y"))
+        self.assertEqual(MethodBase.column_labels(), ["X", "Y"])
+
+    def test_plain_emit_gets_plotted_pair(self):
+        points = []
+        method = Sweep(None)
+        method.emit_record(lambda x, y: points.append((x, y)), t=0.5, E=100.0, I=1e-6, cycle=2)
+
+        records = np.zeros(3, dtype=Sweep.record_dtype())
+        records["E"] = [1.0, 2.0, 3.0]
+        records["I"] = [-1.0, -2.0, -3.0]
+        method.emit_many(lambda x, y: points.append((x, y)), records)
+
+        self.assertEqual(points, [(100.0, 1e-6), (1.0, -1.0), (2.0, -2.0), (3.0, -3.0)])
+        # Python numbers, as from a hand-written emit
+        self.assertIs(type(points[1][0]), float)
+
+    def test_record_sink_gets_every_field(self):
+        class Writer:
+            def __init__(self):
+                self.blocks = []
+
+            def put_many(self, records):
+                self.blocks.append(records)
+
+        writer = Writer()
+        acquisition = AcquisitionQueue(writer, Sweep.record_dtype(), "E", "I", chunk_size=1000)
+        method = Sweep(None)
+        method.emit_record(acquisition, t=0.5, E=100.0, I=1e-6, cycle=2)
+        records = np.zeros(2, dtype=Sweep.record_dtype())
+        records["E"] = [1.0, 2.0]
+        method.emit_many(acquisition, records)
+        acquisition.close()
+
+        self.assertEqual(writer.blocks[0].tolist(), [(0.5, 100.0, 1e-6, 2), (0.0, 1.0, 0.0, 0), (0.0, 2.0, 0.0, 0)])
+        self.assertEqual(acquisition.drain()[0].tolist(), [100.0, 1.0, 2.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+# app/test_bulk.py
+"""
+Bulk conversion / summary of a data tree (app/bulk.py).
+
+    python -m pytest app/test_bulk.py
+"""
+import csv
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+
+from app import bulk, runfile
+
+RUN_CSV = """\
+# Method: Cyclic Voltammetry
+# Timestamp: 20260915_100000
+# ----------------------------------
+# PARAMETERS
+scan_rate,50
+# ----------------------------------
+# DATA
+Potential (mV),Current (A)
+-10.0,-2e-06
+0.0,1e-06
+10.0,3e-06
+"""
+
+
+def _md5(path):
+    with open(path, "rb") as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+class BulkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.project = os.path.join(self.root, "Max", "Project1")
+        os.makedirs(self.project)
+        for name in ("a.csv", "b.csv"):
+            with open(os.path.join(self.project, name), "w") as f:
+                f.write(RUN_CSV)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _run(self, task, options=None, **kwargs):
+        return bulk.process_tree(task, self.root, options, workers=2, progress=False, **kwargs)
+
+    def test_summary(self):
+        results, errors, counts = self._run("summary")
+        self.assertEqual(errors, {})
+        self.assertEqual(counts, {"done": 2, "unchanged": 0, "failed": 0})
+        result = results[os.path.join("Max", "Project1", "a.csv")]
+        self.assertEqual(result["points"], 3)
+        self.assertEqual((result["peak_x"], result["peak_y"]), (10.0, 3e-6))
+        self.assertEqual((result["valley_x"], result["valley_y"]), (-10.0, -2e-6))
+
+        out = os.path.join(self.root, "summary.csv")
+        bulk.write_summary(results, out)
+        with open(out, newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["method"], "Cyclic Voltammetry")
+
+    def test_unchanged_files_skipped(self):
+        self._run("summary")
+        _, _, counts = self._run("summary")
+        self.assertEqual(counts, {"done": 0, "unchanged": 2, "failed": 0})
+
+        # Touched but same contents: still unchanged (hash); edited: redone
+        a = os.path.join(self.project, "a.csv")
+        os.utime(a, (1, 1))
+        with open(os.path.join(self.project, "b.csv"), "a") as f:
+            f.write("20.0,5e-06\n")
+        results, _, counts = self._run("summary")
+        self.assertEqual(counts, {"done": 1, "unchanged": 1, "failed": 0})
+        self.assertEqual(results[os.path.join("Max", "Project1", "b.csv")]["points"], 4)
+
+    def test_scope_and_errors(self):
+        os.makedirs(os.path.join(self.root, "Ada", "Other"))
+        with open(os.path.join(self.root, "Ada", "Other", "bad.csv"), "w") as f:
+            f.write("")
+        results, errors, counts = self._run("summary", user="Ada")
+        self.assertEqual(results, {})
+        self.assertEqual(list(errors), [os.path.join("Ada", "Other", "bad.csv")])
+        self.assertEqual(counts["failed"], 1)
+
+    def test_convert_round_trip(self):
+        a = os.path.join(self.project, "a.csv")
+        original = _md5(a)
+
+        results, errors, _ = self._run("convert", {"to": "egr"})
+        self.assertEqual(errors, {})
+        egr = os.path.join(self.project, "a" + runfile.EXTENSION)
+        self.assertEqual(results[os.path.join("Max", "Project1", "a.csv")]["output"], egr)
+
+        # The .egr twins are converted copies: back to CSV finds only the
+        # original runs, whose CSV exists, and is left alone
+        results, _, _ = self._run("convert", {"to": "csv"})
+        self.assertEqual(_md5(a), original)
+        self.assertTrue(all(r["output"] is None for r in results.values()))
+
+        # Each run counted once
+        results, _, _ = self._run("summary")
+        self.assertEqual(len(results), 2)
+
+    def test_convert_never_overwrites(self):
+        egr = os.path.join(self.project, "a" + runfile.EXTENSION)
+        with open(egr, "wb") as f:
+            f.write(b"not ours")
+        result = bulk.convert(os.path.join(self.project, "a.csv"), {"to": "egr"})
+        self.assertEqual(result, {"output": None, "skipped": "a.egr exists"})
+        with open(egr, "rb") as f:
+            self.assertEqual(f.read(), b"not ours")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+# app/test_catalog.py
+"""
+SQLite index of saved runs (app/catalog.py).
+
+    python -m pytest app/test_catalog.py
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+
+from app import runfile
+from app.catalog import Catalog, _column_stats
+
+
+def _run_csv(method, timestamp, rate, points=((0.0, 1e-6), (10.0, 3e-6))):
+    lines = [
+        f"# Method: {method}",
+        "# Mode: 2",
+        f"# Timestamp: {timestamp}",
+        "# ----------------------------------",
+        "# PARAMETERS",
+        f"scan_rate,{rate}",
+        "electrode,Pt",
+        "# ----------------------------------",
+        "# DATA",
+        "Potential (mV),Current (A)",
+    ]
+    lines += [f"{x!r},{y!r}" for x, y in points]
+    return "\n".join(lines) + "\n"
+
+
+class CatalogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self._write("Max/Project1/cv_1.csv", _run_csv("Cyclic Voltammetry", "20260915_100000", 50))
+        self._write("Max/Project1/cv_2.csv", _run_csv("Cyclic Voltammetry", "20260918_100000", 200))
+        self._write("Max/Project2/cc_1.csv", _run_csv("Constant Current", "20260920_100000", 0))
+        self._write("Ada/Old/legacy.csv", "Voltage (mV),Current (A)\n0.0,0.1\n")
+        self.catalog = Catalog(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _write(self, path, text):
+        path = os.path.join(self.root, *path.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def _paths(self, runs):
+        return [run["path"].replace(os.sep, "/") for run in runs]
+
+    def test_refresh(self):
+        self.assertEqual(self.catalog.refresh(), {"added": 4, "updated": 0, "removed": 0, "unchanged": 0})
+        self.assertEqual(self.catalog.refresh(), {"added": 0, "updated": 0, "removed": 0, "unchanged": 4})
+
+        path = self._write("Max/Project1/cv_1.csv", _run_csv("Cyclic Voltammetry", "20260915_100000", 75, (
+            (0.0, 1e-6), (5.0, 2e-6), (10.0, 3e-6))))
+        os.utime(path, (1, 1))
+        os.remove(os.path.join(self.root, "Ada", "Old", "legacy.csv"))
+        self.assertEqual(self.catalog.refresh(), {"added": 0, "updated": 1, "removed": 1, "unchanged": 2})
+        self.assertEqual(self.catalog.find(params=[("scan_rate", "=", 75)])[0]["points"], 3)
+
+    def test_folders(self):
+        self.catalog.refresh()
+        self.assertEqual(self.catalog.users(), ["Ada", "Max"])
+        self.assertEqual(self.catalog.projects("Max"), ["Project1", "Project2"])
+        self.catalog.add_folder("Max", "Project3")
+        self.assertEqual(self.catalog.projects("Max"), ["Project1", "Project2", "Project3"])
+
+    def test_find(self):
+        self.catalog.refresh()
+        runs = self.catalog.find(method="Cyclic Voltammetry")
+        self.assertEqual(self._paths(runs), ["Max/Project1/cv_2.csv", "Max/Project1/cv_1.csv"])
+
+        run = runs[1]
+        self.assertEqual(run["params"], {"scan_rate": 50.0, "electrode": "Pt"})
+        self.assertEqual(run["columns"], ["Potential (mV)", "Current (A)"])
+        self.assertEqual((run["points"], run["x_min"], run["x_max"]), (2, 0.0, 10.0))
+        self.assertAlmostEqual(run["y_mean"], 2e-6)
+
+        self.assertEqual(self._paths(self.catalog.find(params=[("scan_rate", ">", 100)])),
+                         ["Max/Project1/cv_2.csv"])
+        self.assertEqual(len(self.catalog.find(params=[("electrode", "=", "Pt")])), 3)
+        self.assertEqual(self._paths(self.catalog.find(since="2026-09-16", until="2026-09-18")),
+                         ["Max/Project1/cv_2.csv"])
+        self.assertEqual(len(self.catalog.find(user="Max", project="Project2")), 1)
+        self.assertEqual(len(self.catalog.find(limit=2)), 2)
+        with self.assertRaises(ValueError):
+            self.catalog.find(params=[("scan_rate", "LIKE", 1)])
+
+    def test_index_file_and_twins(self):
+        csv_path = os.path.join(self.root, "Max", "Project1", "cv_1.csv")
+        runfile.from_csv(csv_path, os.path.join(self.root, "Max", "Project1", "cv_1" + runfile.EXTENSION))
+        self.catalog.refresh()
+        # The converted .egr is the same run: indexed once
+        self.assertEqual(len(self.catalog.find(method="Cyclic Voltammetry")), 2)
+
+        path = self._write("Eve/New/run.csv", _run_csv("Cyclic Voltammetry", "20261001_090000", 10))
+        self.catalog.index_file(path)
+        self.assertIn("Eve", self.catalog.users())
+        self.assertEqual(self.catalog.find(user="Eve")[0]["timestamp"], "2026-10-01T09:00:00")
+
+
+class ColumnStatsTest(unittest.TestCase):
+
+    def test_stats(self):
+        self.assertEqual(_column_stats([0.0, float("nan"), 10.0], [1.0, 3.0, float("nan")]),
+                         (3, 0.0, 10.0, 1.0, 3.0, 2.0))
+        self.assertEqual(_column_stats([], []), (0, None, None, None, None, None))
+
+    def test_all_nan_column(self):
+        nan = float("nan")
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            self.assertEqual(_column_stats([0.0, 1.0], [nan, nan]), (2, 0.0, 1.0, None, None, None))
+            self.assertEqual(_column_stats([nan], [2.0]), (1, None, None, 2.0, 2.0, 2.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+# app/test_data.py
+"""
+Reading saved runs back (app/data.py).
+
+    python -m pytest app/test_data.py
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from app import data, runfile
+
+RUN_CSV = """\
+# Method: Cyclic Voltammetry
+# Mode: 2
+# Timestamp: 20260101_120000
+# User: Max
+# Project: Project1
+# ----------------------------------
+# PARAMETERS
+E_start,-500
+rate,50.5
+label,slow scan
+# ----------------------------------
+# DATA
+Potential (mV),Current (A),t
+-500.0,1e-06,0.0
+-495.0,2e-06,0.1
+-490.0,bad,0.2
+-485.0,4e-06
+"""
+
+
+class ReadRunTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _file(self, name, text):
+        path = os.path.join(self.dir, name)
+        with open(path, "w", newline="") as f:
+            f.write(text)
+        return path
+
+    def test_run_csv(self):
+        run = data.read_run(self._file("run.csv", RUN_CSV))
+        self.assertEqual(run.method, "Cyclic Voltammetry")
+        self.assertEqual(run.user, "Max")
+        self.assertEqual(run.params, {"E_start": -500, "rate": 50.5, "label": "slow scan"})
+        self.assertEqual(run.timestamp.year, 2026)
+        self.assertFalse(run.legacy)
+        self.assertEqual(len(run), 4)
+
+        np.testing.assert_array_equal(run.x, [-500, -495, -490, -485])
+        np.testing.assert_array_equal(run["Current (A)"][:2], [1e-6, 2e-6])
+        # Bad and short rows: NaN, the rest of the row kept
+        self.assertTrue(np.isnan(run.y[2]))
+        self.assertEqual(run["t"][2], 0.2)
+        self.assertTrue(np.isnan(run["t"][3]))
+
+    def test_legacy_csv(self):
+        run = data.read_run(self._file("old.csv", "Voltage (mV),Current (A)\n0.0,0.1\n0.1,0.1"))
+        self.assertTrue(run.legacy)
+        self.assertIsNone(run.timestamp)
+        self.assertEqual(run.columns, ["Voltage (mV)", "Current (A)"])
+        np.testing.assert_array_equal(run.x, [0.0, 0.1])
+
+        run = data.read_run(self._file("bare.csv", "1,2\n3,4\n"))
+        self.assertEqual(run.fields, ("col0", "col1"))
+        np.testing.assert_array_equal(run.y, [2, 4])
+
+    def test_iter_blocks(self):
+        rows = "".join(f"{i},{i * 1e-6}\n" for i in range(1000))
+        path = self._file("big.csv", "E,I\n" + rows)
+        blocks = list(data.iter_blocks(path, block_bytes=256))
+        self.assertGreater(len(blocks), 1)
+        np.testing.assert_array_equal(np.concatenate(blocks), data.read_run(path).records)
+
+    def test_runfile(self):
+        egr = os.path.join(self.dir, "run" + runfile.EXTENSION)
+        runfile.from_csv(self._file("run.csv", RUN_CSV), egr)
+        run = data.read_run(egr)
+        self.assertEqual(run.method, "Cyclic Voltammetry")
+        self.assertIsInstance(run.records, np.memmap)
+        self.assertEqual(len(run), 4)
+        self.assertEqual(sum(len(b) for b in data.iter_blocks(egr, block_bytes=48)), 4)
+
+
+class FindRunsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.project = os.path.join(self.root, "Max", "Project1")
+        os.makedirs(self.project)
+        os.makedirs(os.path.join(self.root, "Ada", "Other"))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _csv(self, name):
+        path = os.path.join(self.project, name)
+        with open(path, "w") as f:
+            f.write(RUN_CSV)
+        return path
+
+    def test_find_runs(self):
+        a = self._csv("a.csv")
+        b = self._csv("b.csv")
+        with open(os.path.join(self.project, "notes.txt"), "w") as f:
+            f.write("not a run")
+        self.assertEqual(data.find_runs(self.root), [a, b])
+        self.assertEqual(data.find_runs(self.root, user="Ada"), [])
+
+    def test_converted_twin_left_out(self):
+        csv_path = self._csv("a.csv")
+        egr = os.path.join(self.project, "a" + runfile.EXTENSION)
+        runfile.from_csv(csv_path, egr)
+        self.assertEqual(data.derived_copies([csv_path, egr]), {egr})
+        self.assertEqual(data.find_runs(self.root), [csv_path])
+
+        # Converted back (the CSV now names the .egr as its source)
+        os.remove(csv_path)
+        runfile.to_csv(egr, csv_path)
+        self.assertEqual(data.derived_copies([csv_path, egr]), {csv_path})
+
+    def test_twins_without_source(self):
+        # Converted before sources were recorded: the newer one is the copy
+        old = self._csv("a.csv")
+        new = os.path.join(self.project, "a" + runfile.EXTENSION)
+        runfile.from_csv(old, new)
+        header, records = runfile.load(new, mmap=False)
+        del header["source"]
+        with open(new, "wb") as f:
+            f.write(runfile._encode_header(header) + records.tobytes())
+        t = time.time()
+        os.utime(old, (t - 10, t - 10))
+        self.assertEqual(data.derived_copies([old, new]), {new})
+
+
+if __name__ == "__main__":
+    unittest.main()
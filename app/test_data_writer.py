@@ -0,0 +1,113 @@
+# app/test_data_writer.py
+"""
+CSV writer thread (app/data_writer.py).
+
+    python -m pytest app/test_data_writer.py
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from app.data_writer import DataWriter
+
+
+class FullDisk:
+    def write(self, text):
+        raise OSError(28, "No space left on device")
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+class DataWriterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "run.csv")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _text(self):
+        with open(self.path, newline="") as f:
+            return f.read()
+
+    def test_contents(self):
+        writer = DataWriter(self.path, [["# Method: Dummy"], ["E", "I", "cycle"]])
+        writer.put(np.float64(1 / 3), np.float64(2e-6), np.int32(0))
+        records = np.zeros(2, dtype=[("E", "f8"), ("I", "f8"), ("cycle", "i4")])
+        records["E"] = [0.1, 0.2]
+        records["I"] = [1e-7, -2.5e-9]
+        records["cycle"] = [0, 1]
+        writer.put_many(records)
+        writer.put_many(np.array([[3.0, 4.0, 5.0]]))
+        writer.put_many([(6, 7, 8)])
+        writer.close()
+
+        self.assertIsNone(writer.error)
+        self.assertEqual(writer.rows_written, 5)
+        # %r: full float precision, integers without .0
+        self.assertEqual(self._text(), (
+            "# Method: Dummy\r\n"
+            "E,I,cycle\r\n"
+            "0.3333333333333333,2e-06,0\r\n"
+            "0.1,1e-07,0\r\n"
+            "0.2,-2.5e-09,1\r\n"
+            "3.0,4.0,5.0\r\n"
+            "6,7,8\r\n"
+        ))
+
+    def test_flush_rows(self):
+        writer = DataWriter(self.path, flush_rows=3, flush_interval=60)
+        for i in range(5):
+            writer.put(i, i)
+        self.assertTrue(_wait_for(lambda: writer.rows_written == 3))
+        self.assertEqual(self._text(), "0,0\r\n1,1\r\n2,2\r\n")
+
+        writer.close()
+        self.assertEqual(writer.rows_written, 5)
+
+    def test_flush_interval(self):
+        writer = DataWriter(self.path, flush_rows=1000, flush_interval=0.05)
+        writer.put(1, 2)
+        # Well under flush_rows, written once the interval is up
+        self.assertTrue(_wait_for(lambda: writer.rows_written == 1))
+        self.assertEqual(self._text(), "1,2\r\n")
+        writer.close()
+
+    def test_fsync(self):
+        for fsync in (False, True):
+            with self.subTest(fsync=fsync), mock.patch("app.data_writer.os.fsync") as os_fsync:
+                writer = DataWriter(self.path, fsync=fsync)
+                writer.put(1, 2)
+                writer.close()
+                self.assertEqual(os_fsync.called, fsync)
+
+    def test_io_error(self):
+        with mock.patch("app.data_writer.open", return_value=FullDisk(), create=True):
+            writer = DataWriter(self.path)
+        writer.put(1, 2)
+        writer.close(5)
+        self.assertIsInstance(writer.error, OSError)
+        self.assertEqual(writer.rows_written, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+# app/test_discovery.py
+"""
+Background device discovery (app/instruments/discovery.py) against a
+fake VISA backend.
+
+    python -m pytest app/test_discovery.py
+"""
+import threading
+import time
+import unittest
+from unittest import mock
+
+from app.instruments.discovery import DeviceScanner, sorted_resources
+
+GPIB = "GPIB0::13::INSTR"
+ASRL = "ASRL1::INSTR"
+
+
+class FakeInstrument:
+    def __init__(self, identity):
+        self.identity = identity
+        self.replies = []
+
+    def write(self, message):
+        self.replies.append(self.identity if message == "ID" else "")
+
+    def read(self):
+        return self.replies.pop(0) + "\r"
+
+    def close(self):
+        pass
+
+
+class FakeResourceManager:
+    """GPIB: a 273A, ASRL: something else, USB: hangs, TCPIP: none found."""
+
+    def __init__(self, release):
+        self.release = release
+        self.queries = []
+
+    def list_resources(self, query):
+        self.queries.append(query)
+        if query.startswith("USB"):
+            self.release.wait(10)      # hung driver call
+            return ("USB0::1::INSTR",)
+        if query.startswith("GPIB"):
+            return (GPIB,)
+        if query.startswith("ASRL"):
+            return (ASRL,)
+        raise OSError("VI_ERROR_RSRC_NFOUND")
+
+    def open_resource(self, resource):
+        return FakeInstrument("273A" if resource == GPIB else "DMM 1.0")
+
+
+class FakeSessions:
+    def __init__(self, rm):
+        self.rm = rm
+        self.sessions = {}
+        self.backends = {}
+
+    def resource_manager(self, backend=""):
+        return self.rm
+
+    def set_backend(self, resource, backend):
+        self.backends[resource] = backend
+
+
+class DeviceScannerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.rm = FakeResourceManager(self.release)
+        self.sessions = FakeSessions(self.rm)
+        # Only the fake backend: no simulator probe
+        patcher = mock.patch.dict("app.instruments.discovery.SIMULATOR", {"enabled": False})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.release.set()
+
+    def _scanner(self, ttl=60):
+        return DeviceScanner(self.sessions, backends=["@fake"], ttl=ttl, timeout=0.2, id_timeout=0.5)
+
+    def test_hung_interface_times_out(self):
+        scanner = self._scanner()
+        t0 = time.perf_counter()
+        resources = scanner.list_resources()
+        self.assertLess(time.perf_counter() - t0, 2.0)
+
+        self.assertCountEqual(resources, [GPIB, ASRL])
+        self.assertEqual(len(self.rm.queries), 4)
+        self.assertEqual(self.sessions.backends, {GPIB: "@fake", ASRL: "@fake"})
+
+    def test_ttl_cache(self):
+        scanner = self._scanner()
+        self.assertIsNone(scanner.cached())
+        scanner.list_resources()
+        self.assertEqual(set(scanner.cached()), {GPIB, ASRL})
+
+        scanner.list_resources()
+        self.assertEqual(len(self.rm.queries), 4)     # served from the cache
+        # Not identified yet: identify=True needs a new scan
+        self.assertIsNone(scanner.cached(identify=True))
+
+        scanner.list_resources(force=True)
+        self.assertEqual(len(self.rm.queries), 8)
+
+        scanner.invalidate()
+        self.assertIsNone(scanner.cached())
+
+        expired = self._scanner(ttl=0)
+        expired.list_resources()
+        self.assertIsNone(expired.cached())
+        expired.list_resources()
+        self.assertEqual(len(self.rm.queries), 16)
+
+    def test_callbacks(self):
+        scanner = self._scanner()
+        found, identified, done = [], {}, threading.Event()
+        result = {}
+
+        def on_done(devices):
+            result.update(devices)
+            done.set()
+
+        scanner.scan(lambda resource, info: found.append((resource, info["interface"])),
+                     identified.__setitem__, on_done, identify=True)
+        self.assertTrue(done.wait(5))
+
+        self.assertCountEqual(found, [(GPIB, "GPIB"), (ASRL, "ASRL")])
+        self.assertEqual(identified, {GPIB: "273A", ASRL: "DMM 1.0"})
+        self.assertEqual(result[GPIB], {"backend": "@fake", "interface": "GPIB", "id": "273A"})
+        self.assertEqual(sorted_resources(result), [GPIB, ASRL])
+
+        # From the cache: replayed at once, on this thread
+        replayed, ids, finished = [], {}, []
+        scanner.scan(lambda resource, info: replayed.append(resource), ids.__setitem__,
+                     finished.append, identify=True)
+        self.assertCountEqual(replayed, [GPIB, ASRL])
+        self.assertEqual(ids, identified)
+        self.assertEqual(finished, [result])
+
+    def test_failing_callback_does_not_stop_scan(self):
+        scanner = self._scanner()
+
+        def broken(resource, info):
+            raise RuntimeError("GUI gone")
+
+        done = threading.Event()
+        scanner.scan(on_found=broken, on_done=lambda devices: done.set())
+        self.assertTrue(done.wait(5))
+        self.assertEqual(set(scanner.cached()), {GPIB, ASRL})
+
+
+if __name__ == "__main__":
+    unittest.main()
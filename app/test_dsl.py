@@ -0,0 +1,214 @@
+# app/test_dsl.py
+"""
+Process language of the JSON custom methods (app/methods/dsl.py).
+
+    python -m pytest app/test_dsl.py
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from app.methods.dsl import (
+    DSLError, Num, Repeat, RangeV, Var, compile_plan, load_json_method, parse, variables,
+)
+
+# As written by the old "New Method" tab
+LEGACY = """REPEAT(C){
+    FOR_RANGEV(Vs,Ve,Vstep){
+        MEAN(R),
+        DELAY(D),
+        OUTPUT(Vout=V,Iout=I)
+    };
+}"""
+
+
+class ParseTest(unittest.TestCase):
+
+    def test_legacy_process(self):
+        program = parse(LEGACY)
+        self.assertEqual(program, [Repeat(Var("C"), [
+            RangeV(0, Var("Vs"), Var("Ve"), Var("Vstep"), Var("R"), Var("D"), {"Vout": "V", "Iout": "I"}),
+        ])])
+        self.assertEqual(variables(program), {"C", "Vs", "Ve", "Vstep", "R", "D"})
+
+    def test_numbers_and_defaults(self):
+        program = parse("for_rangev(-100, 1e2, .5){}")
+        self.assertEqual(program, [RangeV(0, Num(-100.0), Num(100.0), Num(0.5), None, None, {})])
+
+    def test_errors(self):
+        cases = {
+            "": "empty process",
+            "REPEAT(2){": "expected '}', found 'end of text'",
+            "MEAN(2)": "expected REPEAT or FOR_RANGEV, found 'MEAN' at line 1, column 1",
+            "FOR_RANGEV(0,1){}": "expected ','",
+            "FOR_RANGEV(0,1,1){MEAN(2),MEAN(3)}": "MEAN given twice",
+            "FOR_RANGEV(0,1,1){WAIT(2)}": "expected MEAN, DELAY or OUTPUT",
+            "FOR_RANGEV(0,1,1){OUTPUT(a=V,b=Q)}": "OUTPUT can record V or I",
+            "FOR_RANGEV(0,1,1){OUTPUT(a=V,b=V)}": "records V twice",
+            "FOR_RANGEV(0,1,1){DELAY(,)}": "expected a number or input name",
+            "FOR_RANGEV(0,1,1){}\n  ?": "unexpected '\\?' at line 2, column 3",
+        }
+        for text, message in cases.items():
+            with self.subTest(text=text):
+                with self.assertRaisesRegex(DSLError, message):
+                    parse(text)
+
+
+class CompilePlanTest(unittest.TestCase):
+
+    def test_nested_repeat(self):
+        plan = compile_plan(parse("REPEAT(2){ REPEAT(n){ FOR_RANGEV(0,10,5){DELAY(1)} } }"), {"n": 3})
+        self.assertEqual(len(plan), 18)
+        np.testing.assert_array_equal(plan.setpoint[:6], [0, 5, 10, 0, 5, 10])
+        # cycle counts iterations of the outermost REPEAT
+        np.testing.assert_array_equal(plan.cycle, [0] * 9 + [1] * 9)
+        np.testing.assert_array_equal(plan.start[:4], [0, 1, 2, 3])
+        self.assertEqual(plan.total_time, 18.0)
+
+    def test_descending_range(self):
+        for step in (5, -5):
+            with self.subTest(step=step):
+                plan = compile_plan(parse("FOR_RANGEV(10,0,s){}"), {"s": step})
+                np.testing.assert_array_equal(plan.setpoint, [10, 5, 0])
+
+    def test_non_integer_step(self):
+        plan = compile_plan(parse("FOR_RANGEV(0,0.3,0.1){}"), {})
+        np.testing.assert_allclose(plan.setpoint, [0, 0.1, 0.2, 0.3])
+        # end not on the grid: stops before it
+        plan = compile_plan(parse("FOR_RANGEV(0,1,0.3){}"), {})
+        np.testing.assert_allclose(plan.setpoint, [0, 0.3, 0.6, 0.9])
+
+    def test_loops_and_defaults(self):
+        plan = compile_plan(parse("FOR_RANGEV(0,1,1){MEAN(3),DELAY(2)} FOR_RANGEV(5,5,1){}"), {})
+        np.testing.assert_array_equal(plan.loop, [0, 0, 1])
+        np.testing.assert_array_equal(plan.n_avg, [3, 3, 1])
+        np.testing.assert_array_equal(plan.duration, [2, 2, 0])
+
+    def test_repeat_zero(self):
+        plan = compile_plan(parse("REPEAT(0){FOR_RANGEV(0,10,1){DELAY(1)}}"), {})
+        self.assertEqual(len(plan), 0)
+        self.assertEqual(plan.total_time, 0.0)
+        self.assertEqual(len(plan.read_times()[1]), 0)
+
+        plan = compile_plan(parse("REPEAT(0){FOR_RANGEV(0,10,1){}} FOR_RANGEV(1,2,1){}"), {})
+        np.testing.assert_array_equal(plan.setpoint, [1, 2])
+
+    def test_errors(self):
+        cases = {
+            ("REPEAT(n){FOR_RANGEV(0,1,1){}}", 2.5): "REPEAT count must be a whole number",
+            ("REPEAT(n){FOR_RANGEV(0,1,1){}}", -1): "REPEAT count must be a whole number",
+            ("FOR_RANGEV(0,1,n){}", 0): "step is 0",
+            ("FOR_RANGEV(0,1,1){MEAN(n)}", 0): "MEAN must be a whole number",
+            ("FOR_RANGEV(0,1,1){DELAY(n)}", -1): "DELAY must be >= 0",
+            ("FOR_RANGEV(0,1,1){DELAY(n)}", "abc"): "is not a number",
+        }
+        for (text, n), message in cases.items():
+            with self.subTest(text=text, n=n):
+                with self.assertRaisesRegex(DSLError, message):
+                    compile_plan(parse(text), {"n": n})
+
+        with self.assertRaisesRegex(DSLError, "unknown input 'x'"):
+            compile_plan(parse("FOR_RANGEV(x,1,1){}"), {})
+
+
+class ReadTimesTest(unittest.TestCase):
+
+    def test_spread_over_second_half(self):
+        plan = compile_plan(parse("FOR_RANGEV(0,1,1){MEAN(2),DELAY(4)} FOR_RANGEV(0,0,1){DELAY(1)}"), {})
+        owner, times = plan.read_times()
+        np.testing.assert_array_equal(owner, [0, 0, 1, 1, 2])
+        # point 0: 0..4 s, point 1: 4..8 s, point 2: 8..9 s (one reading, at the end)
+        np.testing.assert_allclose(times, [3, 4, 7, 8, 9])
+
+    def test_zero_delay(self):
+        plan = compile_plan(parse("FOR_RANGEV(0,2,1){MEAN(2)}"), {})
+        owner, times = plan.read_times()
+        np.testing.assert_array_equal(owner, [0, 0, 1, 1, 2, 2])
+        np.testing.assert_array_equal(times, np.zeros(6))
+
+
+class LoadJsonMethodTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _write(self, data, name="My Method.json"):
+        path = os.path.join(self.dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        return path
+
+    def _legacy(self, **changes):
+        data = {
+            "name": "Stair",
+            "description": "staircase",
+            "inputs": [
+                {"label": "Cycles", "type": "int", "default": 2, "variable": "C"},
+                {"label": "Start", "type": "float", "default": 0, "variable": "Vs"},
+                {"label": "End", "type": "float", "default": 10, "variable": "Ve"},
+                {"label": "Step", "type": "float", "default": 5, "variable": "Vstep"},
+                {"label": "Readings", "type": "int", "default": 1, "variable": "R"},
+                {"label": "Delay", "type": "float", "default": 0.1, "variable": "D"},
+            ],
+            "output": [
+                {"label": "Potential(mV)", "type": "float", "variable": "Vout"},
+                {"label": "Current(A)", "type": "float", "variable": "Iout"},
+            ],
+            "process": LEGACY,
+        }
+        data.update(changes)
+        return data
+
+    def test_legacy_file(self):
+        cls = load_json_method(self._write(self._legacy()))
+        self.assertEqual(cls.__name__, "DSL_My_Method")
+        self.assertEqual(cls.name, "Stair")
+        self.assertEqual((cls.xfield, cls.yfield), ("Vout", "Iout"))
+        self.assertEqual((cls.xlabel, cls.ylabel), ("Potential(mV)", "Current(A)"))
+        self.assertEqual(cls.parameters()["C"], {"label": "Cycles", "default": 2, "type": int})
+
+        method = cls.__new__(cls)
+        method.params = {key: spec["default"] for key, spec in cls.parameters().items()}
+        plan = method.plan()
+        np.testing.assert_array_equal(plan.setpoint, [0, 5, 10, 0, 5, 10])
+
+    def test_output_names_columns(self):
+        process = "FOR_RANGEV(0,1,1){OUTPUT(I_A=I,E_mV=V)}"
+        cls = load_json_method(self._write(self._legacy(process=process, inputs=[])))
+        self.assertEqual((cls.xfield, cls.yfield), ("E_mV", "I_A"))
+        self.assertEqual((cls.xlabel, cls.ylabel), ("E_mV", "I_A"))
+
+        # No OUTPUT: the first two "output" entries
+        cls = load_json_method(self._write(self._legacy(process="FOR_RANGEV(0,1,1){}", inputs=[])))
+        self.assertEqual((cls.xfield, cls.yfield), ("Vout", "Iout"))
+
+    def test_errors(self):
+        cases = [
+            ({"process": None}, "missing 'process'"),
+            ({"inputs": []}, r"undefined inputs \['C', 'D', 'R', 'Ve', 'Vs', 'Vstep'\]"),
+            ({"process": "FOR_RANGEV(0,1,1){OUTPUT(a=V)}"}, "both V and I"),
+            ({"process": "FOR_RANGEV(0,1,1){OUTPUT(a=V,b=I)} FOR_RANGEV(0,1,1){OUTPUT(c=V,b=I)}"},
+             "different OUTPUT columns"),
+            ({"process": "FOR_RANGEV(0,1,1){OUTPUT(t=V,b=I)}"}, "clash"),
+            ({"process": "FOR_RANGEV(0,1,1){}", "output": [{"variable": "x"}]}, "needs a potential and a current"),
+            ({"mode": "galvanostat"}, "mode 'galvanostat' not supported"),
+            ({"mode": "bogus"}, "mode 'bogus' not supported"),
+        ]
+        for changes, message in cases:
+            with self.subTest(changes=changes):
+                data = self._legacy(**changes)
+                if data["process"] is None:
+                    del data["process"]
+                with self.assertRaisesRegex(DSLError, message):
+                    load_json_method(self._write(data))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+# app/test_egg273a.py
+"""
+EGG273A driver against a scripted bus: pipelined transactions,
+onboard curves.
+
+    python -m pytest app/test_egg273a.py
+"""
+import threading
+import unittest
+
+from app.instruments.EGG273A import EGG273A
+from app.methods.base import ControlMode
+
+
+class NoReply(Exception):
+    pass
+
+
+class ScriptedDevice:
+    """
+    VISA resource stand-in: logs every bus write and read, answers reads
+    from a reply script (NoReply once it runs out, like a VISA timeout).
+    """
+
+    def __init__(self, replies=()):
+        self.replies = list(replies)
+        self.log = []
+
+    def write(self, message):
+        self.log.append(("write", message))
+
+    def write_raw(self, message):
+        self.log.append(("write", message.decode("ascii").rstrip("\r")))
+
+    def read(self):
+        if not self.replies:
+            raise NoReply("Timeout expired before operation completed")
+        reply = self.replies.pop(0)
+        self.log.append(("read", reply))
+        return reply + "\r"
+
+    def read_raw(self):
+        return self.read().encode("ascii")
+
+    def writes(self):
+        return [entry for kind, entry in self.log if kind == "write"]
+
+    def reads(self):
+        return [entry for kind, entry in self.log if kind == "read"]
+
+
+def _instrument(mode=ControlMode.POTENTIOSTAT, replies=()):
+    device = ScriptedDevice(replies)
+    instrument = EGG273A(device)
+    instrument.set_mode(mode)
+    device.log.clear()
+    return instrument, device
+
+
+class TransactionTest(unittest.TestCase):
+
+    def test_one_write_one_read_per_query(self):
+        instrument, device = _instrument(replies=["273A", "SIM 1.00", "0"])
+        replies = instrument.transaction(["ID", "VER", "ERR"])
+        self.assertEqual(device.writes(), ["ID;VER;ERR"])
+        self.assertEqual([r.strip() for r in replies], ["273A", "SIM 1.00", "0"])
+
+    def test_mixed_commands(self):
+        instrument, device = _instrument(replies=["1000,-9", "2000,-9", "unread"])
+        replies = instrument.transaction(["SETE 100", "READI", "SETE 200", "READI", "CELL 1"])
+        self.assertEqual(device.writes(), ["SETE 100;READI;SETE 200;READI;CELL 1"])
+        # Replies only for the queries, in command order
+        self.assertEqual([r.strip() for r in replies], ["1000,-9", "2000,-9"])
+        self.assertEqual(device.replies, ["unread"])
+
+    def test_query_names_case_insensitive(self):
+        instrument, device = _instrument(replies=["1000,-9", "0"])
+        self.assertEqual(len(instrument.transaction(["readi", "Err"])), 2)
+
+    def test_no_queries(self):
+        instrument, device = _instrument()
+        self.assertEqual(instrument.transaction(["SETE 5", "CELL 1"]), [])
+        self.assertEqual(device.reads(), [])
+
+    def test_step_and_read(self):
+        instrument, device = _instrument(replies=["3000,-9", "3000,-9"])
+        self.assertAlmostEqual(instrument.step_and_read(300), 3e-6)
+        self.assertEqual(device.writes(), ["SETE 300;READI"])
+        self.assertEqual(len(device.reads()), 1)
+
+        # Same result as the two-round-trip path
+        device.log.clear()
+        instrument.set_value(300)
+        self.assertAlmostEqual(instrument.read_value(), 3e-6)
+        self.assertEqual(device.writes(), ["SETE 300", "READI"])
+
+    def test_step_and_read_galvanostat(self):
+        instrument, device = _instrument(ControlMode.GALVANOSTAT, replies=["100"])
+        self.assertAlmostEqual(instrument.step_and_read(1e-6), 100.0)
+        self.assertEqual(device.writes(), ["SETI 1 -6;READE"])
+
+
+class CurveTest(unittest.TestCase):
+
+    def test_time_base_range(self):
+        self.assertEqual(EGG273A.time_base_us(0.001), 1000)
+        self.assertEqual(EGG273A.time_base_us(50e-6), 50)
+        for dt in (10e-6, 0.05):
+            with self.subTest(dt=dt), self.assertRaisesRegex(ValueError, "time base"):
+                EGG273A.time_base_us(dt)
+
+        instrument, device = _instrument()
+        with self.assertRaises(ValueError):
+            instrument.load_scan(-10, 10, 5, 0.05)
+        self.assertEqual(device.writes(), [])
+
+    def test_load_scan(self):
+        instrument, device = _instrument()
+        self.assertEqual(instrument.load_scan(-10, 10, 5, 50e-6, cycles=2), 16)
+        self.assertEqual(device.writes(), ["SIE 1;TMB 50;NP 16;SETE -10;VTX 10;STEP 5;NC 2"])
+        self.assertEqual(instrument.curve_dt, 50e-6)
+
+    def test_round_trip(self):
+        currents = ["-1000,-10", "-500,-10", "0,-9", "500,-10", "1000,-10", "500,-10", "0,-9", "-500,-10"]
+        instrument, device = _instrument(replies=["0", "0", "1"] + currents)
+        instrument.load_scan(-10, 10, 5, 50e-6)
+
+        instrument.arm_curve()
+        progress = []
+        self.assertTrue(instrument.wait_curve(threading.Event(), progress.append, poll_interval=0))
+        self.assertEqual(len(progress), 2)      # one per DONE answered 0
+        self.assertTrue(all(0 <= p <= 1 for p in progress))
+
+        values = instrument.dump_curve()
+        self.assertEqual(device.writes()[1:], ["TC", "DONE", "DONE", "DONE", "DC"])
+        expected = [E * 1e-8 for E in (-10, -5, 0, 5, 10, 5, 0, -5)]
+        self.assertEqual(len(values), 8)
+        for got, want in zip(values, expected):
+            self.assertAlmostEqual(got, want)
+        self.assertEqual(device.replies, [])
+
+    def test_abort(self):
+        instrument, device = _instrument(replies=["0"])
+        instrument.load_scan(-10, 10, 5, 0.04)
+        instrument.arm_curve()
+
+        stop = threading.Event()
+        stop.set()
+        self.assertFalse(instrument.wait_curve(stop, poll_interval=0))
+        self.assertEqual(device.writes()[1:], ["TC", "DONE", "HALT"])
+
+
+if __name__ == "__main__":
+    unittest.main()
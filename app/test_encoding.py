@@ -0,0 +1,65 @@
+# app/test_encoding.py
+"""
+Pre-encoded setpoints (EGG273A.encode_setpoints): same commands as the
+per-point path, and they drive the simulator like it.
+
+    python -m pytest app/test_encoding.py
+"""
+import unittest
+
+from app.instruments.EGG273A import EGG273A
+from app.instruments.simulator import Simulated273A
+from app.methods.base import ControlMode
+
+
+def _instrument(mode, device=None):
+    instrument = EGG273A(device if device is not None else Simulated273A())
+    instrument.mode = mode
+    return instrument
+
+
+class EncodeSetpointsTest(unittest.TestCase):
+
+    def test_potentiostat(self):
+        instrument = _instrument(ControlMode.POTENTIOSTAT)
+        self.assertEqual(
+            instrument.encode_setpoints([-500.0, 0.5, 12.25]),
+            [b"SETE -500.0\r", b"SETE 0.5\r", b"SETE 12.25\r"],
+        )
+
+    def test_read_suffix(self):
+        instrument = _instrument(ControlMode.POTENTIOSTAT)
+        self.assertEqual(instrument.encode_setpoints([1], read=True), [b"SETE 1;READI\r"])
+
+        instrument = _instrument(ControlMode.GALVANOSTAT)
+        self.assertEqual(instrument.encode_setpoints([1e-6], read=True), [b"SETI 1 -6;READE\r"])
+
+    def test_galvanostat_matches_setpoint_command(self):
+        instrument = _instrument(ControlMode.GALVANOSTAT)
+        currents = [0.0, 1e-6, -2.5e-5, 1.234e-3, 5e-12, -0.5, 3e-9, 7.5e-7, 1e-3]
+        expected = [(instrument._setpoint_command(i) + "\r").encode("ascii") for i in currents]
+        self.assertEqual(instrument.encode_setpoints(currents), expected)
+
+    def test_no_termination(self):
+        class Device:
+            write_termination = None
+
+        instrument = _instrument(ControlMode.POTENTIOSTAT, Device())
+        self.assertEqual(instrument.encode_setpoints([1]), [b"SETE 1"])
+
+    def test_drives_simulator(self):
+        device = Simulated273A(cell_resistance=100e3)
+        instrument = _instrument(ControlMode.POTENTIOSTAT, device)
+        device.write("CELL 1")
+
+        commands = instrument.encode_setpoints([100, 200], read=True)
+        self.assertAlmostEqual(instrument.step_and_read_encoded(commands[0]), 1e-6)
+        self.assertAlmostEqual(instrument.step_and_read_encoded(commands[1]), 2e-6)
+
+        instrument.set_value_encoded(instrument.encode_setpoints([300])[0])
+        self.assertEqual(device.potential, 300.0)
+        self.assertEqual(instrument.parser.errors, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
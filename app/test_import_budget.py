@@ -0,0 +1,74 @@
+# app/test_import_budget.py
+"""
+Cold-import budget: the modules needed to list methods and drive the
+273A, run headless and start the GUI must stay fast to import and must
+not drag in heavy packages.
+
+    python -m pytest app/test_import_budget.py
+    python -m unittest app.test_import_budget
+"""
+import importlib.util
+import unittest
+
+from app.importtime import HEAVY_MODULES, profile
+
+# Cold-import budgets in ms; generous, so that slow CI machines pass but
+# an eager numpy / matplotlib / PySide6 import (100+ ms each) does not
+BUDGET_MS = {
+    "app.methods.base": 150,
+    "app.methods.loader": 150,
+    "app.instruments.EGG273A": 150,
+    "app.instruments.sessions": 150,
+    # Headless runner and the modules the GUI shares with it
+    "app.run": 250,
+    "app.runs": 200,
+    "app.run_manager": 150,
+    "app.sequencer": 200,
+    "app.acquisition": 150,
+    "app.live_plot": 150,
+    "app.catalog": 150,
+    "app.startup": 150,
+}
+
+# The GUI subclasses customtkinter widgets at module level, so
+# customtkinter is its one eager heavy import
+GUI_MODULE = "app.main"
+GUI_EAGER = ["customtkinter"]
+
+
+class ImportBudgetTest(unittest.TestCase):
+
+    def test_cold_imports(self):
+        for module, budget in BUDGET_MS.items():
+            with self.subTest(module=module):
+                total_us, entries, heavy = profile(module)
+                self.assertEqual(
+                    heavy, [],
+                    f"{module} imports {', '.join(heavy)} (lazy_import it instead)"
+                )
+                slowest = ", ".join(
+                    f"{name} {cumulative / 1000:.0f} ms"
+                    for cumulative, _, name in sorted(entries, reverse=True)[:5]
+                )
+                self.assertLess(
+                    total_us / 1000, budget,
+                    f"{module} takes {total_us / 1000:.0f} ms to import ({slowest})"
+                )
+
+    @unittest.skipUnless(importlib.util.find_spec("customtkinter"), "customtkinter not installed")
+    def test_gui_imports(self):
+        _, _, heavy = profile(GUI_MODULE)
+        self.assertEqual(
+            heavy, GUI_EAGER,
+            f"{GUI_MODULE} imports {', '.join(heavy)} (lazy_import it or warm it up in the startup graph)"
+        )
+
+    def test_profiler_sees_heavy_imports(self):
+        # app.bulk is a CLI and imports numpy eagerly
+        self.assertIn("numpy", HEAVY_MODULES)
+        _, _, heavy = profile("app.bulk")
+        self.assertIn("numpy", heavy)
+
+
+if __name__ == "__main__":
+    unittest.main()
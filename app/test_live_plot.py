@@ -0,0 +1,57 @@
+# app/test_live_plot.py
+"""
+Live plot ring buffer (app/live_plot.py).
+
+    python -m pytest app/test_live_plot.py
+"""
+import unittest
+
+import numpy as np
+
+from app.live_plot import _Series
+
+
+class SeriesTest(unittest.TestCase):
+
+    def _extend(self, series, start, stop):
+        xs = np.arange(start, stop, dtype=float)
+        series.extend(xs, -xs)
+
+    def assertPoints(self, series, start, stop):
+        points = series.points()
+        expected = np.arange(start, stop, dtype=float)
+        np.testing.assert_array_equal(points[:, 0], expected)
+        np.testing.assert_array_equal(points[:, 1], -expected)
+
+    def test_filling(self):
+        series = _Series(None, 5)
+        self.assertEqual(len(series.points()), 0)
+        self._extend(series, 0, 3)
+        self.assertPoints(series, 0, 3)
+        self.assertTrue(series.dirty)
+
+    def test_wraps_in_small_chunks(self):
+        series = _Series(None, 5)
+        stop = 0
+        for n in (2, 2, 2, 3, 1, 4, 4):
+            self._extend(series, stop, stop + n)
+            stop += n
+            # Always the last min(stop, 5) points, oldest first
+            self.assertPoints(series, max(0, stop - 5), stop)
+            self.assertTrue(np.shares_memory(series.points(), series.data))
+
+    def test_chunk_larger_than_capacity(self):
+        series = _Series(None, 5)
+        self._extend(series, 0, 3)
+        self._extend(series, 3, 15)
+        self.assertPoints(series, 10, 15)
+
+        # ... and exactly one capacity, then wrapping on from there
+        self._extend(series, 15, 20)
+        self.assertPoints(series, 15, 20)
+        self._extend(series, 20, 22)
+        self.assertPoints(series, 17, 22)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+# app/test_parsing.py
+"""
+273A reply parsing (app/instruments/parsing.py): fast and slow paths
+must accept and reject the same replies.
+
+    python -m pytest app/test_parsing.py
+"""
+import math
+import unittest
+
+from app.instruments.parsing import ReplyParser
+from app.methods.base import ControlMode
+
+POT = ControlMode.POTENTIOSTAT
+GAL = ControlMode.GALVANOSTAT
+
+
+class CurrentTest(unittest.TestCase):
+
+    def test_good(self):
+        parser = ReplyParser()
+        self.assertAlmostEqual(parser.current(b"1234,-9\r"), 1234e-9)
+        self.assertAlmostEqual(parser.current("-512,-6"), -512e-6)
+        self.assertAlmostEqual(parser.current(b" +12 , -3 "), 12e-3)
+        self.assertEqual(parser.errors, [])
+        self.assertEqual(parser.count, 3)
+
+    def test_bad(self):
+        for raw in (b"1234,", b"1234", b"5", b"nan", b"?", b"", b"1,2,3", b"nan,0", b"12a,3"):
+            with self.subTest(raw=raw):
+                parser = ReplyParser()
+                self.assertTrue(math.isnan(parser.current(raw)))
+                self.assertEqual(len(parser.errors), 1)
+                self.assertEqual(parser.errors[0].raw, raw)
+
+
+class VoltageTest(unittest.TestCase):
+
+    def test_good(self):
+        parser = ReplyParser()
+        self.assertEqual(parser.voltage(b"-250\r"), -250.0)
+        self.assertEqual(parser.voltage("12.5"), 12.5)
+        self.assertEqual(parser.voltage(b"100,1"), 100.0)
+        self.assertEqual(parser.errors, [])
+
+    def test_bad(self):
+        for raw in (b"nan", b"inf", b"-", b"?", b""):
+            with self.subTest(raw=raw):
+                parser = ReplyParser()
+                self.assertTrue(math.isnan(parser.voltage(raw)))
+                self.assertEqual(len(parser.errors), 1)
+
+
+class BlockTest(unittest.TestCase):
+
+    def test_good(self):
+        parser = ReplyParser()
+        values = parser.block([b"1,-3", b"-25,-6", b"0,-9"], POT)
+        self.assertEqual(values.tolist(), [1e-3, -25e-6, 0.0])
+        self.assertEqual(parser.errors, [])
+        self.assertEqual(parser.count, 3)
+
+    def test_blob(self):
+        parser = ReplyParser()
+        values = parser.block(b"1,-3\r2,-3\r3,-3\r", POT)
+        self.assertEqual(values.tolist(), [1e-3, 2e-3, 3e-3])
+
+    def test_bad_replies_match_single_parse(self):
+        cases = {
+            "truncated": [b"1,-3", b"2,"],
+            "no comma": [b"1,-3", b"5"],
+            "nan": [b"1,-3", b"nan"],
+            "extra comma": [b"1,-3", b"1,2,3"],
+        }
+        for name, replies in cases.items():
+            with self.subTest(case=name):
+                parser = ReplyParser()
+                values = parser.block(replies, POT)
+                self.assertEqual(values[0], 1e-3)
+                self.assertTrue(math.isnan(values[1]))
+                self.assertEqual([e.index for e in parser.errors], [1])
+                self.assertEqual(parser.count, 2)
+
+    def test_galvanostat(self):
+        parser = ReplyParser()
+        self.assertEqual(parser.block([b"10", b"-20,5"], GAL).tolist(), [10.0, -20.0])
+        self.assertEqual(parser.errors, [])
+
+        values = parser.block([b"10", b"nan"], GAL)
+        self.assertTrue(math.isnan(values[1]))
+        self.assertEqual([e.index for e in parser.errors], [3])
+
+
+if __name__ == "__main__":
+    unittest.main()
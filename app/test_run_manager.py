@@ -0,0 +1,96 @@
+# app/test_run_manager.py
+"""
+One run per instrument (app/run_manager.py) on the simulator.
+
+    python -m pytest app/test_run_manager.py
+"""
+import threading
+import unittest
+
+from app.instruments.sessions import SessionManager
+from app.methods.base import MethodBase
+from app.methods.BuiltIn.dummy import DummyMethod
+from app.run_manager import RunManager
+
+SLOW = {"points": 100000, "delay": 0.001, "setpoint": 0.1}
+
+
+class Failing(MethodBase):
+    name = "Failing"
+
+    @classmethod
+    def parameters(cls):
+        return {}
+
+    def run(self, stop_event, emit, progress):
+        raise RuntimeError("overload")
+
+
+class RunManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sessions = SessionManager()
+        self.manager = RunManager(self.sessions)
+
+    def tearDown(self):
+        self.manager.stop_all()
+        for run in list(self.manager.runs.values()):
+            run.join(5)
+        self.sessions.close_all()
+
+    def _start(self, resource, method_cls=DummyMethod, params=SLOW, on_done=None):
+        first = threading.Event()
+        run = self.manager.start(resource, method_cls, params, lambda x, y: first.set(),
+                                 lambda fraction: None, on_done)
+        return run, first
+
+    def test_busy_resource(self):
+        run, first = self._start("SIM::A::INSTR")
+        self.assertTrue(first.wait(5))
+        self.assertTrue(self.manager.busy("SIM::A::INSTR"))
+        with self.assertRaisesRegex(RuntimeError, "already running"):
+            self._start("SIM::A::INSTR")
+        self.assertIs(self.manager.runs["SIM::A::INSTR"], run)
+
+    def test_two_resources_concurrently(self):
+        a, first_a = self._start("SIM::A::INSTR")
+        b, first_b = self._start("SIM::B::INSTR")
+        self.assertTrue(first_a.wait(5) and first_b.wait(5))
+        self.assertCountEqual(self.manager.active_runs(), [a, b])
+        self.assertIsNot(a.method.device, b.method.device)
+
+        self.manager.stop("SIM::A::INSTR")
+        a.join(5)
+        self.assertFalse(a.is_alive())
+        self.assertTrue(b.is_alive())
+
+    def test_stop_then_join(self):
+        done = []
+        run, first = self._start("SIM::A::INSTR", on_done=done.append)
+        self.assertTrue(first.wait(5))
+
+        self.manager.stop("SIM::A::INSTR")
+        run.join(5)
+        self.assertFalse(run.is_alive())
+        self.assertFalse(self.manager.busy("SIM::A::INSTR"))
+        self.assertTrue(run.stop_event.is_set())
+        self.assertIsNone(run.error)
+        self.assertEqual(done, [run])
+
+        # Free again
+        again, _ = self._start("SIM::A::INSTR", params={**SLOW, "points": 1})
+        again.join(5)
+        self.assertIsNone(again.error)
+
+    def test_method_error(self):
+        done = []
+        run, _ = self._start("SIM::A::INSTR", Failing, {}, on_done=done.append)
+        run.join(5)
+        self.assertIsInstance(run.error, RuntimeError)
+        self.assertEqual(str(run.error), "overload")
+        self.assertEqual(done, [run])
+        self.assertFalse(self.manager.busy("SIM::A::INSTR"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+# app/test_runfile.py
+"""
+Binary run format (app/runfile.py).
+
+    python -m pytest app/test_runfile.py
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from app import runfile
+from app.methods.base import MethodBase
+
+
+class Sweep(MethodBase):
+    name = "Sweep"
+    xlabel = "Potential (mV)"
+    ylabel = "Current (A)"
+    record_fields = (("E", "f8"), ("I", "f8"), ("t", "f8"), ("cycle", "i4"))
+    xfield = "E"
+    yfield = "I"
+
+    @classmethod
+    def parameters(cls):
+        return {"rate": {"default": 50}}
+
+    def run(self, stop_event, emit, progress_cb):
+        pass
+
+
+def _records(n):
+    records = np.zeros(n, dtype=Sweep.record_dtype())
+    records["E"] = np.arange(n) * 0.1
+    records["I"] = np.arange(n) * -1e-7
+    records["t"] = np.arange(n) * 0.01
+    records["cycle"] = np.arange(n) // 4
+    return records
+
+
+class RunFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "run" + runfile.EXTENSION)
+        self.header = runfile.run_header(Sweep, {"rate": 50}, {"timestamp": "20260101_120000", "user": "Max"})
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _write(self, records, *rows):
+        writer = runfile.RunFileWriter(self.path, self.header)
+        writer.put_many(records)
+        for row in rows:
+            writer.put(*row)
+        writer.close()
+        self.assertIsNone(writer.error)
+        return writer
+
+    def test_header(self):
+        self.assertEqual(self.header["method"], "Sweep")
+        self.assertEqual(self.header["columns"], ["Potential (mV)", "Current (A)", "t", "cycle"])
+        self.assertEqual(self.header["dtype"], [["E", "<f8"], ["I", "<f8"], ["t", "<f8"], ["cycle", "<i4"]])
+
+    def test_round_trip(self):
+        records = _records(10)
+        writer = self._write(records[:8], records[8].tolist(), records[9].tolist())
+        self.assertEqual(writer.rows_written, 10)
+
+        header, offset = runfile.read_header(self.path)
+        self.assertEqual(offset % runfile.ALIGN, 0)
+        self.assertEqual(header["params"], {"rate": 50})
+
+        for mmap in (True, False):
+            with self.subTest(mmap=mmap):
+                _, loaded = runfile.load(self.path, mmap=mmap)
+                self.assertEqual(isinstance(loaded, np.memmap), mmap)
+                np.testing.assert_array_equal(loaded, records)
+
+    def test_partial_record_ignored(self):
+        self._write(_records(5))
+        with open(self.path, "ab") as f:
+            f.write(b"\x01\x02\x03")     # run cut short mid-record
+        _, loaded = runfile.load(self.path)
+        self.assertEqual(len(loaded), 5)
+
+    def test_empty(self):
+        self._write(_records(0))
+        _, loaded = runfile.load(self.path)
+        self.assertEqual(len(loaded), 0)
+        self.assertEqual(loaded.dtype, Sweep.record_dtype())
+
+    def test_not_a_runfile(self):
+        with open(self.path, "wb") as f:
+            f.write(b"Voltage,Current\n")
+        with self.assertRaises(ValueError):
+            runfile.read_header(self.path)
+
+    def test_csv_round_trip(self):
+        records = _records(10)
+        self._write(records)
+
+        csv_path = os.path.join(self.dir, "run.csv")
+        runfile.to_csv(self.path, csv_path)
+        with open(csv_path) as f:
+            text = f.read()
+        self.assertIn("# Source: run.egr", text)
+        self.assertIn("Potential (mV),Current (A),t,cycle", text)
+
+        back = os.path.join(self.dir, "back" + runfile.EXTENSION)
+        runfile.from_csv(csv_path, back)
+        header, loaded = runfile.load(back)
+        self.assertEqual(header["source"], "run.csv")
+        self.assertEqual(header["method"], "Sweep")
+        self.assertEqual(header["params"], {"rate": 50})
+        # Columns come back as f8, named after the CSV labels
+        np.testing.assert_array_equal(loaded["Potential (mV)"], records["E"])
+        np.testing.assert_array_equal(loaded["cycle"], records["cycle"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+# app/test_runs.py
+"""
+Headless runs (app/runs.py, python -m app.run) on the simulated 273A.
+
+    python -m pytest app/test_runs.py
+"""
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from app import run as run_cli
+from app.config import SIMULATOR
+from app.data import read_run
+from app.instruments.sessions import SESSIONS
+from app.methods.BuiltIn.dummy import DummyMethod
+from app.methods.loader import discover_methods
+from app.run_manager import RunManager
+from app.runs import changed_params, find_method, method_params, parse_value, run_filepath, run_method
+
+RESOURCE = SIMULATOR["resource"]
+FAST = {"points": 5, "delay": 0.001, "setpoint": 0.1}
+
+
+class HelpersTest(unittest.TestCase):
+
+    def test_parse_value(self):
+        self.assertEqual(parse_value("3"), 3)
+        self.assertEqual(parse_value("-0.5"), -0.5)
+        self.assertEqual(parse_value("Pt"), "Pt")
+
+    def test_run_filepath(self):
+        path = run_filepath("root", "Max", "P1", "exp", "CV", "20260101_120000", "egr")
+        self.assertEqual(path, os.path.join("root", "Max", "P1", "exp_CV_20260101_120000.egr"))
+        self.assertTrue(run_filepath("root", "u", "p", "e", "CV", "t", "csv").endswith(".csv"))
+
+    def test_find_method(self):
+        methods = [DummyMethod]
+        self.assertIs(find_method(methods, "dummy test method"), DummyMethod)
+        self.assertIs(find_method(methods, "DummyMethod"), DummyMethod)
+        self.assertIsNone(find_method(methods, "CV"))
+
+        # Plugins are modules named after their file
+        self.assertEqual(find_method(discover_methods(), "dummy").name, DummyMethod.name)
+
+    def test_method_params(self):
+        folder = tempfile.mkdtemp()
+        try:
+            params_file = os.path.join(folder, "params.json")
+            with open(params_file, "w") as f:
+                json.dump({"points": 7, "delay": 0.5}, f)
+            params = method_params(DummyMethod, params_file, ["delay=0.25"])
+            self.assertEqual(params, {"points": 7, "delay": 0.25, "setpoint": 0.1})
+        finally:
+            shutil.rmtree(folder)
+
+        with self.assertRaises(ValueError):
+            method_params(DummyMethod, overrides=["points"])
+
+    def test_changed_params(self):
+        # As typed in the GUI: defaults included
+        params = {"points": parse_value("100"), "delay": parse_value("0.25"), "setpoint": parse_value("0.1")}
+        self.assertEqual(changed_params(DummyMethod, params), {"delay": 0.25})
+        self.assertEqual(changed_params(DummyMethod, {"extra": 1}), {"extra": 1})
+
+
+class RunMethodTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        SESSIONS.close(RESOURCE)
+        shutil.rmtree(self.dir)
+
+    def test_csv_and_egr(self):
+        for data_format in ("csv", "egr"):
+            with self.subTest(data_format=data_format):
+                path = os.path.join(self.dir, "u", "p", f"run.{data_format}")
+                started = []
+                run, stats = run_method(DummyMethod, FAST, RESOURCE, path, {"user": "u"}, data_format,
+                                        progress=False, on_start=started.append)
+                self.assertIsNone(run.error)
+                self.assertEqual(started, [run])
+                self.assertEqual(stats["points"], 5)
+                self.assertFalse(stats["stopped"])
+
+                saved = read_run(path)
+                self.assertEqual(saved.method, DummyMethod.name)
+                self.assertEqual(saved.params["points"], 5)
+                self.assertEqual(saved.x.tolist(), [0, 1, 2, 3, 4])
+
+    def test_stop_from_on_start(self):
+        path = os.path.join(self.dir, "run.csv")
+        run, stats = run_method(DummyMethod, {**FAST, "points": 10000}, RESOURCE, path, {},
+                                "csv", progress=False, on_start=lambda run: run.stop())
+        self.assertTrue(stats["stopped"])
+        self.assertLess(stats["points"], 10000)
+
+    def test_failed_start_leaves_no_file(self):
+        class Failing(RunManager):
+            def start(self, *args, **kwargs):
+                raise RuntimeError("busy")
+
+        path = os.path.join(self.dir, "run.csv")
+        with self.assertRaisesRegex(RuntimeError, "busy"):
+            run_method(DummyMethod, FAST, RESOURCE, path, {}, "csv", progress=False, manager=Failing())
+        self.assertFalse(os.path.exists(path))
+
+
+class RunCliTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _main(self, *argv):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            code = run_cli.main(list(argv))
+        return code, out.getvalue()
+
+    def test_list(self):
+        code, out = self._main("--list")
+        self.assertEqual(code, 0)
+        self.assertIn(DummyMethod.name, out)
+
+    def test_simulated_run(self):
+        stats_file = os.path.join(self.root, "stats.json")
+        code, out = self._main(
+            "dummy", "--simulate", "--quiet", "--root", self.root, "--user", "Max", "--project", "P1",
+            "--format", "egr", "--param", "points=5", "--param", "delay=0.001", "--stats", stats_file,
+        )
+        self.assertEqual(code, 0, out)
+        self.assertIn("[STATS] 5 points", out)
+
+        with open(stats_file) as f:
+            stats = json.load(f)
+        self.assertEqual(stats["params"]["points"], 5)
+        self.assertTrue(stats["file"].endswith(".egr"))
+        self.assertEqual(len(read_run(stats["file"])), 5)
+
+        from app.catalog import Catalog
+        self.assertEqual(len(Catalog(self.root).find(user="Max", project="P1")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
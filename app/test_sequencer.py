@@ -0,0 +1,71 @@
+# app/test_sequencer.py
+"""
+Experiment queue shared between processes (app/sequencer.py).
+
+    python -m pytest app/test_sequencer.py
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from app.sequencer import DONE, PENDING, RUNNING, ExperimentQueue, Sequencer
+
+
+class ExperimentQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, ".queue.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_changes_merge(self):
+        # e.g. the GUI and python -m app.sequencer on the same queue
+        gui = ExperimentQueue(self.root)
+        cli = ExperimentQueue(self.root)
+
+        a = gui.add("CV", {})
+        b = cli.add("CA", {})
+        self.assertNotEqual(a["id"], b["id"])
+
+        gui.update(a["id"], status=DONE)
+        cli.set_rest(5)
+        for queue in (gui, cli):
+            self.assertEqual([item["method"] for item in queue.snapshot()], ["CV", "CA"])
+            self.assertEqual(queue.get(a["id"])["status"], DONE)
+            self.assertEqual(queue.rest_s, 5.0)
+
+        cli.remove(b["id"])
+        self.assertIsNone(gui.next_pending())
+        self.assertEqual(ExperimentQueue(self.root).counts()[DONE], 1)
+
+    def test_recover(self):
+        queue = ExperimentQueue(self.root)
+        item = queue.add("CV", {})
+        queue.update(item["id"], status=RUNNING)
+
+        recovered = ExperimentQueue(self.root).recover()
+        self.assertEqual([i["id"] for i in recovered], [item["id"]])
+        self.assertEqual(queue.get(item["id"])["status"], PENDING)
+
+    def test_one_runner_per_queue(self):
+        queue = ExperimentQueue(self.root)
+        queue.add("CV", {})
+
+        other = Sequencer(queue, None)
+        self.assertTrue(other._run_lock.acquire(blocking=False))
+        try:
+            sequencer = Sequencer(ExperimentQueue(self.root), None, methods=[], manager=object())
+            sequencer.start()
+            sequencer.join(5)
+            self.assertFalse(sequencer.running())
+            self.assertIsNotNone(sequencer.error)
+            self.assertEqual(queue.next_pending()["status"], PENDING)
+        finally:
+            other._run_lock.release()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+# app/test_sessions.py
+"""
+Shared VISA sessions (app/instruments/sessions.py).
+
+    python -m pytest app/test_sessions.py
+"""
+import threading
+import unittest
+
+from app.instruments.sessions import VI_ERROR_TMO, Session, SessionManager
+from app.instruments.simulator import Simulated273A
+
+
+class VisaTimeout(Exception):
+    error_code = VI_ERROR_TMO
+
+
+class Flaky(Simulated273A):
+    """Simulated273A whose next `failures` writes / reads time out."""
+
+    def __init__(self, failures=0, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+        self.writes = []
+
+    def _fail(self):
+        if self.failures:
+            self.failures -= 1
+            raise VisaTimeout("VI_ERROR_TMO")
+
+    def write(self, message):
+        self._fail()
+        self.writes.append(message)
+        super().write(message)
+
+    def read(self):
+        self._fail()
+        return super().read()
+
+
+class Manager(SessionManager):
+    """Serves Flaky resources; opened: resource name -> every one opened."""
+
+    def __init__(self, failures=0):
+        super().__init__()
+        self.failures = failures
+        self.opened = {}
+
+    def _open_resource(self, resource_name):
+        resource = Flaky(self.failures, resource_name=resource_name)
+        self.failures = 0
+        self.opened.setdefault(resource_name, []).append(resource)
+        return resource
+
+
+class SessionCallTest(unittest.TestCase):
+
+    def test_write_timeout_reconnects_and_retries_once(self):
+        manager = Manager(failures=1)
+        session = manager.open("SIM::A::INSTR")
+        first = session.resource
+
+        session.write("ID")
+        self.assertTrue(first._closed)
+        self.assertIsNot(session.resource, first)
+        self.assertEqual(session.resource.writes, ["ID"])
+        self.assertEqual(session.read(), "273A\r")
+
+    def test_retry_is_not_repeated(self):
+        manager = Manager()
+        session = manager.open("SIM::A::INSTR")
+        session.resource.failures = 1
+
+        # The reopened resource times out too: no second retry
+        manager.failures = 1
+        with self.assertRaises(VisaTimeout):
+            session.write("ID")
+        self.assertEqual(len(manager.opened["SIM::A::INSTR"]), 2)
+
+    def test_read_timeout_reconnects_and_raises(self):
+        manager = Manager()
+        session = manager.open("SIM::A::INSTR")
+        first = session.resource
+        first.failures = 1
+
+        with self.assertRaises(VisaTimeout):
+            session.read()
+        self.assertTrue(first._closed)
+        self.assertIsNot(session.resource, first)
+        # Usable afterwards
+        session.write("ID")
+        self.assertEqual(session.read(), "273A\r")
+
+    def test_other_errors_pass_through(self):
+        manager = Manager()
+        session = Session(manager, "SIM::A::INSTR", Flaky(resource_name="SIM::A::INSTR"))
+        session.resource.close()
+        with self.assertRaisesRegex(Exception, "closed"):
+            session.write("ID")
+        self.assertNotIn("SIM::A::INSTR", manager.opened)
+
+
+class IdentifyTest(unittest.TestCase):
+
+    def test_cached(self):
+        manager = Manager()
+        identity = manager.identify("SIM::A::INSTR")
+        self.assertEqual(identity, {"id": "273A", "version": "SIM 1.00", "error": "0"})
+
+        resource = manager.sessions["SIM::A::INSTR"].resource
+        manager.identify("SIM::A::INSTR")
+        self.assertEqual(resource.writes, ["ID;VER;ERR"])
+        manager.identify("SIM::A::INSTR", refresh=True)
+        self.assertEqual(resource.writes, ["ID;VER;ERR"] * 2)
+
+        manager.close("SIM::A::INSTR")
+        self.assertEqual(manager.identities, {})
+
+    def test_slow_instrument_does_not_block_others(self):
+        manager = Manager()
+        slow = manager.open("SIM::A::INSTR").resource
+        started, release = threading.Event(), threading.Event()
+        write = slow.write
+
+        def hanging_write(message):
+            started.set()
+            release.wait(5)
+            write(message)
+
+        slow.write = hanging_write
+        thread = threading.Thread(target=manager.identify, args=("SIM::A::INSTR",))
+        thread.start()
+        try:
+            self.assertTrue(started.wait(5))
+            # Manager lock is free while A is on the bus
+            other = threading.Thread(target=manager.identify, args=("SIM::B::INSTR",))
+            other.start()
+            other.join(2)
+            self.assertFalse(other.is_alive())
+            self.assertEqual(manager.identities["SIM::B::INSTR"]["id"], "273A")
+        finally:
+            release.set()
+            thread.join(5)
+        self.assertIn("SIM::A::INSTR", manager.identities)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# app/test_simulator.py
+"""
+273A protocol simulator (app/instruments/simulator.py).
+
+    python -m pytest app/test_simulator.py
+"""
+import time
+import unittest
+from unittest import mock
+
+from app.instruments.simulator import Simulated273A, SimulatedVisaError, is_simulated
+
+
+class SimulatorTest(unittest.TestCase):
+
+    def test_resistor_cell(self):
+        device = Simulated273A(cell_resistance=100e3)
+        device.write("MODE 2;CELL 1;SETE 500")
+        device.write("READI")
+        self.assertEqual(device.read(), "5000,-9\r")  # 500 mV / 100 kΩ = 5 µA
+
+    def test_cell_off_reads_zero(self):
+        device = Simulated273A()
+        device.write("SETE 500;READI")
+        self.assertEqual(device.read(), "0,-9\r")
+
+    def test_pipelined_replies_in_order(self):
+        device = Simulated273A()
+        device.write("ID;VER;ERR")
+        self.assertEqual([device.read() for _ in range(3)], ["273A\r", "SIM 1.00\r", "0\r"])
+
+    def test_errors(self):
+        device = Simulated273A()
+        device.write("BOGUS;SETE abc")
+        device.write("ERR")
+        self.assertEqual(device.read(), "3\r")
+
+        device = Simulated273A(error_rate=1.0, seed=1)
+        device.write("READI")
+        self.assertEqual(device.read(), "?\r")
+
+    def test_read_without_reply_times_out(self):
+        device = Simulated273A()
+        with self.assertRaises(SimulatedVisaError):
+            device.read()
+        device.close()
+        with self.assertRaises(SimulatedVisaError):
+            device.write("ID")
+
+    def test_latency_once_per_write(self):
+        device = Simulated273A(latency=0.02)
+        with mock.patch("app.instruments.simulator.time.sleep") as sleep:
+            device.write("CELL 1;SETE 1;READI;READE")
+        sleep.assert_called_once_with(0.02)
+
+        device = Simulated273A(latency={"default": 0.0, "READI": 0.02})
+        with mock.patch("app.instruments.simulator.time.sleep") as sleep:
+            device.write("SETE 1")
+            sleep.assert_not_called()
+            device.write("SETE 1;READI")
+        sleep.assert_called_once_with(0.02)
+
+    def test_curve(self):
+        device = Simulated273A()
+        device.write("SETE -10;TMB 50;NP 8;VTX 10;STEP 5;NC 1;TC")
+        # 8 points x 50 µs
+        deadline = time.perf_counter() + 5.0
+        while True:
+            device.write("DONE")
+            if device.read() == "1\r":
+                break
+            self.assertLess(time.perf_counter(), deadline, "curve never finished")
+        device.write("DC")
+        currents = [device.read() for _ in range(8)]
+        self.assertEqual(currents[0], "-1000,-10\r")   # -10 mV / 100 kΩ
+        self.assertEqual(currents[4], "1000,-10\r")    # vertex
+
+    def test_is_simulated(self):
+        self.assertTrue(is_simulated("SIM::273A::INSTR"))
+        self.assertFalse(is_simulated("GPIB0::13::INSTR"))
+        self.assertFalse(is_simulated(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+# app/test_startup.py
+"""
+Startup task graph (app/startup.py).
+
+    python -m pytest app/test_startup.py
+"""
+import threading
+import time
+import unittest
+
+from app.startup import TaskGraph
+
+
+class TaskGraphTest(unittest.TestCase):
+
+    def test_results_flow_to_dependents(self):
+        graph = TaskGraph()
+        graph.add("a", lambda: 2)
+        graph.add("b", lambda: 3)
+        graph.add("sum", lambda a, b: a + b, deps=("a", "b"))
+        graph.add("double", lambda s: 2 * s, deps=("sum",))
+
+        done = []
+        results = graph.run(on_task_done=lambda name, finished, total: done.append((name, finished, total)))
+        self.assertEqual(results, {"a": 2, "b": 3, "sum": 5, "double": 10})
+        self.assertEqual([d[1:] for d in done], [(1, 4), (2, 4), (3, 4), (4, 4)])
+        self.assertEqual([d[0] for d in done][2:], ["sum", "double"])
+        self.assertIn("total", graph.timings)
+        self.assertEqual(len(graph.report()), 5)
+
+    def test_independent_tasks_overlap(self):
+        barrier = threading.Barrier(2, timeout=2)
+        graph = TaskGraph(max_workers=2)
+        # Both must be running at once to pass the barrier
+        graph.add("a", barrier.wait)
+        graph.add("b", barrier.wait)
+        graph.run()
+        self.assertEqual(graph.errors, {})
+
+    def test_failure_skips_dependents(self):
+        def fail():
+            raise OSError("no device")
+
+        graph = TaskGraph()
+        graph.add("scan", fail)
+        graph.add("connect", lambda devices: devices, deps=("scan",))
+        graph.add("status", lambda c: c, deps=("connect",))
+        graph.add("methods", lambda: ["CV"])
+        results = graph.run()
+
+        self.assertEqual(results, {"methods": ["CV"]})
+        self.assertIsInstance(graph.errors["scan"], OSError)
+        self.assertIn("'scan' failed", str(graph.errors["connect"]))
+        self.assertIn("'connect' failed", str(graph.errors["status"]))
+        report = "\n".join(graph.report())
+        self.assertIn("FAILED: no device", report)
+        self.assertIn("skipped", report)
+
+    def test_invalid_graphs(self):
+        graph = TaskGraph()
+        graph.add("a", lambda x: x, deps=("missing",))
+        with self.assertRaisesRegex(ValueError, "unknown"):
+            graph.run()
+
+        graph = TaskGraph()
+        graph.add("ok", lambda: time.sleep(0.01))
+        graph.add("a", lambda b: b, deps=("b",))
+        graph.add("b", lambda a: a, deps=("a",))
+        with self.assertRaisesRegex(ValueError, "cycle"):
+            graph.run()
+
+
+if __name__ == "__main__":
+    unittest.main()
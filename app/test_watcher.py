@@ -0,0 +1,129 @@
+# app/test_watcher.py
+"""
+Hot reload of method plugins (app/methods/watcher.py).
+
+    python -m pytest app/test_watcher.py
+"""
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+from app.methods.loader import MANIFEST_NAME, scan_methods
+from app.methods.watcher import MethodWatcher
+
+PLUGIN = """
+from app.methods.base import MethodBase
+
+
+class {cls}(MethodBase):
+    name = {name!r}
+
+    @classmethod
+    def parameters(cls):
+        return {{"n": {{"label": "Points", "type": int, "default": {default}}}}}
+
+    def run(self, stop_event, emit, progress_cb):
+        pass
+"""
+
+JSON_METHOD = {"name": "Stair", "inputs": [], "process": "FOR_RANGEV(0,10,5){}"}
+
+
+class MethodWatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = pathlib.Path(tempfile.mkdtemp())
+        self.changes = []
+        self.stamp = 1_000_000
+        self._write("alpha.py", PLUGIN.format(cls="Alpha", name="Alpha", default=10))
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _write(self, name, text):
+        path = self.folder / name
+        path.write_text(text)
+        # A new mtime on every write, even on coarse file system clocks
+        self.stamp += 10
+        os.utime(path, (self.stamp, self.stamp))
+        return path
+
+    def _watcher(self):
+        methods = scan_methods(self.folder)
+        watcher = MethodWatcher([self.folder], lambda methods, errors: self.changes.append((methods, errors)),
+                                methods=methods)
+        return watcher, methods
+
+    def _names(self):
+        methods, _ = self.changes[-1]
+        return sorted(m.name for m in methods)
+
+    def test_manifest(self):
+        methods = scan_methods(self.folder)
+        self.assertEqual([m.name for m in methods], ["Alpha"])
+        self.assertFalse(methods[0].loaded)
+        self.assertEqual(methods[0].parameters()["n"]["type"], int)
+
+        manifest = json.loads((self.folder / MANIFEST_NAME).read_text())
+        self.assertEqual(manifest["files"]["alpha.py"]["methods"][0]["parameters"]["n"]["type"], "int")
+
+        # From the manifest: still not imported, same metadata
+        again = scan_methods(self.folder)
+        self.assertEqual(again[0].parameters(), methods[0].parameters())
+        self.assertIs(again[0].load(), methods[0].load())
+
+    def test_no_change(self):
+        watcher, _ = self._watcher()
+        self.assertFalse(watcher.poll())
+        self.assertEqual(self.changes, [])
+
+    def test_add_edit_remove(self):
+        watcher, _ = self._watcher()
+
+        self._write("beta.py", PLUGIN.format(cls="Beta", name="Beta", default=1))
+        (self.folder / "stair.json").write_text(json.dumps(JSON_METHOD))
+        self.assertTrue(watcher.poll())
+        self.assertEqual(self._names(), ["Alpha", "Beta", "Stair"])
+
+        self._write("beta.py", PLUGIN.format(cls="Beta", name="Beta 2", default=22))
+        self.assertTrue(watcher.poll())
+        methods, errors = self.changes[-1]
+        self.assertEqual(errors, {})
+        beta = next(m for m in methods if m.name == "Beta 2")
+        self.assertTrue(beta.loaded)
+        self.assertEqual(beta.parameters()["n"]["default"], 22)
+
+        (self.folder / "alpha.py").unlink()
+        self.assertTrue(watcher.poll())
+        self.assertEqual(self._names(), ["Beta 2", "Stair"])
+
+    def test_broken_edit_keeps_loaded_method(self):
+        watcher, methods = self._watcher()
+        methods[0].load()
+
+        path = self._write("alpha.py", "this is not python")
+        self.assertTrue(watcher.poll())
+        methods, errors = self.changes[-1]
+        self.assertEqual(list(errors), [str(path)])
+        self.assertEqual([m.name for m in methods], ["Alpha"])
+
+        # Fixed again
+        self._write("alpha.py", PLUGIN.format(cls="Alpha", name="Alpha fixed", default=10))
+        self.assertTrue(watcher.poll())
+        self.assertEqual(self.changes[-1][1], {})
+        self.assertEqual(self._names(), ["Alpha fixed"])
+
+    def test_broken_new_file(self):
+        watcher, _ = self._watcher()
+        self._write("broken.json", "{")
+        self.assertTrue(watcher.poll())
+        methods, errors = self.changes[-1]
+        self.assertEqual([pathlib.Path(p).name for p in errors], ["broken.json"])
+        self.assertEqual([m.name for m in methods], ["Alpha"])
+
+
+if __name__ == "__main__":
+    unittest.main()